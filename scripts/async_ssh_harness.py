@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+"""Exercise the asyncio SSH engine against an in-process SSH server.
+
+The stand-in server accepts any login. The batched spec script and the
+website commands get canned answers after an injected delay; `sleep N`
+sleeps; `flood N` writes N bytes of lines to stdout (`flood >&2 N`: to
+stderr, then "done"); anything else runs in the local /bin/sh. Each
+simulated host is its own login (host<N>@127.0.0.1), so it gets its own
+connection. The server also forwards direct-tcpip channels, so it can
+play the bastion for the --jump checks.
+
+Usage: ./scripts/async_ssh_harness.py [hosts] [delay_ms]
+"""
+
+import asyncio
+import collections
+import re
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import asyncssh
+
+from cosmonaut.ssh.aio import AsyncSSHEngine
+from cosmonaut.ssh.client import run_command
+from cosmonaut.ssh import known
+from cosmonaut.ssh.fleet import collect_fleet_specs
+from cosmonaut.ssh.output import truncation_line
+from cosmonaut.ssh.pool import SessionPool
+from cosmonaut.ssh.specs import get_remote_specs_async
+from cosmonaut.web.utils import get_websites_async
+
+CANNED_SECTIONS = {
+    "hostname": "web-1",
+    "os": "Debian GNU/Linux 12 (bookworm)",
+    "kernel": "6.1.0-18-amd64",
+    "arch": "x86_64",
+    "uptime": "up 3 days",
+    "cores": "4",
+    "memory": "               total        used        free      shared  buff/cache   available\n"
+    "Mem:           15Gi       3.1Gi       9.0Gi       1.0Mi       3.2Gi        12Gi",
+    "disk": "42G (58%)",
+    "public_ip": "203.0.113.7",
+    "users": "1",
+    "connections": "tcp   ESTAB 0 0 10.0.0.5:51234 10.0.9.3:5432\n"
+    "tcp   ESTAB 0 0 10.0.0.5:51240 10.0.8.7:443",
+}
+
+CANNED_COMMANDS = {
+    "ls /etc/nginx/sites-enabled/ 2>/dev/null || echo": "shop\nblog",
+    "cat /etc/nginx/sites-enabled/shop": "server_name shop.example.com;\nroot /srv/shop;",
+    "cat /etc/nginx/sites-enabled/blog": "server_name blog.example.com;\nroot /srv/blog;",
+}
+
+MARKER = re.compile(r"(@@cosmonaut-[0-9a-f]+@@) (\w+)'")
+
+
+# Logins per user, to count bastion handshakes
+LOGINS = collections.Counter()
+
+
+class StandInServer(asyncssh.SSHServer):
+    def begin_auth(self, username):
+        LOGINS[username] += 1
+        return False  # no auth needed
+
+    def connection_requested(self, dest_host, dest_port, orig_host, orig_port):
+        return True  # act as a bastion: forward to wherever is asked
+
+
+async def flood(stream, size: int, line: str):
+    """Write `size` bytes of `line`s, honouring the channel's flow control."""
+    block = line * (65536 // len(line))
+    while size > 0 and not stream.channel.is_closing():
+        stream.write(block[:size])
+        size -= len(block)
+        await stream.drain()
+
+
+def make_handler(delay: float):
+    async def handle(process: asyncssh.SSHServerProcess):
+        command = process.command or ""
+        sections = MARKER.findall(command)
+        sleep = re.fullmatch(r"sleep (\d+(\.\d+)?)", command)
+        flooding = re.fullmatch(r"flood( >&2)? (\d+)", command)
+        try:
+            if sections:
+                await asyncio.sleep(delay)
+                for marker, name in sections:
+                    process.stdout.write(
+                        f"{marker} {name}\n{CANNED_SECTIONS[name]}\n{marker} end 0\n"
+                    )
+            elif command in CANNED_COMMANDS or command.startswith("cat /etc/"):
+                await asyncio.sleep(delay)
+                process.stdout.write(CANNED_COMMANDS.get(command, "") + "\n")
+            elif flooding:
+                stream = process.stderr if flooding.group(1) else process.stdout
+                await flood(stream, int(flooding.group(2)), "flood\n")
+                process.stdout.write("done\n")
+            elif sleep:
+                await asyncio.sleep(float(sleep.group(1)))
+            else:
+                shell = await asyncio.create_subprocess_shell(
+                    command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+                out, _ = await shell.communicate()
+                process.stdout.write(out.decode(errors="replace"))
+            process.exit(0)
+        except (asyncssh.Error, BrokenPipeError, ConnectionError):
+            pass  # client went away (timeout or cancellation)
+
+    return handle
+
+
+async def start_server(delay: float):
+    key = asyncssh.generate_private_key("ssh-ed25519")
+    server = await asyncssh.create_server(
+        StandInServer,
+        "127.0.0.1",
+        0,
+        server_host_keys=[key],
+        process_factory=make_handler(delay),
+        encoding="utf-8",
+    )
+    return server, server.sockets[0].getsockname()[1]
+
+
+def check(label: str, ok: bool, detail: str = ""):
+    print(f"{'✅' if ok else '❌'} {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        check.failed = True
+
+
+check.failed = False
+
+
+async def main(hosts: int, delay: float):
+    # Keep learned host keys and credentials out of the real data/
+    known._cache = known.HostCache(Path(tempfile.mkdtemp()) / "ssh_hosts.json")
+    server, port = await start_server(delay)
+
+    async with AsyncSSHEngine(user="harness", port=port, timeout=5) as engine:
+        # Many hosts, one event loop
+        results = []
+        start = time.perf_counter()
+        targets = [f"host{i}@127.0.0.1" for i in range(hosts)]
+        await collect_fleet_specs(
+            targets, "harness", results.append, port=port, deadline=30
+        )
+        elapsed = time.perf_counter() - start
+        ok = [r for r in results if r["ok"]]
+        check(
+            f"specs from {hosts} hosts",
+            len(ok) == hosts
+            and all(r["specs"]["outbound_dbs"] == ["10.0.9.3"] for r in ok),
+            f"{elapsed:.2f}s, {len(ok)} ok",
+        )
+
+        specs = await get_remote_specs_async(engine, "127.0.0.1")
+        check(
+            "get_remote_specs_async",
+            specs["Hostname"] == "web-1" and specs["outbound_webs"],
+        )
+
+        sites = await get_websites_async(engine, "127.0.0.1")
+        domains = sorted(s["details"] for s in sites if s["service"] == "nginx")
+        check(
+            "get_websites_async",
+            domains == ["blog.example.com", "shop.example.com"],
+            ", ".join(domains),
+        )
+
+        # Per-command timeout
+        start = time.perf_counter()
+        try:
+            await engine.run("127.0.0.1", "sleep 5", timeout=0.3)
+            check("timeout", False, "command finished")
+        except TimeoutError:
+            check("timeout", True, f"{time.perf_counter() - start:.2f}s")
+
+        # Cancellation leaves the engine usable
+        task = asyncio.create_task(engine.run("127.0.0.1", "sleep 5"))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        try:
+            await task
+            check("cancellation", False, "command finished")
+        except asyncio.CancelledError:
+            out = await engine.run("127.0.0.1", "echo still-here")
+            check("cancellation", out == "still-here")
+
+        # More concurrent commands on one host than channels allowed per host
+        outs = await asyncio.gather(
+            *(engine.run("127.0.0.1", f"echo {i}") for i in range(30))
+        )
+        check("30 concurrent commands on one host", outs == [str(i) for i in range(30)])
+
+        try:
+            await engine.run("127.0.0.1", "true", port=1)
+            check("unreachable host raises", False)
+        except OSError as e:
+            check("unreachable host raises", True, type(e).__name__)
+
+    # Through a bastion: one bastion login for the whole fleet
+    LOGINS.clear()
+    results = []
+    start = time.perf_counter()
+    await collect_fleet_specs(
+        [f"inner{i}@127.0.0.1" for i in range(min(hosts, 200))],
+        "harness",
+        results.append,
+        port=port,
+        jump=f"bastion@127.0.0.1:{port}",
+    )
+    check(
+        f"specs from {len(results)} hosts via a bastion",
+        all(r["ok"] for r in results) and LOGINS["bastion"] == 1,
+        f"{time.perf_counter() - start:.2f}s, {LOGINS['bastion']} bastion login",
+    )
+
+    # The paramiko pool through the same kind of bastion; the sessions stay
+    # pooled, each holding its tunnel open
+    LOGINS.clear()
+    pool = SessionPool()
+
+    def run_jumped():
+        outs = []
+        for i in range(20):
+            with pool.acquire(
+                "127.0.0.1",
+                f"inner{i}",
+                port,
+                password="x",
+                jump=f"bastion@127.0.0.1:{port}",
+            ) as client:
+                _, stdout, _ = client.exec_command(f"echo {i}")
+                outs.append(stdout.read().decode().strip())
+        return outs
+
+    outs = await asyncio.to_thread(run_jumped)
+    tunnels = pool.sessions[("bastion", "127.0.0.1", port, None)].leases
+    pool.close_all()
+    check(
+        "SessionPool via a bastion",
+        outs == [str(i) for i in range(20)]
+        and LOGINS["bastion"] == 1
+        and tunnels == 20
+        and not pool._connecting,
+        f"{LOGINS['bastion']} bastion login, {tunnels} tunnels,"
+        f" {len(pool._connecting)} connect locks left",
+    )
+
+    # Output caps: a flood of output is cut off and the command stopped, a
+    # flood of stderr doesn't stall stdout
+    async with AsyncSSHEngine(user="harness", port=port, timeout=10) as engine:
+        start = time.perf_counter()
+        out = await engine.run("127.0.0.1", "flood 1000000", max_lines=1000)
+        lines = out.splitlines()
+        check(
+            "output capped (asyncio)",
+            len(lines) == 1001 and lines[-1] == truncation_line("more than 1000 lines"),
+            f"{time.perf_counter() - start:.2f}s",
+        )
+
+    pool = SessionPool()
+
+    def run_floods():
+        with pool.acquire("127.0.0.1", "floods", port, password="x") as client:
+            start = time.perf_counter()
+            out = run_command(client, "flood 10000000", max_bytes=100_000)
+            capped = time.perf_counter() - start
+            noisy = run_command(client, "flood >&2 5000000")
+            return out, capped, noisy
+
+    out, capped, noisy = await asyncio.wait_for(asyncio.to_thread(run_floods), 60)
+    pool.close_all()
+    check(
+        "output capped (paramiko)",
+        len(out) <= 100_000 + 100
+        and out.endswith(truncation_line("more than 100000 bytes")),
+        f"{capped:.2f}s",
+    )
+    check("5 MB of stderr drained", noisy == "done")
+
+    # Host keys learned by the engine are enforced on the next run
+    cache = known.get_host_cache()
+    learned = cache.host_key("127.0.0.1", port)
+    impostor = asyncssh.generate_private_key("ssh-ed25519")
+    cache.remember("127.0.0.1", port, host_key=known.key_line(impostor))
+    async with AsyncSSHEngine(user="harness", port=port, timeout=5) as engine:
+        try:
+            await engine.run("127.0.0.1", "true")
+            check("changed host key rejected", False, "connected")
+        except asyncssh.HostKeyNotVerifiable:
+            check("changed host key rejected", bool(learned))
+
+    # A host that keeps refusing connections is skipped once its breaker
+    # opens, and probed again with --retry-down
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        dead_port = sock.getsockname()[1]
+    outcomes = []
+    for _ in range(known.BREAKER_THRESHOLD + 1):
+        results = []
+        await collect_fleet_specs(
+            ["127.0.0.1"], "harness", results.append, port=dead_port
+        )
+        outcomes.append("skipped" if results[0]["skipped"] else results[0]["ok"])
+    results = []
+    await collect_fleet_specs(
+        ["127.0.0.1"], "harness", results.append, port=dead_port, retry_down=True
+    )
+    health = known.get_host_cache().health("127.0.0.1", dead_port)
+    check(
+        "circuit breaker",
+        outcomes == [False] * known.BREAKER_THRESHOLD + ["skipped"]
+        and not results[0]["skipped"]
+        and health["failures"] == known.BREAKER_THRESHOLD + 1,
+        f"{', '.join(map(str, outcomes))}; {health['failures']} failures recorded",
+    )
+    healthy = known.get_host_cache().health("127.0.0.1", port)
+    check(
+        "handshake latency recorded",
+        healthy.get("latency", 0) > 0 and not healthy.get("failures"),
+        f"{healthy.get('latency', 0) * 1000:.0f} ms",
+    )
+
+    server.close()
+    await server.wait_closed()
+    return 1 if check.failed else 0
+
+
+if __name__ == "__main__":
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    delay_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    sys.exit(asyncio.run(main(hosts, delay_ms / 1000)))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""Time SSH collection against a fake sshd with injected latency.
+
+Usage: ./scripts/bench_ssh.py [rtt_ms] [operations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import paramiko
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from fake_sshd import FakeSSHServer
+from cosmonaut.ssh import known
+from cosmonaut.ssh.pool import SessionPool
+from cosmonaut.ssh.specs import SECTIONS, get_remote_specs
+
+
+def run(client, command: str) -> str:
+    _, stdout, _ = client.exec_command(command)
+    return stdout.read().decode().strip()
+
+
+def fresh_client(host: str, port: int) -> paramiko.SSHClient:
+    """What connect_ssh did before the pool: a full handshake every time."""
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(
+        hostname=host,
+        port=port,
+        username="bench",
+        password="x",
+        look_for_keys=False,
+        allow_agent=False,
+    )
+    return client
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def make_keys(ssh_dir: Path) -> paramiko.PKey:
+    """id_rsa, id_ecdsa and id_ed25519 in `ssh_dir`; returns the last one."""
+    ssh_dir.mkdir(parents=True)
+    for name, key in (
+        ("id_rsa", paramiko.RSAKey.generate(2048)),
+        ("id_ecdsa", paramiko.ECDSAKey.generate()),
+    ):
+        key.write_private_key_file(str(ssh_dir / name))
+        (ssh_dir / f"{name}.pub").write_text(f"{key.get_name()} {key.get_base64()}")
+    pem = ed25519.Ed25519PrivateKey.generate().private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.OpenSSH,
+        serialization.NoEncryption(),
+    )
+    (ssh_dir / "id_ed25519").write_bytes(pem)
+    key = paramiko.Ed25519Key(filename=str(ssh_dir / "id_ed25519"))
+    (ssh_dir / "id_ed25519.pub").write_text(f"{key.get_name()} {key.get_base64()}")
+    return key
+
+
+def main():
+    rtt_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    # Keep learned host keys and credentials out of the real data/
+    scratch = Path(tempfile.mkdtemp())
+    known._cache = known.HostCache(scratch / "ssh_hosts.json")
+
+    server = FakeSSHServer(latency=rtt_ms / 1000)
+    host, port = server.address
+    print(f"🛰️ fake sshd, RTT {rtt_ms:.0f} ms")
+
+    # A composite operation: specs, websites and an investigation on one
+    # host, each connecting on its own the way the CLI commands do
+    def unpooled():
+        for _ in range(operations):
+            client = fresh_client(host, port)
+            run(client, "hostname")
+            client.close()
+
+    pool = SessionPool()
+
+    def pooled():
+        for _ in range(operations):
+            client = pool.acquire(host, "bench", port, password="x")
+            run(client, "hostname")
+            client.close()
+
+    print(f"🔁 {operations} operations on one host")
+    print(f"   fresh connection each: {timed(unpooled):8.1f} ms")
+    print(f"   session pool:          {timed(pooled):8.1f} ms")
+    print(f"   handshakes with pool:  {pool.handshakes}")
+
+    # Spec collection on an open session: one channel per collector versus
+    # the single batched script
+    client = pool.acquire(host, "bench", port, password="x")
+    per_command = timed(lambda: get_remote_specs(client, batched=False))
+    batched = timed(lambda: get_remote_specs(client))
+    stable = ("Hostname", "OS", "Kernel", "Architecture", "CPU Cores")
+    one, other = get_remote_specs(client, batched=False), get_remote_specs(client)
+    same = all(one[key] == other[key] for key in stable)
+    client.close()
+
+    print(f"📋 get_remote_specs ({len(SECTIONS)} collectors)")
+    print(f"   one exec per collector: {per_command:8.1f} ms")
+    print(f"   one batched script:     {batched:8.1f} ms")
+    print(f"   speedup: {per_command / batched:.1f}x, same specs: {same}")
+    pool.close_all()
+
+    # Auth with three default key files, only the last one authorized: the
+    # first connection tries them in turn, later ones go straight to it
+    os.environ["HOME"] = str(scratch)
+    os.environ.pop("SSH_AUTH_SOCK", None)
+    key_server = FakeSSHServer(
+        latency=rtt_ms / 1000, public_key=make_keys(scratch / ".ssh")
+    )
+    host, port = key_server.address
+
+    def connect():
+        pool = SessionPool()
+        pool.acquire(host, "bench", port).close()
+        pool.close_all()
+
+    print("🔑 connecting with ~/.ssh/id_{rsa,ecdsa,ed25519}, ed25519 authorized")
+    for label in ("first connection:", "credential cached:"):
+        before = key_server.auth_attempts
+        elapsed = timed(connect)
+        attempts = key_server.auth_attempts - before
+        print(f"   {label:19} {elapsed:8.1f} ms, {attempts} auth attempts")
+
+
+if __name__ == "__main__":
+    main()
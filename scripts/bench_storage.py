@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""Time inventory loads on a synthetic inventory (JSON and binary snapshot).
+
+Usage: ./scripts/bench_storage.py [hosts] [repeats]
+"""
+
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from cosmonaut.cli.inventory import LIST_FIELDS
+from cosmonaut.cli.map import GRAPH_FIELDS
+from cosmonaut.storage import clear_cache, open_backend
+
+OS_NAMES = ["Ubuntu 22.04.4 LTS", "Debian GNU/Linux 12 (bookworm)", "Rocky Linux 9.3"]
+
+
+def synthetic_servers(count: int) -> dict:
+    """Build `count` host records shaped like the ones ssh specs records."""
+    rng = random.Random(42)
+    now = datetime.now().isoformat()
+    servers = {}
+    for i in range(count):
+        ip = f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"
+        servers[ip] = {
+            "ip": ip,
+            "first_seen": now,
+            "last_seen": now,
+            "hostname": f"host-{i}.example.internal",
+            "specs": {
+                "Hostname": f"host-{i}",
+                "OS": rng.choice(OS_NAMES),
+                "Kernel": "6.1.0-18-amd64",
+                "Architecture": "x86_64",
+                "Uptime": f"up {rng.randint(1, 400)} days",
+                "CPU Cores": str(rng.choice([2, 4, 8, 16])),
+                "Memory Free": f"{rng.randint(1, 64)}Gi",
+                "Disk Root Free": "42G (58%)",
+                "Public IP": "203.0.113.7",
+                "Users Logged In": "0",
+                "outbound_dbs": [f"10.0.9.{rng.randint(1, 20)}"],
+                "outbound_webs": [f"10.0.8.{rng.randint(1, 50)}" for _ in range(5)],
+            },
+            "websites": [f"site{i}-{n}.example.com" for n in range(rng.randint(0, 6))],
+            "sources": ["network-scan", "ssh-enriched"],
+            "tags": [],
+        }
+    return servers
+
+
+def timed(fn, repeats: int) -> float:
+    """Best wall time of `repeats` calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def peak_mb(fn) -> float:
+    """Peak Python heap allocated while running `fn`, in MB."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        backend = open_backend("json", data_dir=data_dir)
+        servers = synthetic_servers(hosts)
+        backend.save(servers)
+        open_backend("binary", data_dir=data_dir).save(servers)
+        del servers
+        size_mb = backend.path.stat().st_size / 1e6
+
+        def cold():
+            clear_cache()
+            backend.load()
+
+        backend.load()
+        cold_ms = timed(cold, repeats)
+        backend.load()
+        warm_ms = timed(backend.load, repeats)
+
+        print(f"📦 {hosts} hosts, {size_mb:.1f} MB servers.json")
+        print(f"🧊 cold load (read + parse): {cold_ms:9.2f} ms")
+        print(f"🔥 warm load (cache hit):    {warm_ms:9.2f} ms")
+        print(f"⚡ speedup: {cold_ms / warm_ms:.0f}x")
+
+        # Cold reads per on-disk format: a fresh backend and an empty parse
+        # cache every time, so nothing is reused between runs
+        bin_mb = (data_dir / "servers.bin").stat().st_size / 1e6
+        print(f"\n💾 servers.json {size_mb:.1f} MB vs servers.bin {bin_mb:.1f} MB")
+        print(
+            f"{'cold read':<28}{'json ms':>10}{'bin ms':>10}{'json MB':>10}{'bin MB':>10}"
+        )
+
+        reads = {
+            "full load": lambda b: b.load(),
+            "inventory (listing fields)": lambda b: b.project(LIST_FIELDS),
+            "map graph (graph fields)": lambda b: b.project(GRAPH_FIELDS),
+            "single host": lambda b: b.get("10.0.0.7"),
+        }
+        for label, read in reads.items():
+            row = []
+            for name in ("json", "binary"):
+
+                def run():
+                    clear_cache()
+                    read(open_backend(name, data_dir=data_dir))
+
+                row.append((timed(run, repeats), peak_mb(run)))
+            (json_ms, json_mb), (bin_ms, bin_mb) = row
+            print(
+                f"{label:<28}{json_ms:>10.1f}{bin_ms:>10.1f}{json_mb:>10.1f}{bin_mb:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
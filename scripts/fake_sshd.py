@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+"""In-process SSH server for benchmarks, with optional injected latency.
+
+Accepts any password (or, given a public key, only that key) and runs
+exec requests with the local /bin/sh, so commands behave like on a real
+Linux host. With latency > 0 all traffic
+goes through a proxy that delays every chunk by latency/2 each way, so
+each round trip (handshake, auth, channel open, exec) costs one RTT.
+
+Usage: ./scripts/fake_sshd.py [port] [rtt_ms]
+"""
+
+import heapq
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import paramiko
+
+_host_key = None
+
+
+def host_key() -> paramiko.PKey:
+    global _host_key
+    if _host_key is None:
+        _host_key = paramiko.RSAKey.generate(2048)
+    return _host_key
+
+
+class _Handler(paramiko.ServerInterface):
+    def __init__(self, server: "FakeSSHServer"):
+        self.server = server
+
+    def check_auth_password(self, username, password):
+        self.server.auth_attempts += 1
+        if self.server.public_key:
+            return paramiko.AUTH_FAILED
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_none(self, username):
+        if self.server.public_key:
+            return paramiko.AUTH_FAILED
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_publickey(self, username, key):
+        self.server.auth_attempts += 1
+        if self.server.public_key and key == self.server.public_key:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return "publickey" if self.server.public_key else "password,none"
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED_OPEN_REQUEST
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(
+            target=_run, args=(channel, command.decode()), daemon=True
+        ).start()
+        return True
+
+
+def _run(channel, command: str):
+    # Output is passed on as the command writes it, like sshd. Once the
+    # client closes the channel the next write fails and the command is
+    # killed, as the real one would die of SIGPIPE.
+    try:
+        proc = subprocess.Popen(
+            ["/bin/sh", "-c", command], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except OSError:
+        channel.send_exit_status(255)
+        channel.close()
+        return
+
+    def relay(stream, send):
+        try:
+            while chunk := stream.read1(32768):
+                send(chunk)
+        except OSError:
+            proc.kill()
+
+    errors = threading.Thread(
+        target=relay, args=(proc.stderr, channel.sendall_stderr), daemon=True
+    )
+    errors.start()
+    try:
+        relay(proc.stdout, channel.sendall)
+        errors.join()
+        channel.send_exit_status(proc.wait(timeout=60))
+    except Exception:
+        proc.kill()
+        channel.send_exit_status(255)
+    finally:
+        channel.close()
+
+
+class FakeSSHServer:
+    """SSH server on 127.0.0.1 running in background threads."""
+
+    def __init__(
+        self, port: int = 0, latency: float = 0.0, public_key: paramiko.PKey = None
+    ):
+        self.public_key = public_key
+        self.auth_attempts = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", port))
+        self.sock.listen(64)
+        self.connections = 0
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+        # Clients connect to the proxy when latency is injected
+        self.proxy = LatencyProxy(self.port, latency) if latency else None
+
+    @property
+    def address(self) -> tuple:
+        return ("127.0.0.1", self.proxy.port if self.proxy else self.port)
+
+    def _accept(self):
+        while True:
+            conn, _ = self.sock.accept()
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        transport = paramiko.Transport(conn)
+        transport.add_server_key(host_key())
+        try:
+            transport.start_server(server=_Handler(self))
+        except (paramiko.SSHException, EOFError):
+            return
+        # Hold on to channels: paramiko closes them when they're collected
+        channels = []
+        while transport.is_active():
+            channel = transport.accept(timeout=1)
+            if channel is not None:
+                channels = [c for c in channels if not c.closed] + [channel]
+
+
+class LatencyProxy:
+    """TCP proxy to 127.0.0.1:`target_port` adding `latency`/2 per direction."""
+
+    def __init__(self, target_port: int, latency: float):
+        self.target_port = target_port
+        self.delay = latency / 2
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(64)
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self.sock.accept()
+            upstream = socket.create_connection(("127.0.0.1", self.target_port))
+            for src, dst in ((client, upstream), (upstream, client)):
+                src.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                threading.Thread(
+                    target=self._pipe, args=(src, dst), daemon=True
+                ).start()
+
+    def _pipe(self, src, dst):
+        """Forward src -> dst, releasing each chunk `delay` after it arrived."""
+        queue = []
+        ready = threading.Condition()
+        done = []
+
+        def send():
+            while True:
+                with ready:
+                    while not queue and not done:
+                        ready.wait()
+                    if not queue:
+                        break
+                    due, _, data = queue[0]
+                    wait = due - time.monotonic()
+                    if wait > 0:
+                        ready.wait(wait)
+                        continue
+                    heapq.heappop(queue)
+                try:
+                    dst.sendall(data)
+                except OSError:
+                    break
+            try:
+                dst.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+        threading.Thread(target=send, daemon=True).start()
+        count = 0
+        while True:
+            try:
+                data = src.recv(65536)
+            except OSError:
+                data = b""
+            with ready:
+                if not data:
+                    done.append(True)
+                    ready.notify()
+                    return
+                count += 1
+                heapq.heappush(queue, (time.monotonic() + self.delay, count, data))
+                ready.notify()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 2222
+    rtt_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    server = FakeSSHServer(port=port, latency=rtt_ms / 1000)
+    host, listen = server.address
+    print(f"🛰️ Fake sshd on {host}:{listen} (RTT {rtt_ms:.0f} ms), any password")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
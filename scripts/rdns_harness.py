@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""Exercise the reverse DNS resolver and its cache against a stub server.
+
+The stub answers PTR queries for 127.0.0.0/16 after an injected delay:
+127.0.X.Y is host-X-Y.test (TTL 60), except that Y ending in 0 gets
+NXDOMAIN (SOA minimum 30), in 8 SERVFAIL and in 9 no answer at all.
+
+Usage: ./scripts/rdns_harness.py [addresses] [delay_ms]
+"""
+
+import asyncio
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from cosmonaut.discovery.rdns import RdnsCache, Resolver, reverse_dns_async
+
+
+def encode_name(name: str) -> bytes:
+    return b"".join(bytes([len(p)]) + p.encode() for p in name.split(".")) + b"\0"
+
+
+class StubDNS(asyncio.DatagramProtocol):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.queries = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.queries += 1
+        asyncio.ensure_future(self.answer(data, addr))
+
+    async def answer(self, query: bytes, addr):
+        await asyncio.sleep(self.delay)
+        qid = struct.unpack_from("!H", query)[0]
+        end = query.index(b"\0", 12) + 5
+        question = query[12:end]
+        labels, offset = [], 12
+        while query[offset]:
+            labels.append(query[offset + 1 : offset + 1 + query[offset]].decode())
+            offset += 1 + query[offset]
+        y, x = int(labels[0]), int(labels[1])
+
+        if y % 10 == 9:
+            return  # lost
+        if y % 10 == 8:
+            header = struct.pack("!6H", qid, 0x8182, 1, 0, 0, 0)
+            self.transport.sendto(header + question, addr)
+            return
+        if y % 10 == 0:
+            # NXDOMAIN with the zone's SOA; its owner name points at the
+            # question's "in-addr.arpa" (compression)
+            zone = 12 + sum(1 + len(label) for label in labels[:2])
+            soa = encode_name("ns.test") + encode_name("admin.test")
+            soa += struct.pack("!5I", 1, 3600, 600, 86400, 30)
+            record = struct.pack("!HHHIH", 0xC000 | zone, 6, 1, 300, len(soa)) + soa
+            header = struct.pack("!6H", qid, 0x8183, 1, 0, 1, 0)
+            self.transport.sendto(header + question + record, addr)
+            return
+        ptr = encode_name(f"host-{x}-{y}.test")
+        # Owner name: a pointer to the question name at offset 12
+        record = struct.pack("!HHHIH", 0xC00C, 12, 1, 60, len(ptr)) + ptr
+        header = struct.pack("!6H", qid, 0x8180, 1, 1, 0, 0)
+        self.transport.sendto(header + question + record, addr)
+
+
+def expected(ip: str):
+    x, y = map(int, ip.split(".")[2:])
+    return None if y % 10 in (0, 8, 9) else f"host-{x}-{y}.test"
+
+
+def check(label: str, ok: bool, detail: str = ""):
+    print(f"{'✅' if ok else '❌'} {label}{f' ({detail})' if detail else ''}")
+    if not ok:
+        check.failed = True
+
+
+check.failed = False
+
+
+async def main(count: int, delay: float):
+    loop = asyncio.get_running_loop()
+    stub = StubDNS(delay)
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: stub, local_addr=("127.0.0.1", 0)
+    )
+    server = transport.get_extra_info("sockname")
+    ips = [f"127.0.{i // 250}.{i % 250 + 1}" for i in range(count)]
+    cache = RdnsCache(Path(tempfile.mkdtemp()) / "rdns.json")
+
+    def resolver():
+        return Resolver([server], timeout=0.5, attempts=2)
+
+    start = time.perf_counter()
+    names = await reverse_dns_async(ips, cache, resolver())
+    elapsed = time.perf_counter() - start
+    wrong = [ip for ip in ips if names[ip] != expected(ip)]
+    check(
+        f"{count} lookups",
+        not wrong,
+        f"{elapsed:.2f}s at {delay * 1000:.0f} ms per answer, {stub.queries} queries"
+        + (f", wrong: {wrong[:3]}" if wrong else ""),
+    )
+
+    # Answers and NXDOMAINs are cached; lost and failed lookups are asked
+    # again next time
+    unanswered = sum(1 for ip in ips if int(ip.split(".")[3]) % 10 in (8, 9))
+    stub.queries = 0
+    start = time.perf_counter()
+    again = await reverse_dns_async(ips, cache, resolver())
+    check(
+        "rescan served from the cache",
+        again == names and stub.queries == 2 * unanswered,
+        f"{time.perf_counter() - start:.2f}s, {stub.queries} queries"
+        f" for {unanswered} unanswered",
+    )
+
+    # TTLs: NXDOMAIN expires after the SOA minimum (30 s), names after 60 s
+    fresh_later = RdnsCache(cache.path).fresh(ips, now=time.time() + 45)
+    check(
+        "TTLs respected",
+        fresh_later
+        and all(name for name in fresh_later.values())
+        and not RdnsCache(cache.path).fresh(ips, now=time.time() + 61),
+        f"{len(fresh_later)} still fresh after 45 s, none after 61 s",
+    )
+
+    transport.close()
+    return 1 if check.failed else 0
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    delay_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    sys.exit(asyncio.run(main(count, delay_ms / 1000)))
@@ -1,9 +1,10 @@
 #!/usr/bin/env python
-import json
 import subprocess
 import sys
 from pathlib import Path
 
+from cosmonaut.storage import open_backend
+
 
 def main():
     if len(sys.argv) < 2:
@@ -13,22 +14,19 @@ def main():
 
     command_template = " ".join(sys.argv[1:])
 
-    # Construct the path to servers.json relative to the script's location
+    # Construct the path to data/ relative to the script's location
     script_dir = Path(__file__).parent.absolute()
-    servers_json_path = script_dir.parent / "data" / "servers.json"
+    data_dir = script_dir.parent / "data"
 
-    if not servers_json_path.exists():
-        print(f"Error: {servers_json_path} not found.")
+    if not data_dir.exists():
+        print(f"Error: {data_dir} not found.")
         sys.exit(1)
 
-    with open(servers_json_path, "r") as f:
-        servers_data = json.load(f)
-
-    if not servers_data:
-        print("No servers found in data/servers.json.")
-        return
-
-    for ip in servers_data.keys():
+    # Streams whichever backend COSMONAUT_STORAGE selects (json by default),
+    # so the first command runs before the whole inventory is parsed
+    count = 0
+    for ip, _ in open_backend(data_dir=data_dir).iter_items():
+        count += 1
         # Replace {} with the IP address
         command_to_run = command_template.replace("{}", ip)
         print(f"🚀 Running on {ip}: {command_to_run}")
@@ -44,6 +42,9 @@ def main():
             print(f"❌ Error running command on {ip}: {e}")
             print(f"Stderr: {e.stderr}")
 
+    if not count:
+        print(f"No servers found in {data_dir}.")
+
 
 if __name__ == "__main__":
     main()
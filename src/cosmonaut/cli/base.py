@@ -1,5 +1,6 @@
 # src/cosmonaut/cli/base.py
 import typer
+from pathlib import Path
 from typing import Optional
 
 # Import the ssh command group
@@ -8,13 +9,10 @@ from cosmonaut.cli.web import app as web_app
 from cosmonaut.cli.map import app as map_app
 from cosmonaut.cli.investigate import app as investigate_app
 from cosmonaut.cli.discover import app as discover_app
+from cosmonaut.cli.inventory import app as inventory_app
 from cosmonaut.explain.explain import explain_app
 from cosmonaut.meta import __version__, __app_name__
 
-from rich.table import Table
-from rich.console import Console
-from cosmonaut.storage import load_servers
-
 # Main app
 app = typer.Typer(help="🚀 Cosmonaut - Digital Universe Explorer")
 
@@ -24,37 +22,10 @@ app.add_typer(web_app, name="web")
 app.add_typer(investigate_app, name="investigate")
 app.add_typer(map_app, name="map")
 app.add_typer(discover_app, name="discover")
+app.add_typer(inventory_app, name="inventory")
 app.add_typer(explain_app, name="explain")
 
 
-@app.command("inventory")
-def inventory():
-    """Show all discovered servers."""
-
-    console = Console()
-    servers = load_servers()
-
-    if not servers:
-        console.print("📭 No servers discovered yet.")
-        return
-
-    table = Table("IP", "Hostname", "Last Seen", "Sources", "Websites")
-    for server in servers.values():
-        sources = ", ".join(server["sources"]) if server.get("sources") else "unknown"
-        websites = len(server.get("websites", []))
-        last_seen = (
-            server["last_seen"][:16].replace("T", " ")
-            if server.get("last_seen")
-            else "?"
-        )
-
-        table.add_row(
-            server["ip"], server["hostname"], last_seen, sources, str(websites)
-        )
-
-    console.print(table)
-
-
 def version_callback(value: bool):
     if value:
         typer.echo(f"{__app_name__} v{__version__}")
@@ -63,13 +34,39 @@ def version_callback(value: bool):
 
 @app.callback()
 def main(
+    ctx: typer.Context,
     version: Optional[bool] = typer.Option(
         None,
         "--version",
         help="Show the application's version and exit.",
         callback=version_callback,
         is_eager=True,
-    )
+    ),
+    trace: Optional[Path] = typer.Option(
+        None,
+        "--trace",
+        dir_okay=False,
+        help="Write SSH timings as a Chrome trace (chrome://tracing, Perfetto).",
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Show the slowest SSH hosts and commands at the end."
+    ),
 ):
     """Application description and docs."""
-    pass
+    if not trace and not profile:
+        return
+
+    from cosmonaut.ssh.trace import tracer
+
+    tracer.enable()
+
+    def report():
+        if profile:
+            from cosmonaut.rendering.console import render_profile
+
+            render_profile(tracer)
+        if trace:
+            tracer.write_chrome_trace(trace)
+            print(f"⏱️ {len(tracer.spans)} spans written to {trace}")
+
+    ctx.call_on_close(report)
@@ -0,0 +1,215 @@
+# src/cosmonaut/cli/inventory.py
+import time
+import typer
+from datetime import datetime
+from pathlib import Path
+from rich.console import Console
+from rich.table import Table
+
+from cosmonaut.storage import (
+    iter_servers,
+    import_json,
+    export_json,
+    compact_journal,
+    find_servers,
+    get_servers,
+    host_history,
+    changes_since,
+    SERVERS_FILE,
+)
+
+app = typer.Typer(help="📦 Show and manage the server inventory")
+
+console = Console()
+
+PAGE_SIZE = 500
+
+# What the listing shows; lets the binary backend skip decoding specs
+LIST_FIELDS = ("ip", "hostname", "last_seen", "sources", "websites")
+
+
+def servers_table(servers, title: str = None) -> Table:
+    """One row per host record."""
+    table = Table("IP", "Hostname", "Last Seen", "Sources", "Websites", title=title)
+    for server in servers:
+        sources = ", ".join(server["sources"]) if server.get("sources") else "unknown"
+        websites = len(server.get("websites", []))
+        last_seen = (
+            server["last_seen"][:16].replace("T", " ")
+            if server.get("last_seen")
+            else "?"
+        )
+
+        table.add_row(
+            server["ip"], server["hostname"], last_seen, sources, str(websites)
+        )
+    return table
+
+
+@app.callback(invoke_without_command=True)
+def inventory(ctx: typer.Context):
+    """Show all discovered servers."""
+    if ctx.invoked_subcommand is not None:
+        return
+
+    # Print a page at a time so large inventories show up immediately
+    shown = 0
+    page = []
+    for _, server in iter_servers(fields=LIST_FIELDS):
+        page.append(server)
+        if len(page) == PAGE_SIZE:
+            console.print(servers_table(page))
+            shown += len(page)
+            page = []
+
+    if page:
+        console.print(servers_table(page))
+    elif not shown:
+        console.print("📭 No servers discovered yet.")
+
+
+@app.command("query")
+def inventory_query(
+    hostname: str = typer.Option(None, "--hostname", "-H", help="Hostname"),
+    domain: str = typer.Option(None, "--domain", "-d", help="Hosted website domain"),
+    tag: str = typer.Option(None, "--tag", "-t", help="Tag"),
+    source: str = typer.Option(None, "--source", "-s", help="Discovery source"),
+    os: str = typer.Option(None, "--os", help="specs OS, e.g. 'Ubuntu 22.04*'"),
+):
+    """
+    Find servers by hostname, domain, tag, source or OS.
+    Matching is case-insensitive; end a value with * for a prefix match.
+    Filters combine with AND.
+    """
+    filters = dict(hostname=hostname, domain=domain, tag=tag, source=source, os=os)
+    if not any(filters.values()):
+        typer.secho(
+            "❌ Give at least one filter, e.g. --domain example.com",
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+
+    start = time.perf_counter()
+    ips = find_servers(**filters)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if not ips:
+        console.print("📭 No matching servers.")
+        return
+
+    servers = get_servers(ips).values()
+    console.print(servers_table(servers, title=f"🔎 {len(ips)} matching servers"))
+    console.print(f"[dim]Query took {elapsed_ms:.2f} ms[/dim]")
+
+
+def show_value(value) -> str:
+    """Compact display of a history value."""
+    if value is None or value == []:
+        return "—"
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+
+@app.command("history")
+def inventory_history(ip: str = typer.Argument(..., help="Host IP")):
+    """Show how a host's specs, hostname and websites changed over time."""
+    entries = host_history(ip)
+    if not entries:
+        console.print(f"📭 No recorded changes for {ip}.")
+        return
+
+    table = Table("When", "Field", "Before", "After", title=f"🕰️ History of {ip}")
+    for entry in entries:
+        when = entry["at"][:16].replace("T", " ")
+        if entry.get("new"):
+            when += " 🆕"
+        for field, (before, after) in sorted(entry["changes"].items()):
+            table.add_row(when, field, show_value(before), show_value(after))
+            when = ""
+    console.print(table)
+
+
+@app.command("diff")
+def inventory_diff(
+    since: str = typer.Option(
+        ..., "--since", help="ISO date or time, e.g. 2024-05-01 or 2024-05-01T12:00"
+    ),
+):
+    """Show what changed across the inventory since a date."""
+    try:
+        since_dt = datetime.fromisoformat(since)
+    except ValueError:
+        typer.secho(f"❌ Invalid date: {since}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+    hosts = changes_since(since_dt)
+    if not hosts:
+        console.print(f"✅ Nothing changed since {since}.")
+        return
+
+    new = [ip for ip, host in hosts.items() if host["new"]]
+    table = Table("IP", "Field", "Before", "After", title=f"🔀 Changes since {since}")
+    for ip, host in sorted(hosts.items()):
+        if host["new"]:
+            table.add_row(ip, "🆕 new host", "", "")
+            continue
+        label = ip
+        for field, (before, after) in sorted(host["changes"].items()):
+            table.add_row(label, field, show_value(before), show_value(after))
+            label = ""
+    console.print(table)
+    console.print(
+        f"[dim]{len(hosts) - len(new)} changed, {len(new)} new since {since}[/dim]"
+    )
+
+
+@app.command("import")
+def inventory_import(
+    source: Path = typer.Argument(
+        SERVERS_FILE, exists=True, dir_okay=False, help="servers.json to import"
+    ),
+    backend: str = typer.Option(
+        None, "--backend", "-b", help="Target backend (json, sqlite, journal or binary)"
+    ),
+):
+    """Import a servers.json document into the inventory backend."""
+    try:
+        count = import_json(source, backend=backend)
+    except ValueError as e:
+        typer.secho(f"❌ {e}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+    console.print(f"💾 Imported {count} servers from [bold]{source}[/bold]")
+
+
+@app.command("export")
+def inventory_export(
+    output: Path = typer.Option(
+        None, "--output", "-o", help="Write JSON here instead of stdout"
+    ),
+    backend: str = typer.Option(
+        None, "--backend", "-b", help="Source backend (json, sqlite, journal or binary)"
+    ),
+):
+    """Export the inventory as servers.json-style JSON."""
+    try:
+        content = export_json(output, backend=backend)
+    except ValueError as e:
+        typer.secho(f"❌ {e}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+    if output:
+        console.print(f"📤 Inventory exported to [bold]{output}[/bold]")
+    else:
+        print(content)
+
+
+@app.command("compact")
+def inventory_compact():
+    """Fold the journal (data/servers.journal) into servers.json."""
+    entries = compact_journal()
+    if entries:
+        console.print(f"🗜️ Folded {entries} journal entries into the snapshot")
+    else:
+        console.print("✅ Journal is empty, nothing to compact")
@@ -18,7 +18,7 @@ def investigate_processes(
     user_filter: str = typer.Option(None, "--user", "-u", help="Filter by user"),
 ):
     """List top running processes by memory usage."""
-    from cosmonaut.ssh.client import connect_ssh
+    from cosmonaut.ssh.client import connect_ssh, run_command
 
     if "@" not in target:
         typer.secho("❌ Format: user@host", fg=typer.colors.RED)
@@ -37,8 +37,7 @@ def investigate_processes(
         ps_cmd += f" | grep {user_filter}"
     ps_cmd += f" | head -{top + 1}"
 
-    _, stdout, _ = client.exec_command(ps_cmd)
-    output = stdout.read().decode().strip()
+    output = run_command(client, ps_cmd)
 
     if not output:
         console.print("📭 No processes found.")
@@ -68,7 +67,7 @@ def investigate_services(
     target: str = typer.Argument(..., help="user@host"),
 ):
     """List active systemd services."""
-    from cosmonaut.ssh.client import connect_ssh
+    from cosmonaut.ssh.client import connect_ssh, run_command
 
     user, host = target.split("@", 1) if "@" in target else (None, target)
     if not user:
@@ -80,10 +79,10 @@ def investigate_services(
 
     console.print(Panel(f"⚙️ Active Services on {host}", border_style="green"))
 
-    _, stdout, _ = client.exec_command(
-        "systemctl list-units --type=service --state=active --no-pager | head -20"
+    services = run_command(
+        client,
+        "systemctl list-units --type=service --state=active --no-pager | head -20",
     )
-    services = stdout.read().decode().strip()
 
     if not services:
         console.print("📭 No active services found.")
@@ -100,7 +99,7 @@ def investigate_cron(
     ),
 ):
     """List all cron jobs in a clean table."""
-    from cosmonaut.ssh.client import connect_ssh
+    from cosmonaut.ssh.client import connect_ssh, run_command
 
     if "@" not in target:
         typer.secho("❌ Format: user@host", fg=typer.colors.RED)
@@ -116,7 +115,7 @@ def investigate_cron(
     table = Table("User", "Schedule", "Command", "Type", title="Scheduled Tasks")
 
     def run(cmd):
-        return client.exec_command(cmd)[1].read().decode().strip()
+        return run_command(client, cmd)
 
     # Helper: parse crontab lines
     def add_jobs(jobs: str, user: str, job_type: str):
@@ -180,7 +179,7 @@ def investigate_databases(
     target: str = typer.Argument(..., help="user@host"),
 ):
     """Check for all common databases (running or configured)."""
-    from cosmonaut.ssh.client import connect_ssh
+    from cosmonaut.ssh.client import connect_ssh, run_command
 
     if "@" not in target:
         typer.secho("❌ Format: user@host", fg=typer.colors.RED)
@@ -197,8 +196,7 @@ def investigate_databases(
 
     def run(cmd):
         try:
-            _, stdout, _ = client.exec_command(cmd)
-            return stdout.read().decode().strip()
+            return run_command(client, cmd)
         except:
             return ""
 
@@ -252,7 +250,7 @@ def investigate_runtimes(
     target: str = typer.Argument(..., help="user@host"),
 ):
     """Check all installed runtimes, frameworks, and containers."""
-    from cosmonaut.ssh.client import connect_ssh
+    from cosmonaut.ssh.client import connect_ssh, run_command
 
     if "@" not in target:
         typer.secho("❌ Format: user@host", fg=typer.colors.RED)
@@ -269,8 +267,7 @@ def investigate_runtimes(
 
     def run(cmd):
         try:
-            _, stdout, _ = client.exec_command(cmd)
-            return stdout.read().decode().strip()
+            return run_command(client, cmd)
         except:
             return ""
 
@@ -335,7 +332,7 @@ def investigate_security(
     target: str = typer.Argument(..., help="user@host"),
 ):
     """Check SSH authorized keys and sudo access."""
-    from cosmonaut.ssh.client import connect_ssh
+    from cosmonaut.ssh.client import connect_ssh, run_command
 
     user, host = target.split("@", 1)
     client = connect_ssh(host=host, user=user)
@@ -345,7 +342,7 @@ def investigate_security(
     console.print(Panel("🔐 Security Audit", border_style="red"))
 
     def run(cmd):
-        return client.exec_command(cmd)[1].read().decode().strip()
+        return run_command(client, cmd)
 
     # Authorized keys
     keys = run("cat ~/.ssh/authorized_keys 2>/dev/null | wc -l")
@@ -371,7 +368,7 @@ def investigate_traffic(
     target: str = typer.Argument(..., help="user@host"),
 ):
     """Show recent outbound connections (DNS & IPs)."""
-    from cosmonaut.ssh.client import connect_ssh
+    from cosmonaut.ssh.client import connect_ssh, run_command
 
     user, host = target.split("@", 1)
     client = connect_ssh(host=host, user=user)
@@ -386,7 +383,7 @@ def investigate_traffic(
     )
 
     def run(cmd):
-        return client.exec_command(cmd)[1].read().decode().strip()
+        return run_command(client, cmd)
 
     # Extract recent outbound connections
     # Parse /proc/net/{tcp,udp} or use ss
@@ -447,7 +444,7 @@ def investigate_connections(
     target: str = typer.Argument(..., help="user@host"),
 ):
     """Show current network connections (inbound & outbound)."""
-    from cosmonaut.ssh.client import connect_ssh
+    from cosmonaut.ssh.client import connect_ssh, run_command
 
     user, host = target.split("@", 1)
     client = connect_ssh(host=host, user=user)
@@ -459,7 +456,7 @@ def investigate_connections(
     table = Table("Proto", "Local", "Remote", "State", "Process")
 
     def run(cmd):
-        return client.exec_command(cmd)[1].read().decode().strip()
+        return run_command(client, cmd)
 
     # ss -tup state established
     output = run("ss -tup state established 2>/dev/null || echo")
@@ -492,7 +489,7 @@ def investigate_firewall(
     target: str = typer.Argument(..., help="user@host"),
 ):
     """Show firewall rules (iptables or nftables)."""
-    from cosmonaut.ssh.client import connect_ssh
+    from cosmonaut.ssh.client import connect_ssh, run_command
     from rich.panel import Panel
 
     user, host = target.split("@", 1)
@@ -503,7 +500,7 @@ def investigate_firewall(
     console.print("\n[bold yellow]🛡️ Firewall Configuration[/bold yellow]\n")
 
     def run(cmd):
-        return client.exec_command(cmd)[1].read().decode().strip()
+        return run_command(client, cmd)
 
     # Check for iptables
     iptables = run("sudo iptables -L -n -v 2>/dev/null | head -20 || echo 'not found'")
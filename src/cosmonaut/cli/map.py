@@ -1,21 +1,45 @@
 # src/cosmonaut/cli/map.py
 import typer
+import asyncio
+import ipaddress
 import json
+import signal
 from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 
-from cosmonaut.discovery.hostname import get_hostname_via_ssh
-from cosmonaut.discovery.network import scan_network
+from cosmonaut.discovery.checkpoint import ScanCheckpoint
+from cosmonaut.discovery.incremental import BUDGET, MAX_HOSTS, plan_scan
+from cosmonaut.discovery.sweep import RATE, network_hosts
+from cosmonaut.discovery.topology import WORKERS, discover_topology
 from cosmonaut.discovery.dependencies import detect_dependencies
 from cosmonaut.rendering.graph import generate_dot, generate_json
-from cosmonaut.storage import record_server, load_servers
+from cosmonaut.storage import inventory_batch, load_servers
 
 
 app = typer.Typer(help="🌌 Map your digital universe")
 
 console = Console()
 
+# All that dependency detection and graph rendering read from a record
+GRAPH_FIELDS = ("ip", "hostname", "specs.outbound_dbs", "specs.outbound_webs")
+
+
+async def _until_hangup(coro):
+    """Await `coro`, cancelling it on SIGHUP or SIGTERM.
+
+    A dropped SSH session then stops the scan the way Ctrl-C does, and
+    it saves its progress on the way out.
+    """
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for name in ("SIGHUP", "SIGTERM"):
+        try:
+            loop.add_signal_handler(getattr(signal, name), task.cancel)
+        except (AttributeError, NotImplementedError):
+            pass  # not on this platform
+    return await coro
+
 
 @app.command("topology")
 def map_topology(
@@ -23,40 +47,147 @@ def map_topology(
     user: str = typer.Option(None, "--user", "-u", help="SSH user for enrichment"),
     key: str = typer.Option(None, "--key", "-k", help="SSH key file"),
     password: bool = typer.Option(False, "--password", "-P", help="Use password auth"),
+    probe: str = typer.Option(
+        None, "--probe", help="auto, icmp, ping or tcp (ports 22/80/443)"
+    ),
+    rate: float = typer.Option(RATE, "--rate", help="New probes per second"),
+    concurrency: int = typer.Option(
+        None, "--concurrency", help="Probes in flight (default: per probe)"
+    ),
+    workers: int = typer.Option(
+        WORKERS, "--workers", "-w", help="Hosts enriched via SSH at a time"
+    ),
+    resume: bool = typer.Option(
+        False, "--resume", help="Continue an interrupted scan of this network"
+    ),
+    incremental: bool = typer.Option(
+        False, "--incremental", help="Probe known-alive and unknown addresses first"
+    ),
+    budget: float = typer.Option(
+        BUDGET, "--budget", help="Seconds of probing for --incremental"
+    ),
 ):
-    """Discover live hosts. Optionally enrich with SSH data."""
-    hosts = scan_network(network)
+    """Discover live hosts. Optionally enrich with SSH data.
+
+    Runs as a pipeline: hosts are resolved and enriched as they answer,
+    while the rest of the network is still being swept. Progress is
+    checkpointed in data/scans/, so an interrupted scan can be picked up
+    with --resume.
+
+    --incremental rescans by probe history and inventory last_seen:
+    recently alive hosts first, then unknown addresses, then a sample of
+    long-dead ones, for at most --budget seconds.
+    """
+    if incremental and resume:
+        typer.secho(
+            "❌ --resume doesn't apply to --incremental scans", fg=typer.colors.RED
+        )
+        raise typer.Exit(1)
+    pwd = typer.prompt("Password", hide_input=True) if user and password else None
+    if user:
+        console.print(
+            "[bold]🔐 Enriching live hosts via SSH as they are found...[/bold]"
+        )
+
+    hosts = []
+    # Record stage; all hosts go to the inventory in one write, which also
+    # happens when the scan is interrupted
+    batch = inventory_batch()
+
+    def record(h):
+        hosts.append(h)
+        if not user:
+            console.print(f"🟢 {h['ip']} ({h['hostname']})")
+            return
+        name = h.get("ssh_hostname")
+        if name:
+            h["hostname"] = name
+            batch.record(ip=h["ip"], hostname=name, source="ssh-enriched")
+        else:
+            # Keep DNS name
+            batch.record(ip=h["ip"], hostname=h["hostname"], source="network-scan")
+        console.print(f"✅ {h['ip']} → {h['hostname']}")
+
+    try:
+        checkpoint = plan = None
+        if incremental:
+            plan = plan_scan(network_hosts(network, MAX_HOSTS), budget=budget)
+            console.print(
+                f"🧭 Incremental scan: {len(plan.recent)} recently alive,"
+                f" {len(plan.unknown)} unknown, {len(plan.due)} dead due a recheck"
+                f" ({plan.skipped} skipped), within {budget:g}s"
+            )
+        elif resume:
+            checkpoint = ScanCheckpoint.load(network)
+            if not checkpoint:
+                console.print(
+                    f"📭 No interrupted scan of {network}, starting from scratch."
+                )
+                checkpoint = ScanCheckpoint(network)
+            else:
+                console.print(
+                    f"⏩ Resuming: {checkpoint.probed_count()} addresses already probed,"
+                    f" {len(checkpoint.alive)} live hosts found so far"
+                )
+        else:
+            checkpoint = ScanCheckpoint(network)
+            if checkpoint.exists():
+                console.print(
+                    "⚠️ Starting over; use --resume to continue the interrupted scan."
+                )
+        asyncio.run(
+            _until_hangup(
+                discover_topology(
+                    network,
+                    record,
+                    user=user,
+                    key_file=key,
+                    password=pwd,
+                    probe=probe,
+                    concurrency=concurrency,
+                    rate=rate,
+                    workers=workers,
+                    checkpoint=checkpoint,
+                    plan=plan,
+                )
+            )
+        )
+    except ValueError as e:
+        typer.secho(f"❌ {e}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        batch.commit()
+        if incremental:
+            hint = "liveness of the addresses probed so far is in the probe history"
+        else:
+            hint = f"`map topology {network} --resume` continues the scan"
+        typer.secho(f"\n⏸️ Interrupted; {hint}", fg=typer.colors.YELLOW)
+        if user:
+            console.print(f"💾 Recorded {len(batch.records)} servers found so far")
+        raise typer.Exit(130)
+    batch.commit()
+
     if not hosts:
         console.print("📭 No hosts found.")
         return
 
     table = Table("IP", "Hostname", "Status")
-    for h in hosts:
+    for h in sorted(hosts, key=lambda h: ipaddress.ip_address(h["ip"])):
         table.add_row(h["ip"], h["hostname"], h["status"])
 
     console.print(table)
 
-    # Enrich via SSH if requested
     if user:
-        console.print("\n[bold]🔐 Connecting via SSH to enrich data...[/bold]")
-        for h in hosts:
-            name = get_hostname_via_ssh(h["ip"], user, key, password)
-            if name:
-                h["hostname"] = name
-                record_server(ip=h["ip"], hostname=name, source="ssh-enriched")
-                console.print(f"✅ {h['ip']} → {name}")
-            else:
-                # Keep DNS name
-                record_server(ip=h["ip"], hostname=h["hostname"], source="network-scan")
-                console.print(f"✅ {h['ip']} → {h['hostname']}")
-
-    console.print(f"\n💾 Recorded {len(hosts)} servers in inventory")
+        console.print(
+            f"\n💾 Recorded {len(hosts)} servers in inventory"
+            f" ({len(batch.changed)} changed)"
+        )
 
 
 @app.command("dependencies")
 def map_dependencies():
     """Show likely service dependencies."""
-    servers = list(load_servers().values())
+    servers = list(load_servers(fields=GRAPH_FIELDS).values())
     if not servers:
         console.print("📭 No servers in inventory. Run `cosmonaut map topology` first.")
         return
@@ -77,7 +208,7 @@ def graph(
     format: str = typer.Option("dot", "--format", "-f", help="dot or json"),
 ):
     """Generate a graph of your infrastructure."""
-    servers = list(load_servers().values())
+    servers = list(load_servers(fields=GRAPH_FIELDS).values())
     if not servers:
         console.print("📭 No data. Discover servers first.")
         return
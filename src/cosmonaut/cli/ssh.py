@@ -3,7 +3,7 @@ import typer
 from pathlib import Path
 import ipaddress
 
-from cosmonaut.storage import record_server
+from cosmonaut.storage import inventory_batch
 
 app = typer.Typer(help="🔐 SSH commands")
 
@@ -21,6 +21,9 @@ def specs(
     port: int = typer.Option(22, "--port", "-p"),
     key: Path = typer.Option(None, "--key", "-k", exists=True, dir_okay=False),
     password: bool = typer.Option(False, "--password", "-P"),
+    jump: str = typer.Option(
+        None, "--jump", "-J", help="Bastion to go through: [user@]host[:port]"
+    ),
 ):
     """
     Connect to a server and show real system specifications.
@@ -43,7 +46,8 @@ def specs(
     if password:
         pwd = typer.prompt("Password", hide_input=True)
 
-    console.print(f"🔐 Connecting to [bold]{user}@{host}[/bold]...")
+    via = f" via [bold]{jump}[/bold]" if jump else ""
+    console.print(f"🔐 Connecting to [bold]{user}@{host}[/bold]{via}...")
 
     client = connect_ssh(
         host=host,
@@ -51,6 +55,7 @@ def specs(
         port=port,
         key_file=str(key) if key else None,
         password=pwd,
+        jump=jump,
     )
 
     if not client:
@@ -68,10 +73,18 @@ def specs(
         # Only record if 'host' is an IP address
         ipaddress.ip_address(host)
         # Record to data/servers.json
-        record_server(
-            ip=host, hostname=specs_data.get("Hostname", "unknown"), specs=specs_data
-        )
-        console.print(f"💾 Server [cyan]{host}[/cyan] recorded in data/servers.json")
+        with inventory_batch() as batch:
+            batch.record(
+                ip=host,
+                hostname=specs_data.get("Hostname", "unknown"),
+                specs=specs_data,
+            )
+        if batch.changed:
+            console.print(
+                f"💾 Server [cyan]{host}[/cyan] recorded in data/servers.json"
+            )
+        else:
+            console.print(f"💾 Server [cyan]{host}[/cyan] unchanged, last seen updated")
     except ipaddress.AddressValueError:
         # host is a domain name (e.g., myserver.com), not an IP
         console.print(
@@ -86,6 +99,296 @@ def specs(
     render_specs(target=target, specs=specs_data)
 
 
+@app.command("specs-all")
+def specs_all(
+    cidr: str = typer.Option(None, "--cidr", "-c", help="Every host of a network"),
+    hosts_file: Path = typer.Option(
+        None,
+        "--file",
+        "-f",
+        exists=True,
+        dir_okay=False,
+        help="File with one host or user@host per line",
+    ),
+    user: str = typer.Option(None, "--user", "-u", help="SSH user (default: you)"),
+    port: int = typer.Option(22, "--port", "-p"),
+    key: Path = typer.Option(None, "--key", "-k", exists=True, dir_okay=False),
+    password: bool = typer.Option(False, "--password", "-P"),
+    workers: int = typer.Option(256, "--workers", "-w", help="Hosts at a time"),
+    timeout: float = typer.Option(
+        30, "--timeout", "-t", help="Deadline per host in seconds"
+    ),
+    jump: str = typer.Option(
+        None, "--jump", "-J", help="Bastion to go through: [user@]host[:port]"
+    ),
+    retry_down: bool = typer.Option(
+        False, "--retry-down", help="Also try hosts that keep failing"
+    ),
+):
+    """
+    Gather specs from many servers in parallel and record them all at once.
+    Targets come from --cidr, --file or, by default, the inventory. Hosts
+    that failed several runs in a row are skipped until their backoff
+    runs out (see --retry-down).
+    """
+    import asyncio
+    import getpass
+    import time
+    from rich.console import Console
+    from rich.progress import (
+        BarColumn,
+        MofNCompleteColumn,
+        Progress,
+        TextColumn,
+        TimeElapsedColumn,
+    )
+    from rich.table import Table
+    from cosmonaut.ssh.fleet import (
+        collect_fleet_specs,
+        targets_from_cidr,
+        targets_from_file,
+    )
+    from cosmonaut.ssh.pool import parse_jump
+    from cosmonaut.storage import iter_servers
+
+    console = Console()
+
+    if cidr and hosts_file:
+        typer.secho("❌ Use either --cidr or --file", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+    try:
+        if cidr:
+            targets = targets_from_cidr(cidr)
+        elif hosts_file:
+            targets = targets_from_file(hosts_file)
+        else:
+            targets = [ip for ip, _ in iter_servers(fields=("ip",))]
+        if jump:
+            parse_jump(jump, user)
+    except ValueError as e:
+        typer.secho(f"❌ {e}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+    if not targets:
+        console.print("📭 No targets. Give --cidr or --file, or fill the inventory.")
+        return
+
+    user = user or getpass.getuser()
+    pwd = typer.prompt("Password", hide_input=True) if password else None
+
+    console.print(
+        f"🔐 Gathering specs from [bold]{len(targets)}[/bold] hosts"
+        + (f" via [bold]{jump}[/bold]" if jump else "")
+        + f" ({workers} at a time, {timeout:.0f}s deadline each)..."
+    )
+
+    results = []
+    start = time.monotonic()
+    progress = Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    with progress:
+        task = progress.add_task("✅ 0 ❌ 0 ⏭️ 0", total=len(targets))
+
+        counts = {"ok": 0, "failed": 0, "skipped": 0}
+
+        def on_result(result):
+            results.append(result)
+            status = (
+                "ok" if result["ok"] else "skipped" if result["skipped"] else "failed"
+            )
+            counts[status] += 1
+            progress.update(
+                task,
+                advance=1,
+                description=(
+                    f"✅ {counts['ok']} ❌ {counts['failed']}"
+                    f" ⏭️ {counts['skipped']}"
+                ),
+            )
+
+        try:
+            asyncio.run(
+                collect_fleet_specs(
+                    targets,
+                    user,
+                    on_result,
+                    port=port,
+                    key_file=str(key) if key else None,
+                    password=pwd,
+                    workers=workers,
+                    deadline=timeout,
+                    jump=jump,
+                    retry_down=retry_down,
+                )
+            )
+        except KeyboardInterrupt:
+            console.print("⏹️ Interrupted; recording what finished")
+    elapsed = time.monotonic() - start
+
+    # Only IP targets go to the inventory, as with `ssh specs`
+    succeeded = [r for r in results if r["ok"]]
+    recorded = []
+    with inventory_batch() as batch:
+        for r in succeeded:
+            try:
+                ipaddress.ip_address(r["ip"])
+            except ValueError:
+                continue
+            batch.record(
+                ip=r["ip"],
+                hostname=r["specs"].get("Hostname", "unknown"),
+                specs=r["specs"],
+                source="ssh-fleet",
+            )
+            recorded.append(r["ip"])
+
+    failed = [r for r in results if not r["ok"] and not r["skipped"]]
+    skipped = [r for r in results if r["skipped"]]
+    if failed:
+        table = Table("Target", "Error", "Seconds", title=f"❌ {len(failed)} failed")
+        for r in sorted(failed, key=lambda r: r["target"]):
+            table.add_row(r["target"], r["error"], f"{r['seconds']:.1f}")
+        console.print(table)
+
+    if skipped:
+        console.print(
+            f"⏭️ Skipped {len(skipped)} hosts that keep failing"
+            " (--retry-down to try them anyway):"
+        )
+        for r in sorted(skipped, key=lambda r: r["target"])[:10]:
+            console.print(f"   {r['target']}: {r['error']}")
+        if len(skipped) > 10:
+            console.print(f"   ... and {len(skipped) - 10} more")
+
+    durations = sorted(r["seconds"] for r in succeeded)
+    console.print(
+        f"\n✅ {len(succeeded)} succeeded, ❌ {len(failed)} failed,"
+        f" ⏭️ {len(skipped)} skipped in {elapsed:.1f}s"
+    )
+    if durations:
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+        console.print(
+            f"⏱️ per host: median {durations[len(durations) // 2]:.2f}s,"
+            f" p95 {p95:.2f}s, slowest {durations[-1]:.2f}s"
+        )
+    console.print(
+        f"💾 Recorded {len(recorded)} servers in inventory"
+        f" ({len(batch.changed)} changed)"
+    )
+
+
+@app.command("forget")
+def forget(
+    host: str = typer.Argument(..., help="Host whose SSH details to drop"),
+    port: int = typer.Option(22, "--port", "-p"),
+    user: str = typer.Option(
+        None, "--user", "-u", help="Only forget this user's credential"
+    ),
+):
+    """
+    Forget a host's remembered host key and credentials (data/ssh_hosts.json),
+    e.g. after it was reinstalled.
+    """
+    from cosmonaut.ssh.known import get_host_cache
+
+    cache = get_host_cache()
+    if not cache.host_key(host, port) and not cache.credential(user, host, port):
+        print(f"💡 Nothing remembered for {host}:{port}")
+        return
+    cache.forget(host, port, user)
+    what = f"{user}'s credential" if user else "host key and credentials"
+    print(f"🧹 Forgot {what} for {host}:{port}")
+
+
+broker_app = typer.Typer(help="🔌 Background broker that keeps SSH sessions warm")
+app.add_typer(broker_app, name="broker")
+
+
+@broker_app.command("start")
+def broker_start(
+    idle: float = typer.Option(
+        600, "--idle", "-i", help="Seconds to keep sessions (and the broker) alive"
+    ),
+    foreground: bool = typer.Option(
+        False, "--foreground", "-f", help="Run in this terminal"
+    ),
+):
+    """
+    Start the connection broker. While it runs, every command that connects
+    over SSH reuses its authenticated sessions.
+    """
+    import subprocess
+    import sys
+    import time
+    from cosmonaut.ssh import broker
+
+    path = broker.socket_path()
+    if broker.running(path):
+        print(f"✅ Broker already running on {path}")
+        return
+
+    if foreground:
+        print(f"🔌 Broker listening on {path} (Ctrl-C to stop)")
+        try:
+            broker.Broker(path, idle=idle).serve()
+        except KeyboardInterrupt:
+            pass
+        except PermissionError as e:
+            typer.secho(f"❌ {e}", fg=typer.colors.RED)
+            raise typer.Exit(1)
+        return
+
+    subprocess.Popen(
+        [sys.executable, "-m", "cosmonaut.ssh.broker", str(idle)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    for _ in range(50):
+        if broker.running(path):
+            print(f"🔌 Broker started on {path} (idle timeout {idle:.0f}s)")
+            return
+        time.sleep(0.1)
+    typer.secho("❌ Broker did not come up", fg=typer.colors.RED)
+    raise typer.Exit(1)
+
+
+@broker_app.command("stop")
+def broker_stop():
+    """Stop the connection broker and close its sessions."""
+    from cosmonaut.ssh import broker
+
+    if not broker.running():
+        print("💤 Broker is not running")
+        return
+    broker.call("stop")
+    print("🛑 Broker stopped")
+
+
+@broker_app.command("status")
+def broker_status():
+    """Show the broker's warm sessions."""
+    from cosmonaut.ssh import broker
+
+    if not broker.running():
+        print("💤 Broker is not running")
+        return
+    status = broker.call("status")
+    print(
+        f"🔌 Broker pid {status['pid']}, up {status['uptime']:.0f}s,"
+        f" {status['handshakes']} handshakes, idle timeout {status['idle']:.0f}s"
+    )
+    for session in status["sessions"]:
+        print(f"  - {session}")
+
+
 # Test: python -m cosmonaut.cli.ssh
 if __name__ == "__main__":
     app()
@@ -2,13 +2,12 @@
 import typer
 from rich.console import Console
 from rich.table import Table
-import json
 import csv
 from rich.progress import track
 from concurrent.futures import ThreadPoolExecutor
 
-from cosmonaut.ssh.client import connect_ssh
-from cosmonaut.storage import record_server
+from cosmonaut.ssh.client import connect_ssh, run_command
+from cosmonaut.storage import inventory_batch, get_server, list_values
 from cosmonaut.web.utils import get_websites, check_domain
 
 # Create the Typer app for web commands
@@ -102,8 +101,7 @@ def check_websites_from_server(
 
     def run(cmd):
         try:
-            _, stdout, _ = client.exec_command(cmd)
-            return stdout.read().decode().strip()
+            return run_command(client, cmd)
         except Exception:
             return ""
 
@@ -208,13 +206,17 @@ def check_websites_from_server(
     console.print(table)
 
     if domains:
-        record_server(
-            ip=host,
-            # hostname=run("hostname") or "unknown",
-            websites=list(domains),
-            source="web-discovery",
-        )
-        console.print(f"💾 {len(domains)} domains saved to inventory")
+        with inventory_batch() as batch:
+            batch.record(
+                ip=host,
+                # hostname=run("hostname") or "unknown",
+                websites=list(domains),
+                source="web-discovery",
+            )
+        if batch.changed:
+            console.print(f"💾 {len(domains)} domains saved to inventory")
+        else:
+            console.print(f"💾 {len(domains)} domains unchanged, last seen updated")
 
     client.close()
 
@@ -227,18 +229,11 @@ def check_websites_from_file(
     csv_output: bool = typer.Option(False, "--csv", help="Save output to a CSV file."),
 ):
     """
-    Check if hosted websites are reachable via HTTP/HTTPS using the local servers.json file.
+    Check if hosted websites are reachable via HTTP/HTTPS using the local inventory.
     Uses curl to test each domain.
     """
     console = Console()
 
-    try:
-        with open("data/servers.json", "r") as f:
-            servers = json.load(f)
-    except FileNotFoundError:
-        console.print("❌ [bold]data/servers.json[/bold] not found.")
-        raise typer.Exit(1)
-
     websites_to_check = []
     ip_to_check = None
     if target:
@@ -248,16 +243,15 @@ def check_websites_from_file(
             ip_to_check = target
 
     if ip_to_check:
-        if ip_to_check in servers:
-            websites_to_check.extend(servers[ip_to_check].get("websites", []))
+        server = get_server(ip_to_check)
+        if server:
+            websites_to_check.extend(server.get("websites", []))
         else:
-            console.print(
-                f"❌ IP [bold]{ip_to_check}[/bold] not found in [bold]data/servers.json[/bold]."
-            )
+            console.print(f"❌ IP [bold]{ip_to_check}[/bold] not found in inventory.")
             raise typer.Exit(1)
     else:
-        for server_ip, data in servers.items():
-            websites_to_check.extend(data.get("websites", []))
+        # Every hosted domain, straight from the domain index
+        websites_to_check.extend(list_values("domain"))
 
     if not websites_to_check:
         console.print("📭 No websites to check.")
@@ -327,8 +321,7 @@ def list_domains(
 
     def run(cmd):
         try:
-            _, stdout, _ = client.exec_command(cmd)
-            return stdout.read().decode().strip()
+            return run_command(client, cmd)
         except Exception:
             return ""
 
@@ -379,10 +372,14 @@ def list_domains(
     console.print(f"\n✅ Total: {len(domains)} domains")
 
     if domains:
-        record_server(
-            ip=host,
-            # hostname=run("hostname") or "unknown",
-            websites=list(domains),
-            source="web-discovery",
-        )
-        console.print(f"💾 {len(domains)} domains saved to inventory")
+        with inventory_batch() as batch:
+            batch.record(
+                ip=host,
+                # hostname=run("hostname") or "unknown",
+                websites=list(domains),
+                source="web-discovery",
+            )
+        if batch.changed:
+            console.print(f"💾 {len(domains)} domains saved to inventory")
+        else:
+            console.print(f"💾 {len(domains)} domains unchanged, last seen updated")
@@ -0,0 +1,137 @@
+# src/cosmonaut/discovery/checkpoint.py
+import ipaddress
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+from cosmonaut.storage import SCANS_DIR
+from cosmonaut.storage.locking import atomic_write
+
+# Seconds between checkpoint writes while a scan runs; a killed scan
+# loses at most this much work
+SAVE_EVERY = 2.0
+
+
+def merge_intervals(intervals: list, values) -> list:
+    """`intervals` ([[first, last], ...], sorted, inclusive) plus `values`.
+
+    Adjacent and overlapping ranges are joined, so a finished /16 is a
+    single [first, last] pair however out of order its probes completed.
+    """
+    merged = []
+    points = [[v, v] for v in sorted(set(values))]
+    for first, last in sorted(intervals + points):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return merged
+
+
+def outside(intervals: list, addresses):
+    """Yield the `addresses` (sorted strings) not covered by `intervals`."""
+    i = 0
+    for ip in addresses:
+        value = int(ipaddress.ip_address(ip))
+        while i < len(intervals) and intervals[i][1] < value:
+            i += 1
+        if i == len(intervals) or value < intervals[i][0]:
+            yield ip
+
+
+class ScanCheckpoint:
+    """Progress of one network scan, in data/scans/<network>.json.
+
+        {"cidr": "10.0.0.0/16", "started": "...", "updated": "...",
+         "probed": [[167772161, 167837694]],
+         "alive": {"10.0.0.5": {"ip": "10.0.0.5", "hostname": "web-1", ...}}}
+
+    `probed` holds finished addresses as integer ranges. A dead address is
+    finished once its probe comes back; a live one only once the host has
+    been through the whole pipeline and is in `alive`, so hosts caught
+    mid-pipeline by an interruption are probed again on resume.
+    """
+
+    def __init__(self, cidr: str, path: Path = None):
+        try:
+            self.cidr = str(ipaddress.ip_network(cidr, strict=False))
+        except ValueError as e:
+            raise ValueError(f"Invalid CIDR: {cidr}") from e
+        self.path = Path(path or SCANS_DIR / f"{self.cidr.replace('/', '_')}.json")
+        self.started = datetime.now().isoformat()
+        self.probed = []
+        self.alive = {}
+        self._finished = []
+        self._saved = None
+
+    @classmethod
+    def load(cls, cidr: str, path: Path = None):
+        """The checkpoint of an interrupted scan of `cidr`, or None."""
+        checkpoint = cls(cidr, path)
+        try:
+            state = json.loads(checkpoint.path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            print(f"⚠️ Ignoring unreadable {checkpoint.path}")
+            return None
+        checkpoint.started = state.get("started", checkpoint.started)
+        checkpoint.probed = state.get("probed", [])
+        checkpoint.alive = state.get("alive", {})
+        return checkpoint
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def remaining(self, addresses):
+        """The addresses still to be probed, as `addresses` is iterated."""
+        self._merge()
+        return outside(self.probed, addresses)
+
+    def finished(self, ip: str):
+        """Mark an address done (dead, or live and recorded)."""
+        self._finished.append(int(ipaddress.ip_address(ip)))
+
+    def dead(self, ip: str):
+        """An address didn't answer: done, and saved within SAVE_EVERY."""
+        self.finished(ip)
+        self.save()
+
+    def record(self, host: dict):
+        """Keep a live host that made it through the pipeline."""
+        self.alive[host["ip"]] = host
+        self.finished(host["ip"])
+
+    def probed_count(self) -> int:
+        self._merge()
+        return sum(last - first + 1 for first, last in self.probed)
+
+    def save(self, force: bool = False):
+        """Write the state, at most every SAVE_EVERY seconds unless `force`."""
+        if (
+            not force
+            and self._saved is not None
+            and time.monotonic() - self._saved < SAVE_EVERY
+        ):
+            return
+        self._merge()
+        state = {
+            "cidr": self.cidr,
+            "started": self.started,
+            "updated": datetime.now().isoformat(),
+            "probed": self.probed,
+            "alive": self.alive,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, json.dumps(state, ensure_ascii=False).encode("utf-8"))
+        self._saved = time.monotonic()
+
+    def remove(self):
+        """Drop the checkpoint once the scan has finished."""
+        self.path.unlink(missing_ok=True)
+
+    def _merge(self):
+        if self._finished:
+            self.probed = merge_intervals(self.probed, self._finished)
+            self._finished = []
@@ -1,9 +1,16 @@
 # src/cosmonaut/discovery/hostname.py
-from cosmonaut.ssh.client import connect_ssh
+from cosmonaut.ssh.client import connect_ssh, run_command
+from cosmonaut.ssh.known import breaker_open, down_reason, get_host_cache
+
+HOSTNAME_COMMAND = "hostname --fqdn || hostname"
 
 
 def get_hostname_via_ssh(
-    ip: str, user: str, key_file: str = None, password: bool = False
+    ip: str,
+    user: str,
+    key_file: str = None,
+    password: bool = False,
+    skip_down: bool = False,
 ) -> str:
     """Connect via SSH and get the real hostname."""
     client = connect_ssh(
@@ -11,15 +18,36 @@ def get_hostname_via_ssh(
         user=user,
         key_file=key_file,
         password=input(f"Password for {user}@{ip}: ") if password else None,
+        skip_down=skip_down,
     )
     if not client:
         return None
 
     try:
-        _, stdout, _ = client.exec_command("hostname --fqdn || hostname")
-        name = stdout.read().decode().strip()
+        name = run_command(client, HOSTNAME_COMMAND)
         client.close()
         return name or None
     except Exception:
         client.close()
         return None
+
+
+async def get_hostname_async(engine, ip: str, user: str = None, skip_down: bool = True):
+    """get_hostname_via_ssh() on an AsyncSSHEngine; None on any failure.
+
+    The connection is closed afterwards: each host is asked only once.
+    """
+    if skip_down:
+        health = get_host_cache().health(ip, engine.port)
+        if breaker_open(health):
+            print(f"⏭️ Skipping {ip}: {down_reason(health)}")
+            return None
+    try:
+        return (
+            await engine.run(ip, HOSTNAME_COMMAND, user=user, label="hostname") or None
+        )
+    except Exception as e:
+        print(f"❌ SSH failed: {ip}: {str(e) or type(e).__name__}")
+        return None
+    finally:
+        await engine.disconnect(ip, user=user)
@@ -0,0 +1,202 @@
+# src/cosmonaut/discovery/incremental.py
+import inspect
+import json
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from cosmonaut.discovery.sweep import RATE, open_probe, sweep
+from cosmonaut.storage import PROBE_HISTORY_FILE, load_servers
+from cosmonaut.storage.backend import file_stamp
+from cosmonaut.storage.locking import atomic_write, file_lock
+
+# Seconds an incremental scan keeps starting probes
+BUDGET = 600
+# Hosts alive within this long go first, with a short probe timeout
+RECENT = 7 * 86400
+FAST_TIMEOUT = 0.3
+# A dead address is probed again after 1/DEAD_FACTOR of the time it has
+# been dead, kept between these bounds: a host gone for a day is checked
+# every night, one gone for a year about once a month
+DEAD_FACTOR = 8
+MIN_RECHECK = 12 * 3600
+MAX_RECHECK = 30 * 86400
+# Planning keeps every address of the network (and the history one entry
+# per address): incremental scans take networks up to about a /12
+MAX_HOSTS = 1 << 20
+
+
+class ProbeHistory:
+    """When each address was probed and last answered (data/probe_history.json).
+
+        {"10.0.0.5": [first_probed, last_probed, last_alive], ...}
+
+    Times are epoch seconds; last_alive is 0 for an address that has
+    never answered.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(".lock")
+        self._entries = {}
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def entries(self) -> dict:
+        """{ip: [first_probed, last_probed, last_alive]}; treat as read-only."""
+        stamp = file_stamp(self.path)
+        with self._lock:
+            if stamp != self._stamp:
+                try:
+                    self._entries = json.loads(self.path.read_bytes())
+                except FileNotFoundError:
+                    self._entries = {}
+                except ValueError:
+                    print(f"⚠️ Ignoring unreadable {self.path}")
+                    self._entries = {}
+                self._stamp = stamp
+            return self._entries
+
+    def store(self, results: dict, now: float = None):
+        """Record {ip: answered} from one scan in one write."""
+        if not results:
+            return
+        now = round(now or time.time())
+        with file_lock(self.lock_path):
+            entries = dict(self.entries())
+            for ip, alive in results.items():
+                first, _, last_alive = entries.get(ip) or (now, 0, 0)
+                entries[ip] = [first, now, now if alive else last_alive]
+            atomic_write(self.path, json.dumps(entries, separators=(",", ":")).encode())
+
+
+_history = None
+
+
+def get_probe_history() -> ProbeHistory:
+    """Shared history in data/probe_history.json."""
+    global _history
+    if _history is None:
+        _history = ProbeHistory(PROBE_HISTORY_FILE)
+    return _history
+
+
+def inventory_last_seen() -> dict:
+    """{ip: last_seen as epoch seconds} of the hosts in the inventory."""
+    seen = {}
+    for ip, record in load_servers(fields=["last_seen"]).items():
+        try:
+            seen[ip] = datetime.fromisoformat(record["last_seen"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            continue
+    return seen
+
+
+def recheck_interval(ip: str, dead_for: float) -> float:
+    """Seconds between probes of an address dead for `dead_for` seconds.
+
+    Spread by ±25% per address, so a dead block comes due a slice at a
+    time rather than all on the same run.
+    """
+    wait = min(max(dead_for / DEAD_FACTOR, MIN_RECHECK), MAX_RECHECK)
+    return wait * (0.75 + 0.5 * zlib.crc32(ip.encode()) / 2**32)
+
+
+class ScanPlan:
+    """What an incremental scan probes, in order of priority.
+
+    `recent`: alive within RECENT, latest first, probed with FAST_TIMEOUT.
+    `unknown`: never probed nor seen. `due`: dead addresses whose recheck
+    interval has run out, most overdue first. The other dead addresses
+    (`skipped`) wait for a later run. Results are kept for ProbeHistory.
+    """
+
+    def __init__(self, recent, unknown, due, skipped, history, budget=BUDGET):
+        self.recent = recent
+        self.unknown = unknown
+        self.due = due
+        self.skipped = skipped
+        self.history = history
+        self.budget = budget
+        self.results = {}
+
+    def probed(self, ip: str, alive: bool):
+        self.results[ip] = alive
+
+    def save(self):
+        """Write this scan's results to the probe history."""
+        self.history.store(self.results)
+        self.results = {}
+
+
+def plan_scan(
+    addresses,
+    history: ProbeHistory = None,
+    last_seen: dict = None,
+    budget: float = BUDGET,
+    now: float = None,
+) -> ScanPlan:
+    """Order `addresses` for an incremental scan (see ScanPlan).
+
+    `last_seen` ({ip: epoch seconds}, default: the inventory's) counts as
+    an answer, so hosts seen over SSH are known without a probe.
+    """
+    history = history or get_probe_history()
+    entries = history.entries()
+    last_seen = inventory_last_seen() if last_seen is None else last_seen
+    now = now or time.time()
+    recent, unknown, due = [], [], []
+    skipped = 0
+    for ip in addresses:
+        seen = last_seen.get(ip, 0)
+        first, probed, alive = entries.get(ip) or (seen, seen, 0)
+        alive = max(alive, seen)
+        if alive and now - alive <= RECENT:
+            recent.append((alive, ip))
+        elif not probed:
+            unknown.append(ip)
+        else:
+            overdue = (now - probed) / recheck_interval(ip, now - (alive or first))
+            if overdue >= 1:
+                due.append((overdue, ip))
+            else:
+                skipped += 1
+    return ScanPlan(
+        [ip for _, ip in sorted(recent, reverse=True)],
+        unknown,
+        [ip for _, ip in sorted(due, reverse=True)],
+        skipped,
+        history,
+        budget,
+    )
+
+
+async def sweep_plan(
+    plan: ScanPlan,
+    probe: str = None,
+    on_alive=None,
+    concurrency: int = None,
+    rate: float = RATE,
+):
+    """sweep() a ScanPlan's addresses in order until its budget runs out.
+
+    Recently alive hosts that miss the short timeout are probed again
+    with the normal one, ahead of the unknown and due addresses.
+    """
+    until = time.monotonic() + plan.budget if plan.budget else None
+    missed = []
+
+    async def alive(ip):
+        plan.probed(ip, True)
+        if on_alive and inspect.isawaitable(handled := on_alive(ip)):
+            await handled
+
+    def dead(ip):
+        plan.probed(ip, False)
+
+    fast = open_probe(probe, FAST_TIMEOUT)
+    await sweep(plan.recent, fast, alive, concurrency, rate, missed.append, until)
+    rest = missed + plan.unknown + plan.due
+    await sweep(rest, open_probe(probe), alive, concurrency, rate, dead, until)
@@ -1,39 +1,104 @@
 # src/cosmonaut/discovery/network.py
-import subprocess
+import asyncio
 import ipaddress
 from typing import List, Dict
 
+from cosmonaut.discovery.incremental import sweep_plan
+from cosmonaut.discovery.rdns import Resolver, get_rdns_cache, reverse_dns_async
+from cosmonaut.discovery.sweep import RATE, network_hosts, open_probe, sweep
 
-def scan_network(cidr: str) -> List[Dict[str, str]]:
-    """Ping-scan a network and return live hosts."""
+# Live addresses waiting for their reverse DNS lookup
+QUEUE_SIZE = 256
+
+
+async def stream_network(
+    cidr: str,
+    probe: str = None,
+    concurrency: int = None,
+    rate: float = RATE,
+    queue_size: int = QUEUE_SIZE,
+    checkpoint=None,
+    plan=None,
+):
+    """Yield live hosts of a network as they are found and named.
+
+    Two stages joined by a bounded queue: the concurrent sweep (see
+    cosmonaut/discovery/sweep.py; `probe` is icmp, ping, tcp or auto,
+    `rate` caps new probes per second) feeds reverse DNS, which looks up
+    whatever addresses have queued up in one batch, cached across runs
+    (cosmonaut/discovery/rdns.py). Hosts come out in the order they
+    answer, {"ip", "hostname", "status"}; a consumer that falls behind
+    slows the sweep down rather than piling up results.
+
+    With a ScanCheckpoint, addresses it has as finished are skipped and
+    dead ones are marked finished as their probes come back. With a
+    ScanPlan (cosmonaut/discovery/incremental.py) only its addresses are
+    probed, in its order and within its time budget, and the results go
+    to the probe history at the end.
+    """
+    if not plan:
+        addresses = network_hosts(cidr)
+        if checkpoint:
+            addresses = checkpoint.remaining(addresses)
+        prober = open_probe(probe)
+    live = asyncio.Queue(queue_size)
+
+    async def probe_all():
+        try:
+            if plan:
+                await sweep_plan(plan, probe, live.put, concurrency, rate)
+                return
+            await sweep(
+                addresses,
+                prober,
+                live.put,
+                concurrency,
+                rate,
+                on_dead=checkpoint.dead if checkpoint else None,
+            )
+        finally:
+            if not asyncio.current_task().cancelling():
+                await live.put(None)  # the sweep ended, or failed
+
+    sweeping = asyncio.ensure_future(probe_all())
+    resolver, cache = Resolver(), get_rdns_cache()
     try:
-        network = ipaddress.ip_network(cidr, strict=False)
-    except ValueError as e:
-        raise ValueError(f"Invalid CIDR: {cidr}") from e
-
-    alive = []
-
-    for ip in network.hosts():
-        result = subprocess.run(
-            ["ping", "-c", "1", "-W", "1", str(ip)],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        if result.returncode == 0:
-            # Reverse DNS
-            hostname = "unknown"
-            try:
-                r = subprocess.run(
-                    ["dig", "+short", "-x", str(ip)],
-                    capture_output=True,
-                    text=True,
-                    timeout=2,
-                )
-                hostname = r.stdout.strip() or "unknown"
-            except Exception:
-                pass
-
-            alive.append({"ip": str(ip), "hostname": hostname, "status": "alive"})
-            print(f"🟢 {ip} ({hostname})")
-
-    return alive
+        done = False
+        while not done:
+            batch = [await live.get()]
+            while not live.empty():
+                batch.append(live.get_nowait())
+            if batch[-1] is None:
+                done = True
+                batch.pop()
+            names = await reverse_dns_async(batch, cache, resolver, flush=False)
+            for ip in batch:
+                yield {"ip": ip, "hostname": names[ip] or "unknown", "status": "alive"}
+        await sweeping  # raise what stopped the sweep, if anything
+    finally:
+        sweeping.cancel()
+        cache.flush()
+        if plan:
+            plan.save()
+
+
+def scan_network(
+    cidr: str,
+    probe: str = None,
+    concurrency: int = None,
+    rate: float = RATE,
+) -> List[Dict[str, str]]:
+    """Ping-scan a network and return live hosts, in address order.
+
+    stream_network() run to completion.
+    """
+
+    async def collect():
+        alive = []
+        async for host in stream_network(cidr, probe, concurrency, rate):
+            alive.append(host)
+            print(f"🟢 {host['ip']} ({host['hostname']})")
+        return alive
+
+    alive = asyncio.run(collect())
+    return sorted(alive, key=lambda host: ipaddress.ip_address(host["ip"]))
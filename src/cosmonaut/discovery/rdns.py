@@ -0,0 +1,324 @@
+# src/cosmonaut/discovery/rdns.py
+import asyncio
+import ipaddress
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from pathlib import Path
+
+from cosmonaut.storage import RDNS_FILE
+from cosmonaut.storage.backend import file_stamp
+from cosmonaut.storage.locking import atomic_write, file_lock
+
+# Lookups in flight at once; seconds to wait for each answer, and tries
+# (rotating through the nameservers) before giving up on an address
+CONCURRENCY = 64
+TIMEOUT = 2.0
+ATTEMPTS = 2
+# TTLs for answers without a usable one (gethostbyaddr, NXDOMAIN without
+# an SOA), and a ceiling so a renamed host is noticed within a week
+DEFAULT_TTL = 3600
+NEGATIVE_TTL = 300
+MAX_TTL = 7 * 86400
+
+PTR = 12
+SOA = 6
+NXDOMAIN = 3
+
+
+def system_nameservers(path: Path = Path("/etc/resolv.conf")) -> list:
+    """(address, 53) of each `nameserver` in resolv.conf."""
+    servers = []
+    try:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return servers
+    for line in lines:
+        words = line.split()
+        if len(words) >= 2 and words[0] == "nameserver":
+            servers.append((words[1].split("%")[0], 53))
+    return servers
+
+
+def ptr_query(qid: int, ip: str) -> bytes:
+    """A recursive PTR query for `ip`'s reverse name."""
+    name = ipaddress.ip_address(ip).reverse_pointer
+    labels = b"".join(bytes([len(part)]) + part.encode() for part in name.split("."))
+    header = struct.pack("!6H", qid, 0x0100, 1, 0, 0, 0)  # RD: recurse
+    return header + labels + b"\0" + struct.pack("!HH", PTR, 1)
+
+
+def _read_name(data: bytes, offset: int):
+    """(dotted name, offset after it), following compression pointers."""
+    labels = []
+    end = None
+    for _ in range(128):  # bounds pointer loops in hostile packets
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = struct.unpack_from("!H", data, offset)[0] & 0x3FFF
+        elif length == 0:
+            return ".".join(labels), end if end is not None else offset + 1
+        else:
+            labels.append(
+                data[offset + 1 : offset + 1 + length].decode(errors="replace")
+            )
+            offset += 1 + length
+    raise ValueError("DNS name too long")
+
+
+def parse_ptr_response(data: bytes):
+    """(query id, rcode, name or None, ttl) of a PTR response.
+
+    For negative answers the TTL comes from the SOA in the authority
+    section (RFC 2308), else it is None. Raises ValueError on garbage.
+    """
+    try:
+        qid, flags, qdcount, ancount, nscount, _ = struct.unpack_from("!6H", data)
+        offset = 12
+        for _ in range(qdcount):
+            offset = _read_name(data, offset)[1] + 4
+        name, ttl, negative_ttl = None, None, None
+        for i in range(ancount + nscount):
+            offset = _read_name(data, offset)[1]
+            rtype, _, rttl, length = struct.unpack_from("!HHIH", data, offset)
+            offset += 10
+            if i < ancount and rtype == PTR and name is None:
+                name, ttl = _read_name(data, offset)[0], rttl
+            elif i >= ancount and rtype == SOA:
+                (minimum,) = struct.unpack_from("!I", data, offset + length - 4)
+                negative_ttl = min(rttl, minimum)
+            offset += length
+    except (struct.error, IndexError) as e:
+        raise ValueError("malformed DNS response") from e
+    return qid, flags & 0xF, name or None, ttl if name else negative_ttl
+
+
+class _Answers(asyncio.DatagramProtocol):
+    """Hands each datagram to the lookup waiting on its query id."""
+
+    def __init__(self, waiting: dict):
+        self.waiting = waiting
+
+    def datagram_received(self, data, addr):
+        try:
+            answer = parse_ptr_response(data)
+        except ValueError:
+            return
+        waiter = self.waiting.get(answer[0])
+        if waiter and not waiter.done():
+            waiter.set_result(answer)
+
+
+class Resolver:
+    """Concurrent PTR lookups over UDP, with the answers' TTLs.
+
+    Talks DNS directly to the system's nameservers (or `nameservers`,
+    e.g. a stub server in tests) so that many queries share one socket
+    and TTLs are known for caching. Without any nameserver it falls back
+    to socket.gethostbyaddr in threads, with DEFAULT_TTL.
+    """
+
+    def __init__(
+        self,
+        nameservers: list = None,
+        timeout: float = TIMEOUT,
+        attempts: int = ATTEMPTS,
+        concurrency: int = CONCURRENCY,
+    ):
+        self.nameservers = (
+            system_nameservers() if nameservers is None else list(nameservers)
+        )
+        self.timeout = timeout
+        self.attempts = attempts
+        self.concurrency = concurrency
+        self._transports = {}
+        self._waiting = {}
+        self._slots = None
+
+    async def lookup_many(self, ips) -> dict:
+        """{ip: (name or None, ttl)} for every address that got an answer.
+
+        Addresses whose lookups timed out or failed (SERVFAIL, ...) are
+        left out, so they are neither cached nor reported as nameless.
+        """
+        answers = await asyncio.gather(*(self.lookup(ip) for ip in ips))
+        return {ip: answer for ip, answer in zip(ips, answers) if answer}
+
+    async def lookup(self, ip: str):
+        """(name or None, ttl), or None when there was no usable answer."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.concurrency))
+        async with self._slots:
+            if not self.nameservers:
+                return await self._gethostbyaddr(ip)
+            for attempt in range(self.attempts):
+                server = self.nameservers[attempt % len(self.nameservers)]
+                answer = await self._ask(server, ip)
+                if answer is None:
+                    continue  # timed out: next server
+                _, rcode, name, ttl = answer
+                if rcode == 0 or rcode == NXDOMAIN:
+                    fallback = DEFAULT_TTL if name else NEGATIVE_TTL
+                    return name, min(ttl if ttl is not None else fallback, MAX_TTL)
+                # SERVFAIL, REFUSED, ...: another server may do better
+        return None
+
+    async def _ask(self, server, ip: str):
+        transport = await self._transport(server)
+        qid = random.randrange(1 << 16)
+        while qid in self._waiting:
+            qid = random.randrange(1 << 16)
+        answer = asyncio.get_running_loop().create_future()
+        self._waiting[qid] = answer
+        try:
+            transport.sendto(ptr_query(qid, ip))
+            async with asyncio.timeout(self.timeout):
+                return await answer
+        except (TimeoutError, OSError):
+            return None
+        finally:
+            self._waiting.pop(qid, None)
+
+    async def _transport(self, server):
+        # One socket per server, opened by whichever lookup comes first
+        if server not in self._transports:
+            self._transports[server] = asyncio.ensure_future(
+                asyncio.get_running_loop().create_datagram_endpoint(
+                    lambda: _Answers(self._waiting), remote_addr=server
+                )
+            )
+        transport, _ = await self._transports[server]
+        return transport
+
+    async def _gethostbyaddr(self, ip: str):
+        try:
+            name = (await asyncio.to_thread(socket.gethostbyaddr, ip))[0]
+            return name, DEFAULT_TTL
+        except socket.herror:
+            return None, NEGATIVE_TTL
+        except OSError:
+            return None
+
+    def close(self):
+        for opening in self._transports.values():
+            if opening.done() and not opening.cancelled() and not opening.exception():
+                opening.result()[0].close()
+            else:
+                opening.cancel()
+        self._transports.clear()
+
+
+class RdnsCache:
+    """Reverse DNS answers kept across runs (data/rdns.json).
+
+        {"10.0.0.5": {"name": "web-1.example.com", "expires": 1760000000},
+         "10.0.0.6": {"name": null, "expires": 1759990000}}
+
+    Entries are used until their DNS TTL runs out; a null name caches
+    "no PTR record" for the negative TTL. New answers are kept in memory
+    until flush(), so a long sweep rewrites the file once, not per batch.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(".lock")
+        self._entries = {}
+        self._pending = {}
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def fresh(self, ips, now: float = None) -> dict:
+        """{ip: name or None} of the addresses with an unexpired entry."""
+        now = now or time.time()
+        entries = self._load()
+        fresh = {}
+        for ip in ips:
+            entry = self._pending.get(ip) or entries.get(ip)
+            if entry and entry["expires"] > now:
+                fresh[ip] = entry["name"]
+        return fresh
+
+    def store(self, answers: dict, now: float = None):
+        """Remember {ip: (name or None, ttl)} until the next flush()."""
+        now = now or time.time()
+        with self._lock:
+            for ip, (name, ttl) in answers.items():
+                self._pending[ip] = {"name": name, "expires": round(now + ttl)}
+
+    def flush(self, now: float = None):
+        """Write the stored answers in one go; drops expired entries."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        now = now or time.time()
+        with file_lock(self.lock_path):
+            entries = {
+                ip: entry
+                for ip, entry in self._load().items()
+                if entry["expires"] > now
+            }
+            entries.update(pending)
+            data = json.dumps(entries, ensure_ascii=False, separators=(",", ":"))
+            atomic_write(self.path, data.encode("utf-8"))
+
+    def _load(self) -> dict:
+        stamp = file_stamp(self.path)
+        with self._lock:
+            if stamp != self._stamp:
+                try:
+                    self._entries = json.loads(self.path.read_bytes())
+                except FileNotFoundError:
+                    self._entries = {}
+                except ValueError:
+                    print(f"⚠️ Ignoring unreadable {self.path}")
+                    self._entries = {}
+                self._stamp = stamp
+            return self._entries
+
+
+_cache = None
+
+
+def get_rdns_cache() -> RdnsCache:
+    """Shared cache in data/rdns.json."""
+    global _cache
+    if _cache is None:
+        _cache = RdnsCache(RDNS_FILE)
+    return _cache
+
+
+async def reverse_dns_async(
+    ips, cache: RdnsCache = None, resolver=None, flush: bool = True
+) -> dict:
+    """{ip: hostname or None}: cached names, the rest looked up at once.
+
+    None means no PTR record, or no answer this time (not cached, so the
+    next run asks again). Callers doing many batches pass flush=False and
+    call cache.flush() once at the end.
+    """
+    ips = list(ips)
+    cache = cache or get_rdns_cache()
+    names = cache.fresh(ips)
+    missing = [ip for ip in ips if ip not in names]
+    if missing:
+        resolver = resolver or Resolver()
+        try:
+            answers = await resolver.lookup_many(missing)
+        finally:
+            resolver.close()
+        cache.store(answers)
+        if flush:
+            cache.flush()
+        names.update({ip: answer[0] for ip, answer in answers.items()})
+    return {ip: names.get(ip) for ip in ips}
+
+
+def reverse_dns(ips, cache: RdnsCache = None, resolver=None) -> dict:
+    """reverse_dns_async() from synchronous code."""
+    return asyncio.run(reverse_dns_async(ips, cache, resolver))
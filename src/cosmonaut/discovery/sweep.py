@@ -0,0 +1,318 @@
+# src/cosmonaut/discovery/sweep.py
+import asyncio
+import inspect
+import ipaddress
+import itertools
+import os
+import shutil
+import socket
+import struct
+import time
+
+# New probes started per second at most; how many may be in flight at
+# once depends on the probe (its `concurrency`)
+RATE = 1000
+PACING = 0.01
+# Seconds to wait for an answer
+TIMEOUT = 1.0
+# Ports the TCP probe knocks on; any answer (even a refusal) means "up"
+TCP_PORTS = (22, 80, 443)
+
+# Which probe scan_network uses by default; `auto` picks icmp where the
+# kernel allows unprivileged ICMP sockets, else ping
+PROBE_ENV = "COSMONAUT_PROBE"
+DEFAULT_PROBE = "auto"
+
+
+class PingProbe:
+    """One `ping -c 1` subprocess per address.
+
+    Works everywhere ping does, but every probe is a fork, so few run at
+    once.
+    """
+
+    name = "ping"
+    concurrency = 64
+
+    def __init__(self, timeout: float = TIMEOUT):
+        self.timeout = timeout
+        self.ping = shutil.which("ping") or "ping"
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which("ping") is not None
+
+    async def __call__(self, ip: str) -> bool:
+        # iputils takes whole seconds for -W on older versions
+        wait = str(max(1, round(self.timeout)))
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                self.ping,
+                "-c",
+                "1",
+                "-W",
+                wait,
+                ip,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return False
+        try:
+            return await proc.wait() == 0
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+
+    async def close(self):
+        pass
+
+
+class IcmpProbe:
+    """ICMP echo over unprivileged datagram sockets, no subprocess.
+
+    Linux allows these to groups in net.ipv4.ping_group_range (many
+    distributions allow everyone). One socket per address family carries
+    every probe; replies are matched to waiters by source address.
+    """
+
+    name = "icmp"
+    concurrency = 2048
+    # (family, protocol, echo request type, echo reply type)
+    FAMILIES = {
+        4: (socket.AF_INET, socket.IPPROTO_ICMP, 8, 0),
+        6: (socket.AF_INET6, socket.IPPROTO_ICMPV6, 128, 129),
+    }
+
+    def __init__(self, timeout: float = TIMEOUT):
+        self.timeout = timeout
+        self._sockets = {}
+        self._waiting = {}
+        self._seq = itertools.count(1)
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            socket.socket(
+                socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP
+            ).close()
+            return True
+        except OSError:
+            return False
+
+    async def __call__(self, ip: str) -> bool:
+        version = ipaddress.ip_address(ip).version
+        sock = self._socket(version)
+        request = self.FAMILIES[version][2]
+        seq = next(self._seq) & 0xFFFF
+        # The kernel fills in the identifier and checksum
+        packet = struct.pack("!BBHHH", request, 0, 0, 0, seq) + b"cosmonaut"
+
+        reply = asyncio.get_running_loop().create_future()
+        self._waiting[ip] = reply
+        try:
+            sock.sendto(packet, (ip, 0))
+            async with asyncio.timeout(self.timeout):
+                return await reply
+        except (TimeoutError, OSError):
+            return False
+        finally:
+            self._waiting.pop(ip, None)
+
+    def _socket(self, version: int):
+        if version not in self._sockets:
+            family, proto, _, reply = self.FAMILIES[version]
+            sock = socket.socket(family, socket.SOCK_DGRAM, proto)
+            sock.setblocking(False)
+            asyncio.get_running_loop().add_reader(
+                sock.fileno(), self._receive, sock, reply
+            )
+            self._sockets[version] = sock
+        return self._sockets[version]
+
+    def _receive(self, sock, reply_type: int):
+        while True:
+            try:
+                data, addr = sock.recvfrom(1024)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                continue  # e.g. an ICMP error queued for an earlier probe
+            waiter = self._waiting.get(addr[0])
+            if data and data[0] == reply_type and waiter and not waiter.done():
+                waiter.set_result(True)
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        for sock in self._sockets.values():
+            loop.remove_reader(sock.fileno())
+            sock.close()
+        self._sockets.clear()
+
+
+class TcpProbe:
+    """TCP connect to a few common ports; works without ICMP at all.
+
+    A host is up if any port accepts or actively refuses the connection
+    (a RST comes from the host itself); silence on every port within the
+    timeout means down, or firewalled.
+    """
+
+    name = "tcp"
+    # Each probe holds a socket per port: stay under the usual 1024 fds
+    concurrency = 256
+
+    def __init__(self, timeout: float = TIMEOUT, ports=TCP_PORTS):
+        self.timeout = timeout
+        self.ports = tuple(ports)
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    async def __call__(self, ip: str) -> bool:
+        knocks = [asyncio.ensure_future(self._knock(ip, port)) for port in self.ports]
+        try:
+            for knock in asyncio.as_completed(knocks, timeout=self.timeout):
+                if await knock:
+                    return True
+        except TimeoutError:
+            pass
+        finally:
+            for knock in knocks:
+                knock.cancel()
+            await asyncio.gather(*knocks, return_exceptions=True)
+        return False
+
+    @staticmethod
+    async def _knock(ip: str, port: int) -> bool:
+        try:
+            _, writer = await asyncio.open_connection(ip, port)
+        except ConnectionRefusedError:
+            return True
+        except OSError:
+            return False
+        writer.close()
+        return True
+
+    async def close(self):
+        pass
+
+
+PROBES = {"icmp": IcmpProbe, "ping": PingProbe, "tcp": TcpProbe}
+
+
+def open_probe(name: str = None, timeout: float = TIMEOUT):
+    """The probe called `name` (or the configured one), ready to use."""
+    name = (name or os.environ.get(PROBE_ENV) or DEFAULT_PROBE).lower()
+    if name == "auto":
+        name = "icmp" if IcmpProbe.available() else "ping"
+    if name not in PROBES:
+        raise ValueError(
+            f"Unknown probe: {name} (choose from auto, {', '.join(PROBES)})"
+        )
+    return PROBES[name](timeout=timeout)
+
+
+async def sweep(
+    addresses,
+    probe,
+    on_alive=None,
+    concurrency: int = None,
+    rate: float = RATE,
+    on_dead=None,
+    until: float = None,
+) -> list:
+    """Probe every address, `concurrency` at a time (default: what the
+    probe handles) and at most `rate` new probes per second.
+
+    `addresses` may be any iterable, consumed as probes start. Calls
+    `on_alive(ip)` as each live host answers (awaited if it is a
+    coroutine, so a full queue downstream slows the sweep); returns the
+    live addresses in the order given. `on_dead(ip)` is called for each
+    address that didn't answer. No probe starts after time.monotonic()
+    reaches `until`; the addresses left over are neither alive nor dead.
+    """
+    slots = asyncio.Semaphore(max(1, concurrency or probe.concurrency))
+    interval = 1 / rate if rate else 0
+    alive = {}  # ip: position in `addresses`
+    running = set()
+
+    async def one(ip, position):
+        try:
+            if await probe(ip):
+                alive[ip] = position
+                if on_alive and inspect.isawaitable(handled := on_alive(ip)):
+                    await handled
+            elif on_dead:
+                on_dead(ip)
+        finally:
+            slots.release()
+
+    next_start = time.monotonic()
+    try:
+        for position, ip in enumerate(addresses):
+            await slots.acquire()
+            if until and time.monotonic() >= until:
+                slots.release()
+                break
+            # Paced, without bursting to catch up after waiting for a slot.
+            # Sleeps shorter than the loop's timer resolution would cap
+            # the rate near 1000/s: wait once a few ms of lead build up.
+            delay = next_start - time.monotonic()
+            if delay > PACING:
+                await asyncio.sleep(delay)
+            next_start = max(next_start, time.monotonic()) + interval
+            task = asyncio.ensure_future(one(ip, position))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        await asyncio.gather(*running)
+    finally:
+        for task in running:
+            task.cancel()
+        await probe.close()
+    return sorted(alive, key=alive.get)
+
+
+def sweep_network(
+    cidr: str,
+    probe: str = None,
+    on_alive=None,
+    concurrency: int = None,
+    rate: float = RATE,
+    timeout: float = TIMEOUT,
+) -> list:
+    """Live host addresses of a network, e.g. 10.0.0.0/16, via sweep()."""
+    return asyncio.run(
+        sweep(
+            network_hosts(cidr),
+            open_probe(probe, timeout),
+            on_alive,
+            concurrency,
+            rate,
+        )
+    )
+
+
+def parse_network(cidr: str):
+    """ipaddress network of e.g. 10.0.0.0/24; ValueError if it isn't one."""
+    try:
+        return ipaddress.ip_network(cidr, strict=False)
+    except ValueError as e:
+        raise ValueError(f"Invalid CIDR: {cidr}") from e
+
+
+def network_hosts(cidr: str, max_hosts: int = None):
+    """Every host address of a network, e.g. 10.0.0.0/24, as they're needed.
+
+    Lazy, so a big network costs nothing up front. Callers that need them
+    all at once pass `max_hosts` to refuse networks larger than that.
+    """
+    network = parse_network(cidr)
+    if max_hosts and network.num_addresses > max_hosts:
+        raise ValueError(
+            f"{cidr} is too large: {network.num_addresses} addresses,"
+            f" at most {max_hosts} here"
+        )
+    return (str(ip) for ip in network.hosts())
@@ -0,0 +1,103 @@
+# src/cosmonaut/discovery/topology.py
+import asyncio
+from contextlib import aclosing
+
+from cosmonaut.discovery.hostname import get_hostname_async
+from cosmonaut.discovery.network import QUEUE_SIZE, stream_network
+from cosmonaut.discovery.sweep import RATE, open_probe, parse_network
+from cosmonaut.ssh.aio import AsyncSSHEngine
+
+# Hosts asked for their hostname at once, and how long each may take
+WORKERS = 64
+DEADLINE = 15
+
+
+async def discover_topology(
+    cidr: str,
+    on_host,
+    user: str = None,
+    port: int = 22,
+    key_file: str = None,
+    password: str = None,
+    probe: str = None,
+    concurrency: int = None,
+    rate: float = RATE,
+    workers: int = WORKERS,
+    deadline: float = DEADLINE,
+    queue_size: int = QUEUE_SIZE,
+    checkpoint=None,
+    plan=None,
+):
+    """Map a network as a pipeline: probe → resolve → enrich → record.
+
+    Live hosts stream out of stream_network() (sweep, then reverse DNS)
+    into a bounded queue; with `user`, `workers` tasks ask each one for
+    its real hostname over SSH (the `ssh_hostname` key, None if that
+    failed or the host's circuit breaker is open) while the sweep is
+    still running. `on_host(host)` is the record stage, called as each
+    host comes out of the pipeline.
+
+    With a ScanCheckpoint, progress is saved every few seconds and when
+    the scan is interrupted; hosts it already has go straight to
+    `on_host` and finished addresses aren't probed again. The checkpoint
+    is removed once the whole network is done. A ScanPlan makes it an
+    incremental scan instead (see stream_network()).
+    """
+    # A bad network or probe name fails here, before any SSH work
+    parse_network(cidr)
+    open_probe(probe)
+
+    if checkpoint:
+        for host in checkpoint.alive.values():
+            on_host(host)
+
+    def record(host):
+        on_host(host)
+        if checkpoint:
+            checkpoint.record(host)
+            checkpoint.save()
+
+    hosts = stream_network(cidr, probe, concurrency, rate, queue_size, checkpoint, plan)
+    try:
+        await _pipeline(
+            hosts, record, user, port, key_file, password, workers, deadline, queue_size
+        )
+    except BaseException:
+        if checkpoint:
+            checkpoint.save(force=True)
+        raise
+    if checkpoint:
+        checkpoint.remove()
+
+
+async def _pipeline(
+    hosts, on_host, user, port, key_file, password, workers, deadline, queue_size
+):
+    if not user:
+        async with aclosing(hosts):
+            async for host in hosts:
+                on_host(host)
+        return
+
+    found = asyncio.Queue(queue_size)
+    workers = max(1, workers)
+
+    async def feed():
+        async with aclosing(hosts):
+            async for host in hosts:
+                await found.put(host)
+        for _ in range(workers):
+            await found.put(None)
+
+    async def enrich(engine):
+        while (host := await found.get()) is not None:
+            host["ssh_hostname"] = await get_hostname_async(engine, host["ip"])
+            on_host(host)
+
+    async with AsyncSSHEngine(
+        user=user, port=port, key_file=key_file, password=password, timeout=deadline
+    ) as engine:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(feed())
+            for _ in range(workers):
+                group.create_task(enrich(engine))
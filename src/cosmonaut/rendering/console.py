@@ -25,3 +25,58 @@ def render_specs(target: str, specs: dict):
     console.print("\n")
     console.print(table)
     console.print("\n")
+
+
+def render_profile(tracer, top: int = 10):
+    """Slowest hosts and commands from an SSH trace."""
+    hosts = tracer.by_host()
+    if not hosts:
+        console.print("⏱️ No SSH activity to profile.")
+        return
+
+    table = Table(
+        "Host",
+        "Connect",
+        "Commands",
+        "Runs",
+        title="🐢 Slowest hosts",
+        border_style="yellow",
+    )
+    for row in hosts[:top]:
+        table.add_row(
+            row["host"],
+            f"{row['connect'] * 1000:.0f} ms",
+            f"{row['commands'] * 1000:.0f} ms",
+            str(row["count"]),
+        )
+    console.print(table)
+
+    table = Table(
+        "Host",
+        "Command",
+        "Time",
+        "Runs",
+        "Bytes",
+        title="🐢 Slowest commands",
+        border_style="yellow",
+    )
+    for row in tracer.by_command()[:top]:
+        table.add_row(
+            row["host"],
+            row["label"] or "?",
+            f"{row['seconds'] * 1000:.0f} ms",
+            str(row["runs"]),
+            str(row["bytes"]),
+        )
+    console.print(table)
+
+    # Where the connect time went, over all hosts
+    phases = {}
+    for span in tracer.spans:
+        phases[span["phase"]] = phases.get(span["phase"], 0.0) + span["duration"]
+    console.print(
+        "⏱️ "
+        + ", ".join(
+            f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in phases.items()
+        )
+    )
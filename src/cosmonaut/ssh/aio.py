@@ -0,0 +1,255 @@
+# src/cosmonaut/ssh/aio.py
+import asyncio
+import time
+from pathlib import Path
+
+import asyncssh
+
+from cosmonaut.ssh.known import connect_timeout, get_host_cache, key_line
+from cosmonaut.ssh.output import CHUNK, LineBuffer
+from cosmonaut.ssh.pool import parse_jump
+from cosmonaut.ssh.trace import command_label, span
+
+# Commands in flight at once across all hosts
+MAX_SESSIONS = 500
+# ... and per connection; OpenSSH refuses more than MaxSessions (10) channels
+MAX_CHANNELS = 8
+CONNECT_TIMEOUT = 10
+COMMAND_TIMEOUT = 30
+
+
+class AsyncSSHEngine:
+    """Many SSH sessions multiplexed on one asyncio event loop.
+
+    The asyncio counterpart of connect_ssh and the session pool: one
+    connection per (user, host, port), opened on first use and shared by
+    every command sent to that host; each command gets its own channel.
+    Semaphores bound the commands in flight, overall and per host. Every
+    command has a timeout, and cancelling the awaiting task abandons it.
+
+    With `jump` ([user@]host[:port]), every host is reached through that
+    bastion: one connection to it carries a direct-tcpip tunnel per inner
+    host, so a fleet behind it costs a single bastion handshake.
+
+        async with AsyncSSHEngine(user="root") as engine:
+            print(await engine.run("10.0.0.5", "uptime"))
+    """
+
+    def __init__(
+        self,
+        user: str = None,
+        port: int = 22,
+        key_file: str = None,
+        password: str = None,
+        max_sessions: int = MAX_SESSIONS,
+        max_channels: int = MAX_CHANNELS,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        timeout: float = COMMAND_TIMEOUT,
+        jump: str = None,
+    ):
+        self.user = user
+        self.port = port
+        self.key_file = key_file
+        self.password = password
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self.max_channels = max_channels
+        self.jump = parse_jump(jump, user) if jump else None
+        # Host keys and connection health learned this run, saved on close()
+        self._learned = []
+        self._attempts = []
+        self.handshakes = 0
+        self._sessions = asyncio.Semaphore(max_sessions)
+        self._connections = {}
+        self._channels = {}
+
+    async def run(
+        self,
+        host: str,
+        cmd: str,
+        user: str = None,
+        port: int = None,
+        timeout=None,
+        label: str = None,
+        max_bytes: int = None,
+        max_lines: int = None,
+    ) -> str:
+        """Run `cmd` on `host` and return its stripped stdout.
+
+        Raises TimeoutError after `timeout` seconds (default: the engine's),
+        and asyncssh/OS errors when the host can't be reached. `label`
+        names the command in traces. Output is capped like run_command()'s.
+        """
+        key = (user or self.user, host, port or self.port)
+        channels = self._channels.get(key)
+        if channels is None:
+            channels = self._channels[key] = asyncio.Semaphore(self.max_channels)
+
+        async with self._sessions:
+            async with asyncio.timeout(timeout or self.timeout):
+                conn = await self.connect(host, user, port)
+                async with channels:
+                    with span(host, "exec", label or command_label(cmd)) as extra:
+                        lines, extra["bytes"] = await self._read(
+                            conn, cmd, max_bytes, max_lines
+                        )
+        return "\n".join(lines).strip()
+
+    @staticmethod
+    async def _read(conn, cmd: str, max_bytes: int = None, max_lines: int = None):
+        """(stdout lines, bytes read), split as chunks arrive, within caps.
+
+        stderr is dropped as it arrives rather than buffered; output
+        past the caps closes the channel and ends in a truncation line.
+        """
+        buffer = LineBuffer(max_bytes, max_lines)
+        lines = []
+        async with conn.create_process(
+            cmd, encoding=None, stderr=asyncssh.DEVNULL
+        ) as process:
+            while chunk := await process.stdout.read(CHUNK):
+                lines += buffer.feed(chunk)
+                if buffer.truncated:
+                    process.close()
+                    break
+            else:
+                lines += buffer.finish()
+        return lines, buffer.bytes
+
+    async def connect(self, host: str, user: str = None, port: int = None):
+        """The shared connection to user@host:port, opening it if needed."""
+        key = (user or self.user, host, port or self.port)
+        task = self._connections.get(key)
+        if task is None or (
+            task.done()
+            and (
+                task.cancelled()
+                or task.exception() is not None
+                or task.result().is_closed()  # e.g. the bastion dropped us
+            )
+        ):
+            task = asyncio.ensure_future(self._open(*key))
+            self._connections[key] = task
+        try:
+            # Shielded: one caller timing out must not abort a handshake
+            # others are waiting on
+            return await asyncio.shield(task)
+        except Exception:
+            if self._connections.get(key) is task:
+                del self._connections[key]
+            raise
+
+    async def disconnect(self, host: str, user: str = None, port: int = None):
+        """Close the connection to a host once nothing else needs it."""
+        key = (user or self.user, host, port or self.port)
+        task = self._connections.pop(key, None)
+        self._channels.pop(key, None)
+        if task is not None:
+            await self._close(task)
+
+    async def close(self):
+        tasks = list(self._connections.values())
+        self._connections.clear()
+        self._channels.clear()
+        await asyncio.gather(*(self._close(task) for task in tasks))
+        await self.save()
+
+    async def save(self):
+        """Write the host keys and health learned so far to the host cache."""
+        cache = get_host_cache()
+        learned, self._learned = self._learned, []
+        attempts, self._attempts = self._attempts, []
+        if learned:
+            await asyncio.to_thread(cache.remember_many, learned)
+        if attempts:
+            await asyncio.to_thread(cache.record_health_many, attempts)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+    async def _open(self, user: str, host: str, port: int):
+        tunnel = None
+        if self.jump and (user, host, port) != self.jump:
+            # Shared like any other connection, so disconnecting an inner
+            # host leaves the bastion up for the rest
+            jump_user, jump_host, jump_port = self.jump
+            tunnel = await self.connect(jump_host, jump_user, jump_port)
+
+        start = time.monotonic()
+        try:
+            # asyncssh doesn't expose TCP, kex and auth apart: one span
+            with span(host, "handshake"):
+                conn = await self._handshake(user, host, port, tunnel)
+        except Exception as e:
+            if unreachable(e):
+                self._attempts.append((host, port, None, str(e) or type(e).__name__))
+            raise
+        self._attempts.append((host, port, time.monotonic() - start, None))
+        return conn
+
+    async def _handshake(self, user: str, host: str, port: int, tunnel):
+        cache = get_host_cache()
+        known = cache.host_key(host, port)
+        options = dict(
+            port=port,
+            tunnel=tunnel,
+            username=user,
+            password=self.password,
+            client_keys=[self.key_file] if self.key_file else (),
+            # Hosts seen before must show the same key; new ones are
+            # accepted and remembered, as in connect_ssh
+            known_hosts=(
+                ([asyncssh.import_public_key(known)], [], []) if known else None
+            ),
+            # Hosts known to answer quickly don't get the full timeout
+            connect_timeout=connect_timeout(
+                cache.health(host, port), self.connect_timeout
+            ),
+        )
+
+        credential = None if self.key_file else cache.credential(user, host, port)
+        cached = credential and _auth_options(credential, self.password)
+        conn = None
+        if cached:
+            try:
+                conn = await asyncssh.connect(host, **{**options, **cached})
+            except asyncssh.PermissionDenied:
+                await asyncio.to_thread(cache.forget, host, port, user)
+        if conn is None:
+            conn = await asyncssh.connect(host, **options)
+        self.handshakes += 1
+        host_key = conn.get_server_host_key()
+        if host_key is not None:
+            self._learned.append((host, port, user, None, key_line(host_key)))
+        return conn
+
+    @staticmethod
+    async def _close(task):
+        if not task.done():
+            task.cancel()
+            return
+        if task.cancelled() or task.exception() is not None:
+            return
+        conn = task.result()
+        conn.close()
+        await conn.wait_closed()
+
+
+def unreachable(error: Exception) -> bool:
+    """Whether a failed connect means the host is down (not, say, bad auth)."""
+    if isinstance(error, (asyncssh.PermissionDenied, asyncssh.HostKeyNotVerifiable)):
+        return False
+    return isinstance(error, (OSError, asyncssh.DisconnectError))
+
+
+def _auth_options(credential: dict, password: str = None):
+    """asyncssh.connect() kwargs offering only a cached credential, or None."""
+    if credential.get("method") == "password" and password is not None:
+        return {"client_keys": None, "agent_path": None}
+    if credential.get("method") == "key" and Path(credential.get("key", "")).exists():
+        return {"client_keys": [credential["key"]], "agent_path": None}
+    return None  # agent keys: asyncssh offers those first anyway
@@ -0,0 +1,413 @@
+# src/cosmonaut/ssh/broker.py
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from cosmonaut.ssh.output import CHUNK, RemoteOutput
+from cosmonaut.ssh.pool import SessionPool
+
+# Override where the broker listens (default: a per-user runtime directory)
+SOCKET_ENV = "COSMONAUT_BROKER_SOCKET"
+# How long the broker keeps sessions, and itself, alive without requests
+IDLE = 600
+
+# Response frames: kind (s = command started, o = stdout, e = stderr,
+# x = exit status, r = reply JSON) and payload length
+FRAME = struct.Struct("<cI")
+
+
+def socket_path() -> Path:
+    if os.environ.get(SOCKET_ENV):
+        return Path(os.environ[SOCKET_ENV])
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(runtime) / f"cosmonaut-{os.getuid()}" / "broker.sock"
+
+
+def check_private(directory: Path):
+    """Raise PermissionError unless `directory` is ours and 0700.
+
+    The socket carries passwords and key paths; in a shared /tmp anyone
+    could have created the directory (or a symlink) first.
+    """
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"{directory} is not a directory")
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"{directory} is not private to this user")
+
+
+def check_peer(sock):
+    """Raise PermissionError unless the other end runs as this user."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return  # no peer credentials here; check_private() has to do
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, 12)
+    _, uid, _ = struct.unpack("3i", creds)
+    if uid != os.getuid():
+        raise PermissionError(f"broker socket is owned by uid {uid}")
+
+
+def _send(sock, kind: bytes, payload: bytes = b""):
+    sock.sendall(FRAME.pack(kind, len(payload)) + payload)
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("broker closed the connection")
+        data += chunk
+    return bytes(data)
+
+
+def _frames(sock):
+    while True:
+        kind, size = FRAME.unpack(_recv_exact(sock, FRAME.size))
+        yield kind, _recv_exact(sock, size)
+
+
+# ---------------------------------------------------------------- broker side
+
+
+class _ClientGone(Exception):
+    """The CLI process hung up (e.g. it stopped reading a command early)."""
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        broker = self.server.broker
+        broker.last_request = time.monotonic()
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        op = request.pop("op", None)
+        try:
+            if op == "connect":
+                broker.pool.acquire(**request).close()
+                self.reply(ok=True)
+            elif op == "exec":
+                self.exec(broker.pool, request)
+            elif op == "status":
+                self.reply(ok=True, **broker.status())
+            elif op == "stop":
+                self.reply(ok=True)
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                self.reply(ok=False, error=f"unknown op {op!r}")
+        except _ClientGone:
+            pass
+        except Exception as e:
+            self.reply(ok=False, error=str(e) or type(e).__name__)
+        finally:
+            broker.last_request = time.monotonic()
+
+    def exec(self, pool: SessionPool, request: dict):
+        command = request.pop("command")
+        max_bytes = request.pop("max_bytes", None)
+        max_lines = request.pop("max_lines", None)
+        client = pool.acquire(**request)
+        try:
+            _, stdout, stderr = client.exec_command(command)
+            self.relay(b"s")
+            # Each chunk is passed on as it arrives, within the caller's
+            # caps; if the caller hangs up, the command is stopped
+            output = RemoteOutput(stdout, stderr, max_bytes, max_lines)
+            chunks = output.chunks()
+            try:
+                for chunk in chunks:
+                    self.relay(b"o", chunk)
+            finally:
+                chunks.close()
+            err = output.stderr.encode()
+            status = stdout.channel.recv_exit_status()
+        finally:
+            client.close()
+        if err:
+            self.relay(b"e", err)
+        self.relay(b"x", struct.pack("<i", status))
+
+    def relay(self, kind: bytes, payload: bytes = b""):
+        try:
+            _send(self.request, kind, payload)
+        except OSError as e:
+            raise _ClientGone() from e
+
+    def reply(self, **message):
+        _send(self.request, b"r", json.dumps(message).encode())
+
+
+class Broker:
+    """Background process holding warm SSH sessions for CLI invocations.
+
+    Like OpenSSH's ControlMaster: commands are relayed over a Unix socket
+    to sessions the broker keeps authenticated, so a follow-up invocation
+    against the same host skips TCP, key exchange and auth. Sessions idle
+    for `idle` seconds are closed, and the broker exits once it has had
+    no requests for that long.
+    """
+
+    def __init__(self, path: Path = None, idle: float = IDLE):
+        self.path = Path(path or socket_path())
+        self.idle = idle
+        self.pool = SessionPool(max_idle=idle)
+        self.started = time.monotonic()
+        self.last_request = self.started
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "uptime": time.monotonic() - self.started,
+            "idle": self.idle,
+            "handshakes": self.pool.handshakes,
+            "sessions": [
+                f"{u}@{h}:{p}" + (f" via {jump}" if jump else "")
+                for u, h, p, jump in self.pool.sessions
+            ],
+        }
+
+    def serve(self):
+        # Only this user may talk to the broker: it holds their sessions
+        try:
+            st = os.lstat(self.path.parent)
+        except FileNotFoundError:
+            self.path.parent.mkdir(mode=0o700, parents=True)
+        else:
+            if stat.S_ISLNK(st.st_mode) or st.st_uid != os.getuid():
+                raise PermissionError(
+                    f"{self.path.parent} belongs to someone else; not listening there"
+                )
+        os.chmod(self.path.parent, 0o700)
+        self.path.unlink(missing_ok=True)
+
+        server = socketserver.ThreadingUnixStreamServer(str(self.path), _Handler)
+        server.daemon_threads = True
+        server.broker = self
+        threading.Thread(target=self._expire, args=(server,), daemon=True).start()
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            self.path.unlink(missing_ok=True)
+            self.pool.close_all()
+
+    def _expire(self, server):
+        while True:
+            time.sleep(min(self.idle, 5))
+            if time.monotonic() - self.last_request > self.idle:
+                server.shutdown()
+                return
+
+
+# ---------------------------------------------------------------- client side
+
+
+class _Relay:
+    """Channel stand-in for one command run by the broker.
+
+    Frames are read off the broker connection only as stdout is read, so
+    output streams through like a paramiko channel's. stderr and the exit
+    status follow stdout; close() hangs up, which stops the command.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._frames = _frames(sock)
+        self._stdout = b""
+        self._stderr = bytearray()
+        self._status = -1
+        self._done = threading.Event()
+
+    def start(self):
+        """Wait until the broker has started the command."""
+        kind, payload = self._next()
+        if kind != b"s":
+            self.close()
+            raise ConnectionError(f"unexpected {kind!r} frame from the broker")
+
+    def recv(self, size: int) -> bytes:
+        """Up to `size` bytes of stdout, as soon as any arrive; b"" at the end."""
+        while not self._stdout and not self._done.is_set():
+            self._next()
+        data, self._stdout = self._stdout[:size], self._stdout[size:]
+        return data
+
+    def recv_stderr(self, size: int) -> bytes:
+        # The broker sends stderr after stdout; wait for the command to end
+        self._done.wait()
+        data = bytes(self._stderr[:size])
+        del self._stderr[:size]
+        return data
+
+    def recv_exit_status(self) -> int:
+        while not self._done.is_set():
+            self._next()
+        return self._status
+
+    def close(self):
+        self.sock.close()
+        self._done.set()
+
+    def _next(self):
+        try:
+            kind, payload = next(self._frames)
+        except BaseException:
+            self.close()
+            raise
+        if kind == b"o":
+            self._stdout += payload
+        elif kind == b"e":
+            self._stderr += payload
+        elif kind == b"x":
+            (self._status,) = struct.unpack("<i", payload)
+            self.close()
+        elif kind == b"r":
+            self.close()
+            raise RuntimeError(json.loads(payload).get("error"))
+        return kind, payload
+
+
+class _Stream:
+    """stdout/stderr stand-in reading from a _Relay, like a ChannelFile."""
+
+    def __init__(self, channel: _Relay, stderr: bool = False):
+        self.channel = channel
+        self._recv = channel.recv_stderr if stderr else channel.recv
+
+    def read(self, size: int = -1) -> bytes:
+        if size >= 0:
+            return self._recv(size)
+        data = bytearray()
+        while chunk := self._recv(CHUNK):
+            data += chunk
+        return bytes(data)
+
+    def close(self):
+        self.channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class BrokerClient:
+    """What connect_ssh returns when a broker is running.
+
+    Each exec_command is relayed to the broker, which runs it on its warm
+    session; stdout and stderr are file-likes streaming from the broker
+    connection, and closing them stops the command.
+    """
+
+    def __init__(self, path: Path, target: dict):
+        self.path = path
+        self.target = target
+        self.host = target["host"]
+
+    def exec_command(self, command: str, max_bytes: int = None, max_lines: int = None):
+        """Run `command` in the broker, which applies the output caps."""
+        sock = _open(self.path)
+        relay = _Relay(sock)
+        try:
+            _request(
+                sock,
+                op="exec",
+                command=command,
+                max_bytes=max_bytes,
+                max_lines=max_lines,
+                **self.target,
+            )
+            relay.start()
+        except BaseException:
+            relay.close()
+            raise
+        return None, _Stream(relay), _Stream(relay, stderr=True)
+
+    def close(self):
+        pass  # the session stays warm in the broker
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def _open(path: Path) -> socket.socket:
+    check_private(path.parent)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+        check_peer(sock)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _request(sock, **message):
+    sock.sendall(json.dumps(message).encode() + b"\n")
+
+
+def call(op: str, path: Path = None, **message) -> dict:
+    """Send one control request (connect, status, stop) and return the reply."""
+    sock = _open(Path(path or socket_path()))
+    try:
+        _request(sock, op=op, **message)
+        for kind, payload in _frames(sock):
+            if kind == b"r":
+                return json.loads(payload)
+    finally:
+        sock.close()
+
+
+def running(path: Path = None) -> bool:
+    """Whether a broker answers on the socket."""
+    path = Path(path or socket_path())
+    if not path.exists():
+        return False
+    try:
+        _open(path).close()
+        return True
+    except OSError:
+        return False
+
+
+def connect_via_broker(target: dict):
+    """BrokerClient for `target` (acquire() kwargs), or None if no broker.
+
+    Raises ConnectionError when the broker is up but can't reach the host.
+    """
+    path = socket_path()
+    if not path.exists():
+        return None
+    try:
+        reply = call("connect", path, **target)
+    except PermissionError as e:
+        print(f"⚠️ Not using the broker: {e}")
+        return None
+    except OSError:
+        return None  # stale socket: the broker is gone
+    if not reply.get("ok"):
+        raise ConnectionError(reply.get("error"))
+    return BrokerClient(path, target)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    idle = float(argv[0]) if argv else IDLE
+    Broker(idle=idle).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,106 @@
 # src/cosmonaut/ssh/client.py
 import paramiko
 
+from cosmonaut.ssh.broker import BrokerClient, connect_via_broker
+from cosmonaut.ssh.known import breaker_open, down_reason, get_host_cache
+from cosmonaut.ssh.output import RemoteOutput
+from cosmonaut.ssh.pool import get_pool
+from cosmonaut.ssh.trace import command_label, span
+
 
 def connect_ssh(
-    host: str, user: str, port: int = 22, key_file: str = None, password: str = None
+    host: str,
+    user: str,
+    port: int = 22,
+    key_file: str = None,
+    password: str = None,
+    jump: str = None,
+    skip_down: bool = False,
 ):
-    """Connect to host via SSH and return client or None."""
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    """Connect to host via SSH and return client or None.
+
+    With `skip_down` (for loops over many hosts), a host that failed
+    several times in a row is given up on at once until its backoff runs
+    out, instead of waiting out the timeout again.
+
+    `jump` ([user@]host[:port]) reaches the host through a bastion, like
+    `ssh -J`; the bastion session is pooled and shared by every host
+    behind it.
+
+    If a broker is running (`cosmonaut ssh broker start`), commands are
+    relayed through its warm sessions. Otherwise sessions come from the
+    process-wide pool: connecting again to the same user@host:port reuses
+    the authenticated transport, and client.close() hands it back instead
+    of tearing it down.
+    """
+    if skip_down:
+        health = get_host_cache().health(host, port)
+        if breaker_open(health):
+            print(f"⏭️ Skipping {host}: {down_reason(health)}")
+            return None
 
+    target = dict(
+        host=host,
+        user=user,
+        port=port,
+        key_file=key_file,
+        password=password,
+        timeout=10,
+        jump=jump,
+    )
     try:
-        client.connect(
-            hostname=host,
-            username=user,
-            port=port,
-            key_filename=key_file,
-            password=password,
-            timeout=10,
+        return connect_via_broker(target) or get_pool().acquire(**target)
+    except paramiko.BadHostKeyException:
+        print(
+            f"❌ SSH failed: {host} presented a different host key than before."
+            f" If it was reinstalled, run `cosmonaut ssh forget {host}`"
         )
-        return client
+        return None
     except Exception as e:
         print(f"❌ SSH failed: {e}")
         return None
+
+
+def stream_command(
+    client, cmd: str, label: str = None, max_bytes: int = None, max_lines: int = None
+):
+    """Run `cmd` over an SSH client and yield its stdout lines as they arrive.
+
+    Output is read in chunks and split into lines on the fly, so memory
+    stays bounded however much the command prints: past `max_bytes` or
+    `max_lines` (defaults in cosmonaut/ssh/output.py, overridable via
+    COSMONAUT_MAX_OUTPUT_BYTES / _LINES) the command is stopped and a
+    "[... output truncated ...]" line ends the output. stderr is drained
+    concurrently and discarded. Leaving the loop early stops the command.
+
+    Traced as a "channel" span (open a channel, start the command) and an
+    "exec" span (the remote side runs while stdout is read). Errors
+    propagate; callers decide what a failed command means.
+    """
+    host = getattr(client, "host", None)
+    label = label or command_label(cmd)
+    with span(host, "channel", label):
+        if isinstance(client, BrokerClient):
+            # Capped in the broker too, so it stops relaying where we stop
+            _, stdout, stderr = client.exec_command(cmd, max_bytes, max_lines)
+        else:
+            _, stdout, stderr = client.exec_command(cmd)
+    output = RemoteOutput(stdout, stderr, max_bytes, max_lines)
+    with span(host, "exec", label) as extra:
+        try:
+            yield from output
+        finally:
+            extra["bytes"] = output.bytes
+            if output.truncated:
+                extra["truncated"] = True
+
+
+def run_command(
+    client, cmd: str, label: str = None, max_bytes: int = None, max_lines: int = None
+) -> str:
+    """Run `cmd` over an SSH client and return its stripped stdout.
+
+    Streamed and capped like stream_command(); the result is at most
+    about `max_bytes` long.
+    """
+    return "\n".join(stream_command(client, cmd, label, max_bytes, max_lines)).strip()
@@ -0,0 +1,120 @@
+# src/cosmonaut/ssh/fleet.py
+import asyncio
+import ipaddress
+import time
+from pathlib import Path
+
+from cosmonaut.ssh.aio import AsyncSSHEngine
+from cosmonaut.ssh.known import breaker_open, down_reason, get_host_cache
+from cosmonaut.ssh.specs import get_remote_specs_async
+
+# Hosts collected at once; all share one event loop, not a thread each
+WORKERS = 256
+DEADLINE = 30
+
+
+def targets_from_cidr(cidr: str) -> list:
+    """Every host address of a network, e.g. 10.0.0.0/24."""
+    try:
+        network = ipaddress.ip_network(cidr, strict=False)
+    except ValueError as e:
+        raise ValueError(f"Invalid CIDR: {cidr}") from e
+    return [str(ip) for ip in network.hosts()]
+
+
+def targets_from_file(path: Path) -> list:
+    """One host (or user@host) per line; blank lines and # comments skipped."""
+    targets = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            targets.append(line)
+    return targets
+
+
+async def collect_specs(engine: AsyncSSHEngine, target: str, deadline=DEADLINE):
+    """Gather specs from one host within `deadline` seconds.
+
+    `target` is host or user@host. Returns {"target", "ip", "ok", "specs",
+    "skipped", "error", "seconds"}; failures are reported, never raised.
+    """
+    user, host = target.split("@", 1) if "@" in target else (None, target)
+    result = {
+        "target": target,
+        "ip": host,
+        "ok": False,
+        "specs": None,
+        "skipped": False,
+    }
+    start = time.monotonic()
+    try:
+        async with asyncio.timeout(deadline):
+            specs = await get_remote_specs_async(engine, host, user=user)
+        result.update(ok=True, specs=specs, error=None)
+    except TimeoutError:
+        result["error"] = f"timed out after {deadline:.0f}s"
+    except Exception as e:
+        result["error"] = str(e) or type(e).__name__
+    finally:
+        await engine.disconnect(host, user=user)
+        result["seconds"] = time.monotonic() - start
+    return result
+
+
+async def collect_fleet_specs(
+    targets: list,
+    user: str,
+    on_result,
+    port: int = 22,
+    key_file: str = None,
+    password: str = None,
+    workers: int = WORKERS,
+    deadline: float = DEADLINE,
+    jump: str = None,
+    retry_down: bool = False,
+):
+    """collect_specs() for every target, `workers` at a time.
+
+    With `jump`, every target is reached through that bastion over one
+    shared connection to it. Hosts whose circuit breaker is open (failed
+    repeatedly and their backoff hasn't run out) are reported as skipped
+    without a connection attempt, unless `retry_down`.
+
+    Calls `on_result(result)` as each host finishes. Cancelling the call
+    (e.g. Ctrl-C) abandons the hosts still running.
+    """
+    slots = asyncio.Semaphore(max(1, workers))
+    cache = get_host_cache()
+
+    live = []
+    for target in targets:
+        host = target.split("@", 1)[-1]
+        health = cache.health(host, port)
+        if retry_down or not breaker_open(health):
+            live.append(target)
+            continue
+        on_result(
+            {
+                "target": target,
+                "ip": host,
+                "ok": False,
+                "specs": None,
+                "skipped": True,
+                "error": down_reason(health),
+                "seconds": 0.0,
+            }
+        )
+
+    async def one(target):
+        async with slots:
+            on_result(await collect_specs(engine, target, deadline))
+
+    async with AsyncSSHEngine(
+        user=user,
+        port=port,
+        key_file=key_file,
+        password=password,
+        timeout=deadline,
+        jump=jump,
+    ) as engine:
+        await asyncio.gather(*(one(target) for target in live))
@@ -0,0 +1,281 @@
+# src/cosmonaut/ssh/known.py
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import paramiko
+
+from cosmonaut.storage import SSH_HOSTS_FILE
+from cosmonaut.storage.backend import file_stamp
+from cosmonaut.storage.locking import atomic_write, file_lock
+
+# Default key files paramiko looks for, in its order
+DEFAULT_KEYS = ("id_rsa", "id_ecdsa", "id_ed25519")
+
+# Consecutive connection failures after which fleet runs skip a host
+BREAKER_THRESHOLD = 3
+# How long it's skipped: doubles with every further failure, up to a cap
+BACKOFF = 60
+MAX_BACKOFF = 6 * 3600
+# Connect timeout for hosts with a known handshake latency: this many
+# handshakes' worth, but never less than MIN_TIMEOUT
+TIMEOUT_FACTOR = 5
+MIN_TIMEOUT = 3
+
+
+def host_key_name(host: str, port: int = 22) -> str:
+    """How known_hosts names a host: host, or [host]:port off port 22."""
+    return host if port == 22 else f"[{host}]:{port}"
+
+
+def key_line(key) -> str:
+    """`type base64` of a paramiko or asyncssh public key."""
+    if isinstance(key, paramiko.PKey):
+        return f"{key.get_name()} {key.get_base64()}"
+    return " ".join(key.export_public_key("openssh").decode().split()[:2])
+
+
+def retry_at(health: dict):
+    """When a host with an open breaker may be probed again, or None."""
+    failures = health.get("failures", 0)
+    if failures < BREAKER_THRESHOLD or not health.get("last_failure"):
+        return None
+    backoff = min(BACKOFF * 2 ** (failures - BREAKER_THRESHOLD), MAX_BACKOFF)
+    return datetime.fromisoformat(health["last_failure"]) + timedelta(seconds=backoff)
+
+
+def breaker_open(health: dict, now: datetime = None) -> bool:
+    """Whether the host has failed often and recently enough to be skipped."""
+    until = retry_at(health)
+    return until is not None and (now or datetime.now()) < until
+
+
+def down_reason(health: dict) -> str:
+    wait = (retry_at(health) - datetime.now()).total_seconds()
+    return (
+        f"down ({health['failures']} failures, last: {health.get('last_error')});"
+        f" next probe in {max(wait, 0) / 60:.0f} min"
+    )
+
+
+def connect_timeout(health: dict, default: float) -> float:
+    """`default`, or less for hosts known to answer quickly."""
+    latency = health.get("latency")
+    if not latency:
+        return default
+    return min(default, max(MIN_TIMEOUT, latency * TIMEOUT_FACTOR))
+
+
+def winning_credential(client: paramiko.SSHClient, key_file: str = None):
+    """The credential a freshly connected client authenticated with.
+
+    {"method": "password"}, {"method": "agent", "fingerprint": ...} or
+    {"method": "key", "key": path}; None when it can't be told.
+    """
+    handler = client.get_transport().auth_handler
+    if handler is None:
+        return None
+    if handler.auth_method == "password":
+        return {"method": "password"}
+    if handler.auth_method != "publickey" or handler.private_key is None:
+        return None
+    key = handler.private_key
+    if isinstance(key, paramiko.AgentKey):
+        return {"method": "agent", "fingerprint": key.fingerprint}
+    path = _key_path(key, key_file)
+    return {"method": "key", "key": path} if path else None
+
+
+def _key_path(key, key_file: str = None):
+    candidates = [Path(key_file)] if key_file else []
+    candidates += [Path.home() / ".ssh" / name for name in DEFAULT_KEYS]
+    for path in candidates:
+        try:
+            blob = paramiko.PublicBlob.from_file(f"{path}.pub")
+        except (OSError, ValueError):
+            continue
+        if blob.key_blob == key.asbytes():
+            return str(path)
+    # No .pub to compare: an explicit key file is tried before anything else
+    return str(key_file) if key_file else None
+
+
+def auth_options(credential: dict, password: str = None):
+    """SSHClient.connect() kwargs that try only `credential`, or None.
+
+    None means the credential can't be used here (no password to send,
+    key file gone, key no longer in the agent): try everything instead.
+    """
+    method = credential.get("method")
+    only = {"allow_agent": False, "look_for_keys": False, "password": password}
+    if method == "password" and password is not None:
+        return only
+    if method == "key" and Path(credential.get("key", "")).exists():
+        return {**only, "key_filename": credential["key"]}
+    if method == "agent":
+        for key in paramiko.Agent().get_keys():
+            if key.fingerprint == credential.get("fingerprint"):
+                return {**only, "pkey": key}
+    return None
+
+
+class HostCache:
+    """Per-host SSH facts kept next to the inventory (data/ssh_hosts.json).
+
+    For each host:port, the host key first seen there, per user the
+    credential that last got in, and connection health:
+
+        {"10.0.0.5:22": {"host_key": "ssh-ed25519 AAAA...",
+                         "auth": {"root": {"method": "key", "key": "..."}},
+                         "health": {"latency": 0.21, "failures": 0}}}
+
+    Later connections verify the host key instead of accepting any, and
+    offer the winning credential alone instead of every agent key and key
+    file in turn (each failure is a round trip and counts toward the
+    server's MaxAuthTries). Health holds the handshake latency (a moving
+    average) and consecutive connection failures with the last error,
+    which drive connect timeouts and the fleet circuit breaker.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(".lock")
+        self._entries = {}
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def host_key(self, host: str, port: int = 22):
+        return self._entry(host, port).get("host_key")
+
+    def credential(self, user: str, host: str, port: int = 22):
+        return self._entry(host, port).get("auth", {}).get(user)
+
+    def health(self, host: str, port: int = 22) -> dict:
+        return self._entry(host, port).get("health", {})
+
+    def remember(
+        self,
+        host: str,
+        port: int = 22,
+        user: str = None,
+        credential: dict = None,
+        host_key: str = None,
+    ):
+        """Record a successful connection; writes only if something is new."""
+        self.remember_many([(host, port, user, credential, host_key)])
+
+    def remember_many(self, connections):
+        """remember() for many (host, port, user, credential, host_key) at
+        once, in a single write."""
+        new = []
+        for host, port, user, credential, host_key in connections:
+            entry = self._entry(host, port)
+            if (host_key and entry.get("host_key") != host_key) or (
+                credential and entry.get("auth", {}).get(user) != credential
+            ):
+                new.append((host, port, user, credential, host_key))
+        if not new:
+            return
+
+        def update(entries):
+            for host, port, user, credential, host_key in new:
+                entry = entries.setdefault(f"{host}:{port}", {})
+                if host_key:
+                    entry["host_key"] = host_key
+                if credential and user:
+                    entry.setdefault("auth", {})[user] = credential
+
+        self._update(update)
+
+    def record_health(self, host: str, port: int = 22, latency=None, error=None):
+        """Record a connection attempt: its handshake latency, or its error."""
+        self.record_health_many([(host, port, latency, error)])
+
+    def record_health_many(self, attempts):
+        """record_health() for many (host, port, latency, error) at once.
+
+        Successes on healthy hosts are written only when the latency
+        moved by more than a fifth, so routine connects don't rewrite the
+        file.
+        """
+        now = datetime.now().isoformat()
+        changes = {}
+        for host, port, latency, error in attempts:
+            name = f"{host}:{port}"
+            health = dict(changes.get(name) or self.health(host, port))
+            if error:
+                health.update(
+                    failures=health.get("failures", 0) + 1,
+                    last_error=error,
+                    last_failure=now,
+                )
+            else:
+                old = health.get("latency")
+                if not health.get("failures") and old and abs(latency - old) < old / 5:
+                    continue
+                health.pop("last_error", None)
+                health.pop("last_failure", None)
+                health.update(
+                    failures=0,
+                    latency=round(0.7 * old + 0.3 * latency if old else latency, 4),
+                )
+            changes[name] = health
+        if not changes:
+            return
+
+        def update(entries):
+            for name, health in changes.items():
+                entries.setdefault(name, {})["health"] = health
+
+        self._update(update)
+
+    def forget(self, host: str, port: int = 22, user: str = None):
+        """Drop `user`'s credential, or everything known about the host."""
+        name = f"{host}:{port}"
+
+        def update(entries):
+            if user is None:
+                entries.pop(name, None)
+            elif name in entries:
+                entries[name].get("auth", {}).pop(user, None)
+
+        self._update(update)
+
+    def _entry(self, host: str, port: int) -> dict:
+        return self._load().get(f"{host}:{port}", {})
+
+    def _load(self) -> dict:
+        stamp = file_stamp(self.path)
+        with self._lock:
+            if stamp != self._stamp:
+                try:
+                    self._entries = json.loads(self.path.read_bytes())
+                except FileNotFoundError:
+                    self._entries = {}
+                except ValueError:
+                    print(f"⚠️ Ignoring unreadable {self.path}")
+                    self._entries = {}
+                self._stamp = stamp
+            return self._entries
+
+    def _update(self, update):
+        with file_lock(self.lock_path):
+            # A deep copy: readers may hold the cached entries
+            entries = json.loads(json.dumps(self._load()))
+            update(entries)
+            atomic_write(
+                self.path,
+                json.dumps(entries, indent=2, ensure_ascii=False).encode("utf-8"),
+            )
+
+
+_cache = None
+
+
+def get_host_cache() -> HostCache:
+    """Shared cache in data/ssh_hosts.json."""
+    global _cache
+    if _cache is None:
+        _cache = HostCache(SSH_HOSTS_FILE)
+    return _cache
@@ -0,0 +1,183 @@
+# src/cosmonaut/ssh/output.py
+import os
+import threading
+
+# Caps on what is kept of one command's stdout; past either, the rest is
+# dropped, the command's channel closed and a truncation line appended.
+# Override with the environment variables for hosts with huge rulesets.
+MAX_BYTES = 8 * 1024 * 1024
+MAX_LINES = 100_000
+MAX_BYTES_ENV = "COSMONAUT_MAX_OUTPUT_BYTES"
+MAX_LINES_ENV = "COSMONAUT_MAX_OUTPUT_LINES"
+# stderr is only ever shown in error messages: keep its tail
+MAX_STDERR = 64 * 1024
+CHUNK = 32 * 1024
+
+
+def output_limits(max_bytes: int = None, max_lines: int = None):
+    """(max_bytes, max_lines), defaulting to the environment, then MAX_*."""
+    return (
+        max_bytes or int(os.environ.get(MAX_BYTES_ENV) or MAX_BYTES),
+        max_lines or int(os.environ.get(MAX_LINES_ENV) or MAX_LINES),
+    )
+
+
+def truncation_line(reason: str) -> str:
+    return f"[... output truncated: {reason} ...]"
+
+
+class LineBuffer:
+    """Splits output into lines as chunks arrive, within byte and line caps.
+
+    feed() returns the lines completed by a chunk; a partial last line
+    waits for the next one. Once a cap is reached, feed() returns the
+    lines that fit plus a truncation line and sets `truncated`; anything
+    fed after that is ignored.
+    """
+
+    def __init__(self, max_bytes: int = None, max_lines: int = None):
+        self.max_bytes, self.max_lines = output_limits(max_bytes, max_lines)
+        self.bytes = 0
+        self.lines = 0
+        self.truncated = False
+        self._partial = bytearray()
+
+    def feed(self, chunk: bytes) -> list:
+        if self.truncated or not chunk:
+            return []
+        room = self.max_bytes - self.bytes
+        self.bytes += len(chunk)
+        over_bytes = len(chunk) > room
+        self._partial += chunk[:room] if over_bytes else chunk
+
+        *complete, rest = self._partial.split(b"\n")
+        self._partial = bytearray(rest)
+        lines = [line.decode(errors="replace") for line in complete]
+        if self.lines + len(lines) > self.max_lines:
+            lines = lines[: self.max_lines - self.lines]
+            return self._truncate(lines, f"more than {self.max_lines} lines")
+        self.lines += len(lines)
+        if over_bytes:
+            return self._truncate(
+                lines + self.finish(), f"more than {self.max_bytes} bytes"
+            )
+        return lines
+
+    def finish(self) -> list:
+        """The last line, if the output didn't end with a newline."""
+        if not self._partial:
+            return []
+        line = self._partial.decode(errors="replace")
+        self._partial = bytearray()
+        self.lines += 1
+        return [line]
+
+    def _truncate(self, lines: list, reason: str) -> list:
+        self.truncated = True
+        self._partial = bytearray()
+        self.lines += len(lines)
+        return lines + [truncation_line(reason)]
+
+
+def _reader(stream, stderr: bool = False):
+    """A function returning the stream's next bytes as soon as any arrive.
+
+    paramiko's ChannelFile.read(n) waits for n bytes; its channel's
+    recv(n) returns whatever has come in, and so does the broker client's
+    relay (cosmonaut/ssh/broker.py). Other file-likes just read.
+    """
+    channel = getattr(stream, "channel", None)
+    recv = getattr(channel, "recv_stderr" if stderr else "recv", None)
+    return recv or stream.read
+
+
+class RemoteOutput:
+    """A remote command's stdout, iterated line by line as it arrives.
+
+    Memory stays bounded: at most `max_bytes` of stdout (and MAX_STDERR of
+    stderr) is held, and output past the caps ends the command. stderr is
+    drained on a thread meanwhile, so a command writing a lot to it never
+    stalls on a full channel window (paramiko only widens the window as
+    buffered data is read, stdout and stderr alike). Its tail is in
+    `stderr` once stdout is done.
+    """
+
+    def __init__(
+        self, stdout, stderr=None, max_bytes: int = None, max_lines: int = None
+    ):
+        self.stdout = stdout
+        self.buffer = LineBuffer(max_bytes, max_lines)
+        self._stderr = bytearray()
+        self._drain = None
+        if stderr is not None:
+            self._drain = threading.Thread(
+                target=self._drain_stderr, args=(stderr,), daemon=True
+            )
+            self._drain.start()
+
+    @property
+    def bytes(self) -> int:
+        return self.buffer.bytes
+
+    @property
+    def truncated(self) -> bool:
+        return self.buffer.truncated
+
+    @property
+    def stderr(self) -> str:
+        if self._drain is not None:
+            self._drain.join()
+        return self._stderr.decode(errors="replace")
+
+    def __iter__(self):
+        received = self._receive()
+        try:
+            for _, lines in received:
+                yield from lines
+        finally:
+            received.close()
+
+    def chunks(self):
+        """stdout as raw chunks as they arrive, for relaying elsewhere.
+
+        Ends with the chunk that crosses a cap; a LineBuffer with the same
+        caps on the other end cuts the output where this one did.
+        """
+        received = self._receive()
+        try:
+            for chunk, _ in received:
+                if chunk:
+                    yield chunk
+        finally:
+            received.close()
+
+    def _receive(self):
+        # (chunk, the lines it completed), then (b"", the last line)
+        read = _reader(self.stdout)
+        done = False
+        try:
+            while not self.truncated:
+                chunk = read(CHUNK)
+                if not chunk:
+                    done = True
+                    yield b"", self.buffer.finish()
+                    return
+                yield chunk, self.buffer.feed(chunk)
+        finally:
+            if not done:
+                self.close()  # cut off, failed, or abandoned by the caller
+
+    def close(self):
+        """Stop the command: close its channel (stderr drain ends with it)."""
+        channel = getattr(self.stdout, "channel", None)
+        if hasattr(channel, "close"):
+            channel.close()
+
+    def _drain_stderr(self, stream):
+        read = _reader(stream, stderr=True)
+        try:
+            while chunk := read(CHUNK):
+                self._stderr += chunk
+                del self._stderr[:-MAX_STDERR]
+        except (OSError, EOFError):
+            pass  # channel gone; keep what we have
@@ -0,0 +1,366 @@
+# src/cosmonaut/ssh/pool.py
+import atexit
+import base64
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+import paramiko
+
+from cosmonaut.ssh.known import (
+    auth_options,
+    connect_timeout,
+    get_host_cache,
+    host_key_name,
+    key_line,
+    winning_credential,
+)
+from cosmonaut.ssh.trace import span, tracer
+
+# Idle sessions older than this are closed instead of reused
+MAX_IDLE = 300
+# Most sessions kept open at once; the least recently used idle one goes first
+MAX_SESSIONS = 32
+# Sessions idle for longer than this are probed before being handed out
+HEALTH_CHECK_AFTER = 15
+
+
+def parse_jump(jump: str, user: str) -> tuple:
+    """(user, host, port) of a jump host given as [user@]host[:port]."""
+    jump_user, _, jump_host = jump.rpartition("@")
+    jump_host, _, jump_port = jump_host.partition(":")
+    if not jump_host or (jump_port and not jump_port.isdigit()):
+        raise ValueError(f"Invalid jump host: {jump}")
+    return jump_user or user, jump_host, int(jump_port or 22)
+
+
+def unreachable(error: Exception) -> bool:
+    """Whether a failed connect means the host is down (not, say, bad auth)."""
+    if isinstance(
+        error, (paramiko.AuthenticationException, paramiko.BadHostKeyException)
+    ):
+        return False
+    return isinstance(error, (OSError, EOFError, paramiko.SSHException))
+
+
+class Session:
+    """One authenticated SSHClient and its bookkeeping in the pool.
+
+    `via` is the bastion session a jumped session tunnels through; the
+    session holds a lease on it until closed.
+    """
+
+    def __init__(self, key: tuple, client: paramiko.SSHClient, via: "Session" = None):
+        self.key = key
+        self.client = client
+        self.via = via
+        self.leases = 0
+        self.last_used = time.monotonic()
+
+    def alive(self) -> bool:
+        transport = self.client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        if time.monotonic() - self.last_used < HEALTH_CHECK_AFTER:
+            return True
+        try:
+            transport.send_ignore()  # cheap round trip through the channel layer
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class PooledClient:
+    """SSHClient stand-in handed out by the pool.
+
+    Behaves like the paramiko client it wraps (exec_command, open_sftp, ...),
+    except that close() returns the session to the pool. Each exec_command
+    opens its own channel on the shared transport, so several leases of the
+    same host can run commands concurrently (up to the server's
+    MaxSessions, 10 by default for OpenSSH).
+    """
+
+    def __init__(self, pool: "SessionPool", session: Session):
+        self._pool = pool
+        self._session = session
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._session.client, name)
+
+    @property
+    def host(self) -> str:
+        return self._session.key[1]
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._pool.release(self._session)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class SessionPool:
+    """Authenticated SSH sessions kept per (user, host, port, jump).
+
+    Repeated connects to the same target reuse the open transport instead
+    of paying TCP, key exchange and auth again. Idle sessions expire after
+    `max_idle` seconds, the pool holds at most `max_sessions` (LRU
+    eviction of idle ones), and a session that has sat idle is probed
+    before reuse.
+
+    Hosts behind a bastion (`jump`) are reached over direct-tcpip channels
+    of one pooled bastion session, so many inner hosts cost a single
+    bastion handshake.
+    """
+
+    def __init__(self, max_idle: float = MAX_IDLE, max_sessions: int = MAX_SESSIONS):
+        self.max_idle = max_idle
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.handshakes = 0
+        self._lock = threading.Lock()
+        self._connecting = {}
+
+    def acquire(
+        self,
+        host: str,
+        user: str,
+        port: int = 22,
+        key_file: str = None,
+        password: str = None,
+        timeout: float = 10,
+        jump: str = None,
+    ) -> PooledClient:
+        """Lease a session to user@host:port, connecting only if needed.
+
+        `jump` ([user@]host[:port]) tunnels the connection through that
+        bastion, like `ssh -J`. Raises whatever paramiko raises when a new
+        connection fails.
+        """
+        key = (user, host, port, jump)
+        with self._lock:
+            self._expire()
+            # One handshake per target even when several threads ask at once.
+            # [lock, threads using it]: the last one out removes it, so the
+            # pool doesn't keep a lock for every target it ever saw.
+            connecting = self._connecting.setdefault(key, [threading.Lock(), 0])
+            connecting[1] += 1
+        try:
+            with connecting[0]:
+                return self._acquire(
+                    key, host, user, port, key_file, password, timeout, jump
+                )
+        finally:
+            with self._lock:
+                connecting[1] -= 1
+                if not connecting[1]:
+                    del self._connecting[key]
+
+    def _acquire(self, key, host, user, port, key_file, password, timeout, jump):
+        with self._lock:
+            session = self.sessions.get(key)
+            if session is not None and not session.alive():
+                if session.leases:
+                    session = None  # others still hold it; don't close
+                else:
+                    self._drop(key)
+                    session = None
+            if session is not None:
+                return self._lease(session)
+
+        via = None
+        if jump:
+            jump_user, jump_host, jump_port = parse_jump(jump, user)
+            via = self.acquire(
+                jump_host, jump_user, jump_port, key_file, password, timeout
+            )
+        try:
+            client = self._connect(host, user, port, key_file, password, timeout, via)
+        except BaseException:
+            if via is not None:
+                via.close()
+            raise
+        with self._lock:
+            # The new session keeps the bastion lease until it's closed
+            session = Session(key, client, via._session if via else None)
+            old = self.sessions.pop(key, None)
+            if old is not None and not old.leases:
+                self._close(old)
+            self.sessions[key] = session
+            self.handshakes += 1
+            self._evict()
+            return self._lease(session)
+
+    def release(self, session: Session):
+        with self._lock:
+            session.leases -= 1
+            session.last_used = time.monotonic()
+            if self.sessions.get(session.key) is not session and not session.leases:
+                self._close(session)  # replaced or evicted while leased
+            self._expire()
+            self._evict()
+
+    def close_all(self):
+        with self._lock:
+            # Tunnelled sessions first, then the bastions they run through
+            for session in sorted(self.sessions.values(), key=lambda s: not s.via):
+                session.close()
+            self.sessions.clear()
+
+    def _lease(self, session: Session) -> PooledClient:
+        session.leases += 1
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(session.key)
+        return PooledClient(self, session)
+
+    def _connect(self, host, user, port, key_file, password, timeout, via=None):
+        cache = get_host_cache()
+        # Hosts known to answer quickly don't get the full timeout
+        timeout = connect_timeout(cache.health(host, port), timeout)
+        start = time.monotonic()
+        try:
+            client, credential = self._authenticate(
+                cache, host, user, port, key_file, password, timeout, via
+            )
+        except Exception as e:
+            if unreachable(e):
+                cache.record_health(host, port, error=str(e) or type(e).__name__)
+            raise
+        cache.record_health(host, port, latency=time.monotonic() - start)
+
+        key = client.get_transport().get_remote_server_key()
+        cache.remember(host, port, user, credential, key_line(key))
+        return client
+
+    def _authenticate(self, cache, host, user, port, key_file, password, timeout, via):
+        # An explicit key file is tried first anyway; otherwise offer what
+        # got in last time before every agent key and default key file
+        credential = None if key_file else cache.credential(user, host, port)
+        options = credential and auth_options(credential, password)
+        if options:
+            try:
+                return self._open(host, port, user, timeout, via, **options), credential
+            except paramiko.AuthenticationException:
+                cache.forget(host, port, user)  # stale: try everything below
+        client = self._open(
+            host, port, user, timeout, via, key_filename=key_file, password=password
+        )
+        return client, winning_credential(client, key_file)
+
+    def _open(self, host, port, user, timeout, via, **auth):
+        sock = None
+        if via is not None:
+            with span(host, "tcp", "direct-tcpip"):
+                sock = via.get_transport().open_channel(
+                    "direct-tcpip", (host, port), ("127.0.0.1", 0), timeout=timeout
+                )
+        elif tracer.enabled:
+            # Connect ourselves so TCP shows up apart from the handshake
+            with span(host, "tcp"):
+                sock = socket.create_connection((host, port), timeout)
+        if tracer.enabled:
+            auth["transport_factory"] = _TracedTransport.factory(host)
+
+        client = paramiko.SSHClient()
+        # Hosts seen before must present the same key (BadHostKeyException
+        # otherwise); new ones are accepted and remembered
+        known = get_host_cache().host_key(host, port)
+        if known:
+            key_type, data = known.split(" ", 1)
+            client.get_host_keys().add(
+                host_key_name(host, port),
+                key_type,
+                paramiko.PKey.from_type_string(key_type, base64.b64decode(data)),
+            )
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            client.connect(
+                hostname=host,
+                username=user,
+                port=port,
+                timeout=timeout,
+                banner_timeout=timeout,
+                sock=sock,
+                **auth,
+            )
+        except BaseException:
+            client.close()
+            if sock is not None:
+                sock.close()
+            raise
+        if tracer.enabled:
+            # Whatever followed key exchange: host key check and auth
+            tracer.add(
+                host, "auth", client.get_transport().kex_done, time.perf_counter()
+            )
+        return client
+
+    def _close(self, session: Session):
+        session.close()
+        via, session.via = session.via, None
+        if via is not None:
+            # Hand back the bastion lease (the lock is already held)
+            via.leases -= 1
+            via.last_used = time.monotonic()
+            if not via.leases and self.sessions.get(via.key) is not via:
+                self._close(via)  # replaced while tunnels ran through it
+
+    def _drop(self, key: tuple):
+        self._close(self.sessions.pop(key))
+
+    def _expire(self):
+        now = time.monotonic()
+        for key, session in list(self.sessions.items()):
+            if not session.leases and now - session.last_used > self.max_idle:
+                self._drop(key)
+
+    def _evict(self):
+        for key, session in list(self.sessions.items()):
+            if len(self.sessions) <= self.max_sessions:
+                break
+            if not session.leases:
+                self._drop(key)
+
+
+class _TracedTransport(paramiko.Transport):
+    """Transport that records its key exchange as a "kex" span."""
+
+    @classmethod
+    def factory(cls, host: str):
+        def make(sock, **kwargs):
+            transport = cls(sock, **kwargs)
+            transport.traced_host = host
+            return transport
+
+        return make
+
+    def start_client(self, *args, **kwargs):
+        with span(self.traced_host, "kex"):
+            result = super().start_client(*args, **kwargs)
+        self.kex_done = time.perf_counter()
+        return result
+
+
+_pool = None
+
+
+def get_pool() -> SessionPool:
+    """The process-wide session pool, closed at interpreter exit."""
+    global _pool
+    if _pool is None:
+        _pool = SessionPool()
+        atexit.register(_pool.close_all)
+    return _pool
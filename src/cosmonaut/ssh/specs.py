@@ -1,119 +1,231 @@
 # src/cosmonaut/ssh/specs.py
+import asyncio
 import ipaddress
+import re
+import shlex
+import uuid
+
+from cosmonaut.ssh.client import run_command
+
+# One shell command per section of the spec report. They all run in a
+# single remote script; each section's output is fenced by marker lines.
+SECTIONS = {
+    "hostname": "hostname",
+    "os": "grep PRETTY_NAME /etc/os-release | cut -d= -f2 | tr -d '\"'",
+    "kernel": "uname -r",
+    "arch": "uname -m",
+    "uptime": "uptime -p",
+    "cores": "nproc",
+    "memory": "free -h",
+    "disk": 'df -h / | awk \'NR==2{print $4 " (" $5 ")"}\'',
+    "public_ip": "curl -s ifconfig.me || echo 'Unknown'",
+    "users": "who | wc -l | xargs echo -n",
+    # Read once; database connections are filtered out locally
+    "connections": "/usr/bin/ss -tun | /usr/bin/grep ESTAB",
+}
+
+DB_PORTS = re.compile(r":3306|:5432|:6379")
+
+
+def build_script(marker: str, sections=SECTIONS) -> str:
+    """Shell script that runs every section and fences its stdout.
+
+    Each section prints `<marker> <name>` before and `<marker> end <status>`
+    after its output, so a section cut short is detectable.
+    """
+    parts = []
+    for name, command in sections.items():
+        parts.append(
+            f"echo '{marker} {name}'; ( {command} ) 2>/dev/null; "
+            f'rc=$?; echo; echo "{marker} end $rc"'
+        )
+    return "\n".join(parts)
+
+
+def parse_sections(output: str, marker: str) -> dict:
+    """{section name: stripped output} for every section that completed."""
+    sections = {}
+    name, lines = None, []
+    for line in output.splitlines():
+        if line.startswith(marker + " "):
+            tag = line[len(marker) + 1 :]
+            if tag.startswith("end ") and name is not None:
+                sections[name] = "\n".join(lines).strip()
+                name = None
+            elif not tag.startswith("end "):
+                name, lines = tag, []
+        elif name is not None:
+            lines.append(line)
+    return sections
+
+
+def parse_memory_free(output: str) -> str:
+    """Available memory from `free -h` output (English or German locale)."""
+    try:
+        lines = output.strip().splitlines()
+        if not lines:
+            return "N/A"
 
+        header = lines[0].lower()
+        mem_line = None
+        for line in lines[1:]:
+            if line.startswith("Speicher:") or line.startswith("Mem:"):
+                mem_line = line
+                break
 
-def get_remote_specs(client):
-    """Run remote commands and return system specs."""
+        if not mem_line:
+            return "N/A"
+
+        # Split header and find "verfügbar" or "available"
+        header_parts = header.split()
+        mem_parts = mem_line.split()
+
+        # Look for "verfügbar" or "available" in headers
+        available_idx = -1
+        for i, col in enumerate(header_parts):
+            if "verf" in col or "available" in col:
+                available_idx = i
+                break
+
+        if available_idx == -1 or available_idx >= len(mem_parts):
+            return "N/A"
+
+        return mem_parts[available_idx]
+    except Exception:
+        return "N/A"
+
+
+def extract_remote_ips(info, output: str) -> list[str]:
+    ips = []
+
+    for line in output.splitlines():
+        line = line.strip()
+
+        if "State" in line or "Netid" in line or "ESTAB" not in line:
+            continue
+
+        parts = line.split()
+        if len(parts) < 6:  # Need at least 6 columns
+            continue
+
+        # 6th column = remote address:port
+        remote = parts[5]
+
+        # Remove port
+        if ":" in remote:
+            addr = remote.rsplit(":", 1)[0]
+        else:
+            addr = remote
+
+        # Remove brackets
+        if addr.startswith("[") and addr.endswith("]"):
+            addr = addr[1:-1]
+
+        # Handle ::ffff:
+        if addr.lower().startswith("::ffff:"):
+            addr = addr.split("::ffff:", 1)[1]
 
-    def run(cmd):
+        if addr == "::1":
+            addr = "127.0.0.1"
+
+        # Validate
         try:
-            _, stdout, _ = client.exec_command(cmd)
-            return stdout.read().decode().strip()
+            ipaddress.ip_address(addr)
+            ips.append(addr)
         except Exception:
-            return "N/A"
+            # this fails silently
+            print(f"Failed to parse IP address: {addr}")
+            continue
+
+    return list(set(ips))
+
 
-    # Detect language and get memory free (available)
-    def get_memory_free():
+def collect_sections(client, batched: bool = True) -> dict:
+    """Raw output of every section in SECTIONS.
+
+    Batched, all sections run in one `sh -c` script over one channel: one
+    round trip instead of one per command. A section missing from the
+    result (script failed or was cut off) is rerun on its own channel.
+    """
+
+    def run(cmd, label):
         try:
-            # Run `free -h` and read first line (header)
-            _, stdout, _ = client.exec_command("free -h")
-            lines = stdout.read().decode().strip().splitlines()
-            if not lines:
-                return "N/A"
-
-            header = lines[0].lower()
-            mem_line = None
-            for line in lines[1:]:
-                if line.startswith("Speicher:") or line.startswith("Mem:"):
-                    mem_line = line
-                    break
-
-            if not mem_line:
-                return "N/A"
-
-            # Split header and find "verfügbar" or "available"
-            header_parts = header.split()
-            mem_parts = mem_line.split()
-
-            # Look for "verfügbar" or "available" in headers
-            available_idx = -1
-            for i, col in enumerate(header_parts):
-                if "verf" in col or "available" in col:
-                    available_idx = i
-                    break
-
-            if available_idx == -1 or available_idx >= len(mem_parts):
-                return "N/A"
-
-            return mem_parts[available_idx]
+            return run_command(client, cmd, label)
         except Exception:
             return "N/A"
 
-    def extract_remote_ips(info, output: str) -> list[str]:
-        ips = []
+    sections = {}
+    if batched:
+        marker = new_marker()
+        sections = parse_sections(run(batched_command(marker), "specs"), marker)
+
+    # Per-section fallback
+    for name, command in SECTIONS.items():
+        if name not in sections:
+            sections[name] = run(command, name)
+    return sections
+
 
-        for line in output.splitlines():
-            line = line.strip()
-            # print(line)
+async def collect_sections_async(engine, host: str, **target) -> dict:
+    """collect_sections() on an AsyncSSHEngine; fallbacks run concurrently.
 
-            if "State" in line or "Netid" in line or "ESTAB" not in line:
-                continue
+    Connection errors and timeouts propagate; `target` is passed to
+    engine.run (user, port, timeout).
+    """
+    marker = new_marker()
+    sections = parse_sections(
+        await engine.run(host, batched_command(marker), label="specs", **target),
+        marker,
+    )
 
-            parts = line.split()
-            # print(parts, len(parts))
-            if len(parts) < 6:  # Need at least 6 columns
-                continue
+    async def fallback(name):
+        try:
+            return await engine.run(host, SECTIONS[name], label=name, **target)
+        except Exception:
+            return "N/A"
 
-            # 6th column = remote address:port
-            remote = parts[5]
+    missing = [name for name in SECTIONS if name not in sections]
+    outputs = await asyncio.gather(*(fallback(name) for name in missing))
+    sections.update(zip(missing, outputs))
+    return sections
 
-            # Remove port
-            if ":" in remote:
-                addr = remote.rsplit(":", 1)[0]
-            else:
-                addr = remote
 
-            # Remove brackets
-            if addr.startswith("[") and addr.endswith("]"):
-                addr = addr[1:-1]
+def new_marker() -> str:
+    return f"@@cosmonaut-{uuid.uuid4().hex}@@"
 
-            # Handle ::ffff:
-            if addr.lower().startswith("::ffff:"):
-                addr = addr.split("::ffff:", 1)[1]
 
-            if addr == "::1":
-                addr = "127.0.0.1"
+def batched_command(marker: str) -> str:
+    return f"sh -c {shlex.quote(build_script(marker))}"
 
-            # Validate
-            try:
-                ipaddress.ip_address(addr)
-                ips.append(addr)
-            except Exception:
-                # this fails silently
-                print(f"Failed to parse IP address: {addr}")
-                continue
 
-        return list(set(ips))
+def specs_from_sections(out: dict) -> dict:
+    """Assemble the spec report from collected section output."""
+    connections = out["connections"]
+    db_connections = "\n".join(
+        line for line in connections.splitlines() if DB_PORTS.search(line)
+    )
 
     return {
-        "Hostname": run("hostname"),
-        "OS": run("grep PRETTY_NAME /etc/os-release | cut -d= -f2 | tr -d '\"'"),
-        "Kernel": run("uname -r"),
-        "Architecture": run("uname -m"),
-        # "OS": run("uname -srm"),
-        "Uptime": run("uptime -p"),
-        "CPU Cores": run("nproc"),
-        "Memory Free": get_memory_free(),
-        "Disk Root Free": run('df -h / | awk \'NR==2{print $4 " (" $5 ")"}\''),
-        "Public IP": run("curl -s ifconfig.me || echo 'Unknown'"),
-        "Users Logged In": run("who | wc -l | xargs echo -n"),
-        "outbound_dbs": extract_remote_ips(
-            "dbs",
-            run(
-                "/usr/bin/ss -tun | /usr/bin/grep ESTAB | /usr/bin/grep -E ':3306|:5432|:6379'"
-            ),
-        ),
-        "outbound_webs": extract_remote_ips(
-            "webs", run("/usr/bin/ss -tun | /usr/bin/grep ESTAB")
-        ),
+        "Hostname": out["hostname"],
+        "OS": out["os"],
+        "Kernel": out["kernel"],
+        "Architecture": out["arch"],
+        "Uptime": out["uptime"],
+        "CPU Cores": out["cores"],
+        "Memory Free": parse_memory_free(out["memory"]),
+        "Disk Root Free": out["disk"],
+        "Public IP": out["public_ip"],
+        "Users Logged In": out["users"],
+        "outbound_dbs": extract_remote_ips("dbs", db_connections),
+        "outbound_webs": extract_remote_ips("webs", connections),
     }
+
+
+def get_remote_specs(client, batched: bool = True):
+    """Run remote commands and return system specs."""
+    return specs_from_sections(collect_sections(client, batched=batched))
+
+
+async def get_remote_specs_async(engine, host: str, **target) -> dict:
+    """get_remote_specs() for one host of an AsyncSSHEngine."""
+    return specs_from_sections(await collect_sections_async(engine, host, **target))
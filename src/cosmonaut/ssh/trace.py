@@ -0,0 +1,158 @@
+# src/cosmonaut/ssh/trace.py
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Connection phases, in the order they happen
+CONNECT_PHASES = ("tcp", "kex", "auth", "handshake")
+# Per-command phases: opening the channel and starting the command, then
+# the remote side running it while its output is read
+COMMAND_PHASES = ("channel", "exec")
+
+
+class Tracer:
+    """Timing spans of SSH work: (host, phase, label, bytes, duration).
+
+    Disabled by default, in which case span() costs next to nothing. When
+    enabled (`cosmonaut --trace out.json` or `--profile`), the pool, the
+    asyncio engine and run_command() record where each host's time goes:
+    TCP connect, key exchange, auth, channel open and remote execution.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+        self.spans = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, host: str, phase: str, label: str = None):
+        """Time the block as one span; set "bytes" on the yielded dict."""
+        if not self.enabled:
+            yield {}
+            return
+        extra = {}
+        start = time.perf_counter()
+        try:
+            yield extra
+        except Exception as e:
+            extra["error"] = str(e) or type(e).__name__
+            raise
+        finally:
+            self.add(host, phase, start, time.perf_counter(), label, **extra)
+
+    def add(self, host, phase, start, end, label=None, **extra):
+        """Record a span measured by the caller (perf_counter() times)."""
+        if not self.enabled:
+            return
+        span = {
+            "host": host or "?",
+            "phase": phase,
+            "label": label,
+            "start": start - self._start,
+            "duration": end - start,
+            "thread": threading.get_ident(),
+            **extra,
+        }
+        with self._lock:
+            self.spans.append(span)
+
+    def chrome_trace(self) -> dict:
+        """The spans as a Chrome trace (chrome://tracing, ui.perfetto.dev).
+
+        One row per host; each span is a complete ("X") event named after
+        its command label or phase.
+        """
+        pid = os.getpid()
+        rows = {}
+        events = []
+        for span in sorted(self.spans, key=lambda s: s["start"]):
+            tid = rows.setdefault(span["host"], len(rows) + 1)
+            args = {
+                key: value
+                for key, value in span.items()
+                if key not in ("start", "duration", "thread")
+            }
+            events.append(
+                {
+                    "name": span["label"] or span["phase"],
+                    "cat": span["phase"],
+                    "ph": "X",
+                    "ts": round(span["start"] * 1e6, 1),
+                    "dur": round(span["duration"] * 1e6, 1),
+                    "pid": pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+        events += [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": host},
+            }
+            for host, tid in rows.items()
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path):
+        Path(path).write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+
+    def by_host(self) -> list:
+        """Per host: seconds connecting and running commands, slowest first."""
+        hosts = {}
+        for span in self.spans:
+            row = hosts.setdefault(
+                span["host"],
+                {"host": span["host"], "connect": 0.0, "commands": 0.0, "count": 0},
+            )
+            if span["phase"] in CONNECT_PHASES:
+                row["connect"] += span["duration"]
+            elif span["phase"] in COMMAND_PHASES:
+                row["commands"] += span["duration"]
+                row["count"] += span["phase"] == "exec"
+        return sorted(
+            hosts.values(), key=lambda r: r["connect"] + r["commands"], reverse=True
+        )
+
+    def by_command(self) -> list:
+        """Per (host, label): channel + exec seconds and bytes, slowest first."""
+        commands = {}
+        for span in self.spans:
+            if span["phase"] not in COMMAND_PHASES:
+                continue
+            key = (span["host"], span["label"])
+            row = commands.setdefault(
+                key,
+                {
+                    "host": key[0],
+                    "label": key[1],
+                    "seconds": 0.0,
+                    "bytes": 0,
+                    "runs": 0,
+                },
+            )
+            row["seconds"] += span["duration"]
+            row["bytes"] += span.get("bytes", 0)
+            row["runs"] += span["phase"] == "exec"
+        return sorted(commands.values(), key=lambda r: r["seconds"], reverse=True)
+
+
+tracer = Tracer()
+span = tracer.span
+
+
+def command_label(cmd: str) -> str:
+    """Short name for a command in traces: its program, e.g. `ss`."""
+    words = cmd.split()
+    return os.path.basename(words[0]) if words else "?"
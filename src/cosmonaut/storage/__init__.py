@@ -0,0 +1,376 @@
+# src/cosmonaut/storage/__init__.py
+import json
+import os
+from pathlib import Path
+from datetime import datetime
+
+from cosmonaut.storage.backend import InventoryBackend, JsonBackend, clear_cache
+from cosmonaut.storage.binary import BinaryBackend
+from cosmonaut.storage.history import HistoryLog, changes_between
+from cosmonaut.storage.index import INDEXED_FIELDS
+from cosmonaut.storage.journal import JournalBackend
+from cosmonaut.storage.seen import SeenLog, content_hash, overlay
+from cosmonaut.storage.sqlite import SqliteBackend
+
+# Define paths
+DATA_DIR = Path("data")
+SERVERS_FILE = DATA_DIR / "servers.json"
+SQLITE_FILE = DATA_DIR / "servers.db"
+JOURNAL_FILE = DATA_DIR / "servers.journal"
+BINARY_FILE = DATA_DIR / "servers.bin"
+HISTORY_FILE = DATA_DIR / "history.ndjson"
+SEEN_FILE = DATA_DIR / "last_seen.ndjson"
+SSH_HOSTS_FILE = DATA_DIR / "ssh_hosts.json"
+RDNS_FILE = DATA_DIR / "rdns.json"
+SCANS_DIR = DATA_DIR / "scans"
+PROBE_HISTORY_FILE = DATA_DIR / "probe_history.json"
+
+# Which backend load_servers/record_server use. Override per process with
+# COSMONAUT_STORAGE=sqlite (or journal, binary).
+STORAGE_ENV = "COSMONAUT_STORAGE"
+DEFAULT_BACKEND = "json"
+
+BACKENDS = {
+    "json": lambda data_dir: JsonBackend(data_dir / SERVERS_FILE.name),
+    "sqlite": lambda data_dir: SqliteBackend(data_dir / SQLITE_FILE.name),
+    "journal": lambda data_dir: JournalBackend(
+        data_dir / SERVERS_FILE.name, data_dir / JOURNAL_FILE.name
+    ),
+    "binary": lambda data_dir: BinaryBackend(data_dir / BINARY_FILE.name),
+}
+
+_backends = {}
+_seen = None
+
+
+def ensure_data_dir():
+    """Create data/ directory if it doesn't exist."""
+    DATA_DIR.mkdir(exist_ok=True)
+
+
+def open_backend(name: str = None, data_dir: Path = DATA_DIR) -> InventoryBackend:
+    """Create a backend for `name` (or the configured one) rooted at `data_dir`."""
+    name = (name or os.environ.get(STORAGE_ENV) or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown storage backend: {name} (choose from {', '.join(BACKENDS)})"
+        )
+    return BACKENDS[name](Path(data_dir))
+
+
+def get_backend(name: str = None) -> InventoryBackend:
+    """Return the shared data/ backend for `name` or the configured one."""
+    name = (name or os.environ.get(STORAGE_ENV) or DEFAULT_BACKEND).lower()
+    if name not in _backends:
+        _backends[name] = open_backend(name)
+    return _backends[name]
+
+
+def get_history() -> HistoryLog:
+    """Change history of the inventory (data/history.ndjson)."""
+    return HistoryLog(HISTORY_FILE)
+
+
+def get_seen() -> SeenLog:
+    """Shared side table of unchanged observations (data/last_seen.ndjson)."""
+    global _seen
+    if _seen is None:
+        _seen = SeenLog(SEEN_FILE)
+    return _seen
+
+
+def with_seen(servers: dict) -> dict:
+    """`servers` with newer last_seen observations from the side table."""
+    latest = get_seen().latest()
+    touched = {ip: overlay(servers[ip], latest[ip]) for ip in latest if ip in servers}
+    return {**servers, **touched} if touched else servers
+
+
+def load_servers(fields=None):
+    """Load servers dict from the configured backend.
+
+    JSON documents are parsed once per process and reused until the file's
+    inode, mtime or size changes. Treat the returned records as read-only;
+    go through record_server/save_servers to change them.
+
+    `fields` names the keys the caller needs (top-level or "specs.<key>").
+    The binary backend then decodes only those; others return full records.
+    """
+    ensure_data_dir()
+    backend = get_backend()
+    return with_seen(backend.project(fields) if fields else backend.load())
+
+
+def iter_servers(fields=None):
+    """Yield (ip, record) pairs from the configured backend as they are read.
+
+    Unlike load_servers() this never holds the whole inventory: JSON is
+    parsed incrementally and SQLite is paged, so consumers can start on the
+    first host right away. `fields` is the same hint as for load_servers.
+    """
+    ensure_data_dir()
+    latest = get_seen().latest()
+    for ip, record in get_backend().iter_items(fields):
+        yield ip, overlay(record, latest.get(ip))
+
+
+def save_servers(servers):
+    """Replace the whole inventory in the configured backend."""
+    ensure_data_dir()
+    get_backend().save(servers)
+
+
+def find_servers(**filters) -> list:
+    """IPs matching every given filter, answered from the secondary indexes.
+
+    Filters are hostname, domain, tag, source and os (specs["OS"]); values
+    are case-insensitive and a trailing `*` matches a prefix.
+    """
+    ensure_data_dir()
+    backend = get_backend()
+    matches = None
+    for field, value in filters.items():
+        if value is None:
+            continue
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Cannot query by {field}")
+        ips = backend.query(field, value)
+        matches = ips if matches is None else matches & ips
+        if not matches:
+            break
+    return sorted(matches or ())
+
+
+def list_values(field: str) -> list:
+    """Distinct (normalized) values of an indexed field, e.g. all domains."""
+    ensure_data_dir()
+    return get_backend().distinct(field)
+
+
+def get_server(ip: str):
+    """Return one host record, or None if it isn't in the inventory."""
+    ensure_data_dir()
+    record = get_backend().get(ip)
+    return record and overlay(record, get_seen().latest().get(ip))
+
+
+def get_servers(ips) -> dict:
+    """Return {ip: record} for those of `ips` in the inventory (one read)."""
+    ensure_data_dir()
+    return with_seen(get_backend().get_many(ips))
+
+
+def merge_record(
+    existing: dict,
+    ip: str,
+    hostname: str = None,
+    specs: dict = None,
+    websites: list = None,
+    source: str = "unknown",
+) -> dict:
+    """Return a new record with one observation merged into `existing`."""
+    if existing is None:
+        record = {
+            "ip": ip,
+            "first_seen": datetime.now().isoformat(),
+            "last_seen": None,
+            "hostname": "unknown",
+            "specs": {},
+            "websites": [],
+            "sources": [],
+            "tags": [],
+        }
+    else:
+        record = dict(existing)
+
+    # Update fields
+    if hostname:
+        record["hostname"] = hostname
+
+    if specs is not None:
+        # Ensure lists are flat
+        if isinstance(specs.get("outbound_dbs"), list):
+            specs["outbound_dbs"] = [
+                str(ip) for ip in specs["outbound_dbs"] if isinstance(ip, (str, int))
+            ]
+
+        if isinstance(specs.get("outbound_webs"), list):
+            specs["outbound_webs"] = [
+                str(ip) for ip in specs["outbound_webs"] if isinstance(ip, (str, int))
+            ]
+
+        record["specs"] = specs
+
+    if websites is not None:
+        record["websites"] = sorted(set(websites))
+
+    # Always update last_seen
+    record["last_seen"] = datetime.now().isoformat()
+
+    # Track discovery sources
+    sources = list(record.get("sources", []))
+    if source not in sources:
+        sources.append(source)
+    record["sources"] = sources
+
+    return record
+
+
+def record_server(
+    ip: str,
+    hostname: str = None,
+    specs: dict = None,
+    websites: list = None,
+    source: str = "unknown",
+):
+    """Record or update a server with discovery metadata."""
+    ensure_data_dir()
+    entry = dict(
+        ip=ip, hostname=hostname, specs=specs, websites=websites, source=source
+    )
+    records, _ = apply_observations(get_backend(), [entry])
+    return records[ip]
+
+
+def apply_observations(backend: InventoryBackend, entries: list):
+    """Merge record_server-style `entries` and log what changed.
+
+    Hosts whose content hash is unchanged only get a side-table line with
+    their new last_seen; the rest are written to the backend in one go.
+    Returns ({ip: merged record}, {ips that actually changed}).
+    """
+    seen = get_seen()
+    changes = {}
+    new_hosts = set()
+    unchanged = {}
+
+    def merge(existing):
+        latest = seen.latest()
+        existing = {ip: overlay(r, latest.get(ip)) for ip, r in existing.items()}
+        records = dict(existing)
+        for entry in entries:
+            records[entry["ip"]] = merge_record(records.get(entry["ip"]), **entry)
+
+        changed = {}
+        unchanged.clear()
+        for ip, record in records.items():
+            record["content_hash"] = content_hash(record)
+            old = existing.get(ip)
+            if old and (old.get("content_hash") or content_hash(old)) == (
+                record["content_hash"]
+            ):
+                unchanged[ip] = record
+            else:
+                changed[ip] = record
+
+        # Net change per host against what was stored before this write
+        changes.clear()
+        for ip, record in changed.items():
+            changes[ip] = changes_between(existing.get(ip), record)
+        new_hosts.clear()
+        new_hosts.update(ip for ip in changed if ip not in existing)
+        return changed
+
+    changed = backend.apply({entry["ip"] for entry in entries}, merge)
+    seen.touch(unchanged)
+    get_history().append(changes, new_hosts=new_hosts)
+    return {**unchanged, **changed}, set(changed)
+
+
+class InventoryBatch:
+    """Unit of work that folds many observations into a single write.
+
+    Observations are queued by `record()` and applied on `commit()`: one
+    read of the affected hosts, one merge, one write.
+    """
+
+    def __init__(self, backend: InventoryBackend = None):
+        self.backend = backend
+        self.pending = []
+        self.records = {}
+        self.changed = set()
+
+    def record(
+        self,
+        ip: str,
+        hostname: str = None,
+        specs: dict = None,
+        websites: list = None,
+        source: str = "unknown",
+    ):
+        """Queue one observation (same arguments as record_server)."""
+        self.pending.append(
+            dict(
+                ip=ip, hostname=hostname, specs=specs, websites=websites, source=source
+            )
+        )
+
+    def commit(self) -> dict:
+        """Write all queued observations. Returns {ip: merged record}."""
+        if not self.pending:
+            return {}
+
+        ensure_data_dir()
+        records, changed = apply_observations(
+            self.backend or get_backend(), self.pending
+        )
+        self.records.update(records)
+        self.changed |= changed
+        self.pending = []
+        return records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Only persist when the block finished cleanly
+        if exc_type is None:
+            self.commit()
+        return False
+
+
+def inventory_batch(backend: InventoryBackend = None) -> InventoryBatch:
+    """Context manager that batches record() calls into one inventory write."""
+    return InventoryBatch(backend)
+
+
+def record_servers(entries) -> dict:
+    """Record many servers at once; `entries` are record_server kwargs dicts."""
+    with inventory_batch() as batch:
+        for entry in entries:
+            batch.record(**entry)
+    return batch.records
+
+
+def host_history(ip: str) -> list:
+    """Recorded changes of one host, oldest first."""
+    return list(get_history().entries(ip=ip))
+
+
+def changes_since(since: datetime) -> dict:
+    """Net changes per host since `since` (see HistoryLog.diff)."""
+    return get_history().diff(since.isoformat())
+
+
+def compact_journal() -> int:
+    """Fold data/servers.journal into servers.json. Returns entries folded."""
+    ensure_data_dir()
+    return get_backend("journal").compact()
+
+
+def import_json(path: Path = SERVERS_FILE, backend: str = None) -> int:
+    """Copy a servers.json document into a backend. Returns the host count."""
+    servers = json.loads(Path(path).read_text(encoding="utf-8") or "{}")
+    ensure_data_dir()
+    get_backend(backend).upsert(list(servers.values()))
+    return len(servers)
+
+
+def export_json(path: Path = None, backend: str = None) -> str:
+    """Dump a backend as servers.json-style JSON; write it to `path` if given."""
+    ensure_data_dir()
+    servers = with_seen(get_backend(backend).load())
+    text = json.dumps(servers, indent=2, ensure_ascii=False)
+    if path:
+        Path(path).write_text(text, encoding="utf-8")
+    return text
@@ -0,0 +1,299 @@
+# src/cosmonaut/storage/backend.py
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from cosmonaut.storage.index import InventoryIndex, index_values
+from cosmonaut.storage.locking import atomic_write, file_lock
+from cosmonaut.storage.stream import iter_json_object
+
+# Parsed JSON documents by path: {path: (file_stamp, servers)}. A hit skips
+# both the read and the json.loads of a file that hasn't changed.
+_parse_cache = {}
+
+
+def file_stamp(path: Path):
+    """(inode, mtime_ns, size) of `path`, or None if it doesn't exist.
+
+    Snapshots are replaced by rename, so the inode changes on every commit
+    even when mtime granularity is coarse.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def clear_cache():
+    """Forget every parsed document (e.g. before a cold-load benchmark)."""
+    _parse_cache.clear()
+
+
+class InventoryBackend:
+    """Interface every inventory backend implements.
+
+    Records are plain dicts keyed by IP, in the same shape that has always
+    lived in data/servers.json.
+    """
+
+    name = "base"
+
+    def load(self) -> dict:
+        """Return the whole inventory as {ip: record}."""
+        raise NotImplementedError
+
+    def save(self, servers: dict):
+        """Replace the whole inventory with `servers`."""
+        raise NotImplementedError
+
+    def get(self, ip: str):
+        """Return one record or None."""
+        return self.load().get(ip)
+
+    def get_many(self, ips) -> dict:
+        """Return {ip: record} for the given IPs that exist (one load)."""
+        servers = self.load()
+        return {ip: servers[ip] for ip in ips if ip in servers}
+
+    def upsert(self, records: list):
+        """Insert or replace the given records."""
+        servers = self.load()
+        for record in records:
+            servers[record["ip"]] = record
+        self.save(servers)
+
+    def apply(self, ips, merge) -> dict:
+        """Read-modify-write a set of hosts in one pass.
+
+        `merge` gets {ip: existing record} for those `ips` already known and
+        returns {ip: new record}; the result is written back in one save.
+        """
+        servers = self.load()
+        records = merge({ip: servers[ip] for ip in ips if ip in servers})
+        if records:
+            servers.update(records)
+            self.save(servers)
+        return records
+
+    def iter_items(self, fields=None):
+        """Yield (ip, record) pairs, ideally without holding everything.
+
+        `fields` (top-level keys or "specs.<key>") is a hint: backends that
+        can decode selectively return only those, others full records.
+        """
+        yield from self.load().items()
+
+    def project(self, fields) -> dict:
+        """Like load(), but only `fields` are needed (same hint as above)."""
+        return self.load()
+
+    def query(self, field: str, value: str) -> set:
+        """IPs whose indexed `field` (see storage.index) matches `value`."""
+        return InventoryIndex.build(self.load()).lookup(field, value)
+
+    def distinct(self, field: str) -> list:
+        """Sorted distinct values of an indexed field."""
+        return InventoryIndex.build(self.load()).values(field)
+
+
+class JsonBackend(InventoryBackend):
+    """Whole inventory in one pretty-printed JSON document.
+
+    Access is serialised between processes with an advisory lock on
+    data/servers.lock. Writes go to a temp file that is fsynced and renamed
+    into place. If the file changed on disk since this process loaded it, a
+    save merges into what is there instead of overwriting it.
+    """
+
+    name = "json"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(".lock")
+        self._loaded_stamp = None
+        self._index = None
+        self._index_stamp = None
+
+    def load(self) -> dict:
+        with file_lock(self.lock_path, shared=True):
+            self._loaded_stamp = self._stamp()
+            return self._read()
+
+    def save(self, servers: dict):
+        with file_lock(self.lock_path):
+            if self._stamp() != self._loaded_stamp:
+                # Someone else committed since our load: keep their hosts
+                servers = merge_servers(self._read(), servers)
+            self._write(servers)
+            self._loaded_stamp = self._stamp()
+
+    def apply(self, ips, merge) -> dict:
+        with file_lock(self.lock_path):
+            before = self._stamp()
+            servers = self.load()
+            old = {ip: servers[ip] for ip in ips if ip in servers}
+            records = merge(dict(old))
+            if not records:
+                return records  # nothing changed: skip the rewrite
+            servers.update(records)
+            self.save(servers)
+            self._update_index(before, old, records)
+            return records
+
+    def index(self) -> InventoryIndex:
+        """Secondary indexes for the current on-disk state.
+
+        Built once per state and then maintained record by record by
+        apply(), so lookups after a write don't trigger a rebuild.
+        """
+        with file_lock(self.lock_path, shared=True):
+            stamp = self._stamp()
+            if self._index is None or self._index_stamp != stamp:
+                self._index = InventoryIndex.build(self._read())
+                self._index_stamp = stamp
+            return self._index
+
+    def iter_items(self, fields=None):
+        # Already parsed in this process: nothing to stream
+        cached = _parse_cache.get(str(self.path.absolute()))
+        if cached is not None and cached[0] == file_stamp(self.path):
+            yield from list(cached[1].items())
+            return
+
+        # No lock needed: commits replace the file by rename, so the open
+        # handle keeps reading one consistent version.
+        try:
+            yield from iter_json_object(self.path)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Failed to read {self.path}: {e}")
+
+    def query(self, field: str, value: str) -> set:
+        return self.index().lookup(field, value)
+
+    def distinct(self, field: str) -> list:
+        if self._index is not None and self._index_stamp == self._stamp():
+            return self._index.values(field)
+        # Collect from a stream rather than loading the whole inventory
+        values = set()
+        for _, record in self.iter_items():
+            values |= index_values(field, record)
+        return sorted(values)
+
+    def _update_index(self, before, old: dict, records: dict):
+        # Only patch an index that matched the state we just modified;
+        # otherwise the next index() call rebuilds it.
+        if self._index is None or self._index_stamp != before:
+            return
+        for ip, record in records.items():
+            self._index.replace(old.get(ip), record)
+        self._index_stamp = self._stamp()
+
+    def _stamp(self):
+        """Cheap identity of the on-disk state, used to detect other writers."""
+        return file_stamp(self.path)
+
+    def _read(self) -> dict:
+        # Callers get a fresh top-level dict but share the record dicts with
+        # the cache, so records must be replaced rather than mutated in place.
+        key = str(self.path.absolute())
+        stamp = file_stamp(self.path)
+        cached = _parse_cache.get(key)
+        if stamp is not None and cached is not None and cached[0] == stamp:
+            return dict(cached[1])
+
+        servers = self._parse()
+        if stamp is not None and file_stamp(self.path) == stamp:
+            _parse_cache[key] = (stamp, servers)
+        return dict(servers)
+
+    def _parse(self) -> dict:
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return {}
+        except OSError as e:
+            print(f"⚠️ Failed to read {self.path}: {e}")
+            return {}
+
+        if not data or data.isspace():
+            return {}
+
+        try:
+            return self.decode(data)
+        except ValueError as e:
+            # Never overwrite a damaged inventory: move it aside for repair
+            backup = self.path.with_name(
+                f"{self.path.name}.corrupt-{datetime.now():%Y%m%d%H%M%S}"
+            )
+            print(f"⚠️ Failed to read {self.path}: {e}")
+            try:
+                os.replace(self.path, backup)
+                print(f"🔁 Moved it to {backup}; starting a fresh {self.path.name}")
+            except OSError:
+                pass
+            return {}
+
+    def decode(self, data: bytes) -> dict:
+        """File contents -> servers dict. Raise ValueError if damaged."""
+        return json.loads(data)
+
+    def encode(self, servers: dict) -> bytes:
+        """Servers dict -> file contents."""
+        return json.dumps(servers, indent=2, ensure_ascii=False).encode("utf-8")
+
+    def _write(self, servers: dict):
+        try:
+            atomic_write(self.path, self.encode(servers))
+        except Exception as e:
+            print(f"❌ Failed to write {self.path}: {e}")
+            return
+
+        # What we just wrote is what the next load would parse
+        _parse_cache[str(self.path.absolute())] = (
+            file_stamp(self.path),
+            dict(servers),
+        )
+
+
+def _union(theirs: list, ours: list) -> list:
+    return list(dict.fromkeys([*(theirs or []), *(ours or [])]))
+
+
+def merge_records(theirs: dict, ours: dict) -> dict:
+    """Merge two versions of one host written by different processes."""
+    newer, older = (
+        (ours, theirs)
+        if (ours.get("last_seen") or "") >= (theirs.get("last_seen") or "")
+        else (theirs, ours)
+    )
+    record = {**older, **newer}
+
+    hostname = newer.get("hostname")
+    if not hostname or hostname == "unknown":
+        record["hostname"] = older.get("hostname", hostname)
+
+    if not newer.get("specs"):
+        record["specs"] = older.get("specs", {})
+
+    record["first_seen"] = min(
+        (t for t in (theirs.get("first_seen"), ours.get("first_seen")) if t),
+        default=None,
+    )
+    record["websites"] = sorted(
+        set(_union(theirs.get("websites"), ours.get("websites")))
+    )
+    record["sources"] = _union(theirs.get("sources"), ours.get("sources"))
+    record["tags"] = _union(theirs.get("tags"), ours.get("tags"))
+    return record
+
+
+def merge_servers(theirs: dict, ours: dict) -> dict:
+    """Fold our copy of the inventory into the one currently on disk."""
+    merged = dict(theirs)
+    for ip, record in ours.items():
+        merged[ip] = merge_records(theirs[ip], record) if ip in theirs else record
+    return merged
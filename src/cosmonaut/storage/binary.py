@@ -0,0 +1,269 @@
+# src/cosmonaut/storage/binary.py
+import marshal
+import mmap
+import struct
+from pathlib import Path
+
+from cosmonaut.storage.backend import JsonBackend, _parse_cache, file_stamp
+
+# Layout of data/servers.bin:
+#
+#   MAGIC | u64 directory offset | blocks ... | directory
+#
+# The inventory is stored column by column: one column per top-level record
+# key and one per spec key ("specs.OS", "specs.outbound_webs", ...). Each
+# column is cut into blocks of BLOCK_ROWS rows, every block a marshal blob.
+# The directory lists, per column, the (offset, length) of each block, so a
+# reader can decode one column (e.g. hostnames for `inventory`) or one block
+# (a single host for `get`) without touching the rest.
+#
+# Strings are interned per block before marshalling, so repeated values (OS
+# names, sources, outbound IPs) are written once and refer back after that,
+# and decode to shared objects.
+MAGIC = b"CSNPBIN1"
+HEADER = struct.Struct("<Q")
+COUNTS = struct.Struct("<III")  # rows, block rows, columns
+NAME_LEN = struct.Struct("<H")
+BLOCK_COUNT = struct.Struct("<I")
+BLOCK = struct.Struct("<QI")  # offset, length
+
+BLOCK_ROWS = 1024
+SPEC_PREFIX = "specs."
+
+# Marks "record has no such key" in a column; marshal can encode Ellipsis
+MISSING = ...
+
+
+def _intern(value, table: dict):
+    if isinstance(value, str):
+        return table.setdefault(value, value)
+    if isinstance(value, list):
+        return [_intern(v, table) for v in value]
+    if isinstance(value, dict):
+        return {_intern(k, table): _intern(v, table) for k, v in value.items()}
+    return value
+
+
+def encode_snapshot(servers: dict, block_rows: int = BLOCK_ROWS) -> bytes:
+    """Encode {ip: record} into the columnar snapshot format."""
+    records = list(servers.values())
+
+    # Column order = first appearance, so records decode in familiar key order
+    columns = {}
+    for record in records:
+        for key, value in record.items():
+            columns.setdefault(key, None)
+            if key == "specs" and isinstance(value, dict):
+                for spec_key in value:
+                    columns.setdefault(SPEC_PREFIX + spec_key, None)
+
+    def cell(record, column):
+        if column.startswith(SPEC_PREFIX):
+            specs = record.get("specs")
+            if isinstance(specs, dict):
+                return specs.get(column[len(SPEC_PREFIX) :], MISSING)
+            return MISSING
+        value = record.get(column, MISSING)
+        # A specs dict lives in its specs.* columns; keep only a placeholder
+        return {} if column == "specs" and isinstance(value, dict) else value
+
+    out = bytearray(MAGIC + HEADER.pack(0))
+    directory = bytearray(COUNTS.pack(len(records), block_rows, len(columns)))
+    for column in columns:
+        name = column.encode("utf-8")
+        starts = range(0, len(records), block_rows)
+        directory += NAME_LEN.pack(len(name)) + name + BLOCK_COUNT.pack(len(starts))
+        for start in starts:
+            table = {}
+            values = [
+                _intern(cell(record, column), table)
+                for record in records[start : start + block_rows]
+            ]
+            blob = marshal.dumps(values)
+            directory += BLOCK.pack(len(out), len(blob))
+            out += blob
+
+    HEADER.pack_into(out, len(MAGIC), len(out))
+    out += directory
+    return bytes(out)
+
+
+class SnapshotReader:
+    """Random access to an encoded snapshot (bytes or an mmap)."""
+
+    def __init__(self, buf):
+        if buf[: len(MAGIC)] != MAGIC:
+            raise ValueError("Not a cosmonaut binary snapshot")
+        self.buf = buf
+        (pos,) = HEADER.unpack_from(buf, len(MAGIC))
+        self.rows, self.block_rows, count = COUNTS.unpack_from(buf, pos)
+        pos += COUNTS.size
+
+        self.columns = {}
+        for _ in range(count):
+            (size,) = NAME_LEN.unpack_from(buf, pos)
+            pos += NAME_LEN.size
+            name = bytes(buf[pos : pos + size]).decode("utf-8")
+            pos += size
+            (blocks,) = BLOCK_COUNT.unpack_from(buf, pos)
+            pos += BLOCK_COUNT.size
+            self.columns[name] = [
+                BLOCK.unpack_from(buf, pos + i * BLOCK.size) for i in range(blocks)
+            ]
+            pos += blocks * BLOCK.size
+
+        self._rows_by_ip = None
+
+    def block(self, column: str, number: int) -> list:
+        offset, length = self.columns[column][number]
+        return marshal.loads(self.buf[offset : offset + length])
+
+    def row_of(self, ip: str):
+        if self._rows_by_ip is None:
+            self._rows_by_ip = {}
+            for number in range(len(self.columns.get("ip", ()))):
+                base = number * self.block_rows
+                for i, value in enumerate(self.block("ip", number)):
+                    self._rows_by_ip[value] = base + i
+        return self._rows_by_ip.get(ip)
+
+    def wanted(self, fields=None) -> list:
+        """Columns needed for `fields` (all of them when fields is None)."""
+        if fields is None:
+            return list(self.columns)
+        fields = set(fields) | {"ip"}
+        wanted = []
+        for column in self.columns:
+            if column in fields:
+                wanted.append(column)
+            elif column.startswith(SPEC_PREFIX) and (
+                "specs" in fields or column in fields
+            ):
+                wanted.append(column)
+        if any(c.startswith(SPEC_PREFIX) for c in wanted) and "specs" in self.columns:
+            wanted.insert(0, "specs")
+        return [c for c in self.columns if c in wanted]
+
+    def records(self, fields=None):
+        """Yield records block by block, decoding only the wanted columns."""
+        columns = self.wanted(fields)
+        plain = [c for c in columns if not c.startswith(SPEC_PREFIX)]
+        specs = [c for c in columns if c.startswith(SPEC_PREFIX)]
+        spec_keys = [c[len(SPEC_PREFIX) :] for c in specs]
+
+        for number in range(len(self.columns.get("ip", ()))):
+            plain_values = [self.block(column, number) for column in plain]
+            spec_values = [self.block(column, number) for column in specs]
+
+            # Rows are zipped straight into dicts; per-cell assembly is only
+            # needed for blocks where some records lack a key.
+            if any(values.count(MISSING) for values in plain_values):
+                rows = [self._assemble(zip(plain, row)) for row in zip(*plain_values)]
+            else:
+                rows = [dict(zip(plain, row)) for row in zip(*plain_values)]
+
+            if specs:
+                for record, cells in zip(rows, zip(*spec_values)):
+                    spec = {
+                        key: value
+                        for key, value in zip(spec_keys, cells)
+                        if value is not MISSING
+                    }
+                    # Fresh dict per record; the "specs" cell is a shared {}
+                    if spec or "specs" in record:
+                        record["specs"] = spec
+            yield from rows
+
+    def record(self, ip: str):
+        row = self.row_of(ip)
+        if row is None:
+            return None
+        number, i = divmod(row, self.block_rows)
+        return self._assemble(
+            (column, self.block(column, number)[i]) for column in self.columns
+        )
+
+    @staticmethod
+    def _assemble(cells) -> dict:
+        record = {}
+        for column, value in cells:
+            if value is MISSING:
+                continue
+            if column.startswith(SPEC_PREFIX):
+                record.setdefault("specs", {})[column[len(SPEC_PREFIX) :]] = value
+            elif column == "specs" and value == {}:
+                record["specs"] = {}  # fresh dict; filled from specs.* cells
+            else:
+                record[column] = value
+        return record
+
+
+class BinaryBackend(JsonBackend):
+    """Inventory snapshot in the compact columnar format above.
+
+    Shares locking, merge-on-conflict and the parse cache with JsonBackend;
+    only the encoding differs. Reads that need part of each record (listing,
+    graphs) or a single host decode just those columns or that block from an
+    mmap of the file. JSON stays the import/export format.
+    """
+
+    name = "binary"
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._snapshot = None
+
+    def decode(self, data: bytes) -> dict:
+        try:
+            return {record["ip"]: record for record in SnapshotReader(data).records()}
+        except (struct.error, EOFError, TypeError, KeyError) as e:
+            raise ValueError(f"Damaged binary snapshot: {e}") from e
+
+    def encode(self, servers: dict) -> bytes:
+        return encode_snapshot(servers)
+
+    def get(self, ip: str):
+        if self._parsed():
+            return super().get(ip)
+        reader = self._reader()
+        return reader.record(ip) if reader else None
+
+    def get_many(self, ips) -> dict:
+        if self._parsed():
+            return super().get_many(ips)
+        reader = self._reader()
+        records = {ip: reader.record(ip) for ip in ips} if reader else {}
+        return {ip: record for ip, record in records.items() if record}
+
+    def iter_items(self, fields=None):
+        if self._parsed():
+            yield from super().iter_items(fields)
+            return
+        reader = self._reader()
+        if reader:
+            for record in reader.records(fields):
+                yield record["ip"], record
+
+    def project(self, fields) -> dict:
+        return dict(self.iter_items(fields))
+
+    def _parsed(self) -> bool:
+        cached = _parse_cache.get(str(self.path.absolute()))
+        return cached is not None and cached[0] == file_stamp(self.path)
+
+    def _reader(self):
+        """SnapshotReader over an mmap of the current file, reused until it changes."""
+        stamp = file_stamp(self.path)
+        if stamp is None:
+            return None
+        if self._snapshot is None or self._snapshot[0] != stamp:
+            with open(self.path, "rb") as f:
+                if not stamp[2]:
+                    return None  # empty file
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                self._snapshot = (stamp, SnapshotReader(buf))
+            except (ValueError, struct.error) as e:
+                print(f"⚠️ Failed to read {self.path}: {e}")
+                return None
+        return self._snapshot[1]
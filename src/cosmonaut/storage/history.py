@@ -0,0 +1,123 @@
+# src/cosmonaut/storage/history.py
+import json
+from datetime import datetime
+from pathlib import Path
+
+from cosmonaut.storage.backend import file_stamp
+from cosmonaut.storage.locking import append_lines, file_lock
+
+SPEC_PREFIX = "specs."
+
+# Change with every scan and say nothing about what changed on the host;
+# recording them would turn the history into a copy of every observation.
+VOLATILE_SPECS = {"Uptime", "Memory Free", "Disk Root Free", "Users Logged In"}
+
+
+def tracked_fields(record: dict) -> dict:
+    """Flatten the parts of a record the history follows: {field: value}."""
+    if not record:
+        return {}
+    fields = {"hostname": record.get("hostname"), "websites": record.get("websites")}
+    for key, value in (record.get("specs") or {}).items():
+        if key not in VOLATILE_SPECS:
+            fields[SPEC_PREFIX + key] = value
+    # Empty and absent are the same observation
+    return {field: value for field, value in fields.items() if value not in (None, [])}
+
+
+def changes_between(old: dict, new: dict) -> dict:
+    """{field: [before, after]} for the tracked fields that differ."""
+    before, after = tracked_fields(old), tracked_fields(new)
+    return {
+        field: [before.get(field), after.get(field)]
+        for field in before.keys() | after.keys()
+        if before.get(field) != after.get(field)
+    }
+
+
+class HistoryLog:
+    """Per-host change history as an append-only NDJSON file of deltas.
+
+    One line per observation that changed something, holding only the
+    changed fields with their before and after values:
+    {"at": ..., "ip": ..., "changes": {"specs.OS": ["Ubuntu 20.04", ...]}}.
+    Both history and diff are read straight off those lines, so nothing is
+    replayed and the file grows with the amount of change, not of scans.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(".lock")
+        self._warned = None
+
+    def append(self, changes: dict, new_hosts=()):
+        """Record {ip: changes} observed now; `new_hosts` were first seen."""
+        at = datetime.now().isoformat()
+        # "at" and "ip" lead each line so readers can filter before parsing
+        lines = [
+            json.dumps(
+                (
+                    {"at": at, "ip": ip, "new": True, "changes": delta}
+                    if ip in new_hosts
+                    else {"at": at, "ip": ip, "changes": delta}
+                ),
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            for ip, delta in changes.items()
+            if delta
+        ]
+        if not lines:
+            return
+
+        with file_lock(self.lock_path):
+            append_lines(self.path, lines)
+
+    def entries(self, ip: str = None, since: str = None):
+        """Yield history entries, optionally for one host and/or since a time."""
+        stamp = file_stamp(self.path)
+        if stamp is None:
+            return
+        ip_key = f'"ip":{json.dumps(ip)},' if ip else None
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if since and line[7 : line.find('"', 7)] < since:
+                    continue
+                if ip_key and ip_key not in line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn line from an interrupted append; say so once
+                    # per version of the file
+                    if line.strip() and self._warned != stamp:
+                        print(f"⚠️ Skipping unreadable entry in {self.path}")
+                        self._warned = stamp
+                    continue
+                yield entry
+
+    def diff(self, since: str) -> dict:
+        """Net change per host since `since` (an ISO timestamp).
+
+        Returns {ip: {"new": first seen in that window, "changes": {field:
+        [before, after]}}}, with before from the first and after from the
+        last entry in the window.
+        """
+        hosts = {}
+        for entry in self.entries(since=since):
+            host = hosts.setdefault(entry["ip"], {"new": False, "changes": {}})
+            host["new"] = host["new"] or entry.get("new", False)
+            for field, (before, after) in entry["changes"].items():
+                if field in host["changes"]:
+                    host["changes"][field][1] = after
+                else:
+                    host["changes"][field] = [before, after]
+
+        # Fields that changed and changed back are not a difference
+        for host in hosts.values():
+            host["changes"] = {
+                field: values
+                for field, values in host["changes"].items()
+                if values[0] != values[1]
+            }
+        return {ip: host for ip, host in hosts.items() if host["changes"]}
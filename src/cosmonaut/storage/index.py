@@ -0,0 +1,96 @@
+# src/cosmonaut/storage/index.py
+from bisect import bisect_left
+
+# Lookup field -> how to pull its values out of a host record
+INDEXED_FIELDS = {
+    "hostname": lambda record: [record.get("hostname")],
+    "domain": lambda record: record.get("websites") or [],
+    "tag": lambda record: record.get("tags") or [],
+    "source": lambda record: record.get("sources") or [],
+    "os": lambda record: [(record.get("specs") or {}).get("OS")],
+}
+
+
+def normalize(value) -> str:
+    """Index keys are case-insensitive: hostnames and domains are."""
+    return str(value).strip().lower()
+
+
+def index_values(field: str, record: dict) -> set:
+    """Normalized values `record` contributes to the `field` index."""
+    return {
+        normalize(value)
+        for value in INDEXED_FIELDS[field](record)
+        if value not in (None, "", "unknown", "N/A")
+    }
+
+
+class InventoryIndex:
+    """Secondary indexes over the inventory: {field: {value: {ip, ...}}}.
+
+    Kept up to date one record at a time with `replace(old, new)`, so a
+    write costs O(fields of that host) rather than a rebuild. A value ending
+    in `*` is a prefix match, answered by bisecting the sorted keys.
+    """
+
+    def __init__(self):
+        self.maps = {field: {} for field in INDEXED_FIELDS}
+        self._sorted = {}
+
+    @classmethod
+    def build(cls, servers: dict) -> "InventoryIndex":
+        index = cls()
+        for record in servers.values():
+            index.add(record)
+        return index
+
+    def add(self, record: dict):
+        self._change(record, add=True)
+
+    def remove(self, record: dict):
+        self._change(record, add=False)
+
+    def replace(self, old: dict, new: dict):
+        if old:
+            self.remove(old)
+        if new:
+            self.add(new)
+
+    def lookup(self, field: str, value: str) -> set:
+        """IPs whose `field` equals `value` (or starts with it, for `foo*`)."""
+        entries = self.maps[field]
+        value = normalize(value)
+        if not value.endswith("*"):
+            return set(entries.get(value, ()))
+
+        prefix = value[:-1]
+        keys = self._sorted_keys(field)
+        ips = set()
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            ips |= entries[keys[i]]
+        return ips
+
+    def values(self, field: str) -> list:
+        return self._sorted_keys(field)
+
+    def _sorted_keys(self, field: str) -> list:
+        if field not in self._sorted:
+            self._sorted[field] = sorted(self.maps[field])
+        return self._sorted[field]
+
+    def _change(self, record: dict, add: bool):
+        ip = record["ip"]
+        for field, entries in self.maps.items():
+            for value in index_values(field, record):
+                if add:
+                    if value not in entries:
+                        entries[value] = set()
+                        self._sorted.pop(field, None)
+                    entries[value].add(ip)
+                elif value in entries:
+                    entries[value].discard(ip)
+                    if not entries[value]:
+                        del entries[value]
+                        self._sorted.pop(field, None)
@@ -0,0 +1,149 @@
+# src/cosmonaut/storage/journal.py
+import json
+from pathlib import Path
+
+from cosmonaut.storage.backend import JsonBackend, file_stamp
+from cosmonaut.storage.locking import append_lines, file_lock
+
+
+class JournalBackend(JsonBackend):
+    """servers.json snapshot plus an append-only NDJSON journal of deltas.
+
+    Each write appends one compact line per changed host with only the
+    fields that changed, e.g. {"ip": "10.0.0.5", "set": {"last_seen": ...}}.
+    Reads replay the journal over the snapshot. Once the journal grows past
+    `max_entries` lines or `max_bytes`, it is folded into a fresh snapshot.
+    """
+
+    name = "journal"
+
+    max_entries = 1000
+    max_bytes = 8 * 1024 * 1024
+
+    def __init__(self, path: Path, journal_path: Path):
+        super().__init__(path)
+        self.journal_path = Path(journal_path)
+        self.entries = 0
+        self._warned = None
+
+    def save(self, servers: dict):
+        # A full save is a compaction: new snapshot first, then drop the
+        # journal. Replaying a stale journal over the new snapshot is harmless
+        # because entries only ever set fields.
+        with file_lock(self.lock_path):
+            super().save(servers)
+            self.journal_path.unlink(missing_ok=True)
+            self.entries = 0
+            self._loaded_stamp = self._stamp()
+
+    def upsert(self, records: list):
+        self.apply(
+            [record["ip"] for record in records],
+            lambda existing: {record["ip"]: record for record in records},
+        )
+
+    def apply(self, ips, merge) -> dict:
+        with file_lock(self.lock_path):
+            return self._apply(ips, merge)
+
+    def _apply(self, ips, merge) -> dict:
+        before = self._stamp()
+        servers = self.load()
+        old = {ip: servers[ip] for ip in ips if ip in servers}
+        records = merge(dict(old))
+
+        lines = []
+        for ip, record in records.items():
+            previous = servers.get(ip, {})
+            delta = {k: v for k, v in record.items() if previous.get(k) != v}
+            if delta:
+                lines.append(
+                    json.dumps(
+                        {"ip": ip, "set": delta},
+                        ensure_ascii=False,
+                        separators=(",", ":"),
+                    )
+                )
+            servers[ip] = record
+
+        if lines:
+            self._append(lines)
+            if self.needs_compaction():
+                self.save(servers)
+
+        self._update_index(before, old, records)
+        return records
+
+    def iter_items(self, fields=None):
+        # The journal is small; fold it per host, then stream the snapshot
+        deltas = {}
+        for entry in self._read_journal():
+            deltas[entry["ip"]] = {**deltas.get(entry["ip"], {}), **entry["set"]}
+
+        for ip, record in super().iter_items():
+            if ip in deltas:
+                record = {**record, **deltas.pop(ip)}
+            yield ip, record
+
+        # Hosts first recorded since the last compaction
+        yield from deltas.items()
+
+    def needs_compaction(self) -> bool:
+        if self.entries >= self.max_entries:
+            return True
+        try:
+            return self.journal_path.stat().st_size >= self.max_bytes
+        except FileNotFoundError:
+            return False
+
+    def compact(self) -> int:
+        """Fold the journal into servers.json. Returns the entries folded."""
+        with file_lock(self.lock_path):
+            servers = self.load()
+            entries = self.entries
+            if entries:
+                self.save(servers)
+        return entries
+
+    def _stamp(self):
+        try:
+            st = self.journal_path.stat()
+            journal = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            journal = None
+        return (super()._stamp(), journal)
+
+    def _read(self) -> dict:
+        servers = super()._read()
+        self.entries = 0
+        for entry in self._read_journal():
+            # Copy rather than update: snapshot records are shared with the
+            # parse cache
+            servers[entry["ip"]] = {**servers.get(entry["ip"], {}), **entry["set"]}
+            self.entries += 1
+        return servers
+
+    def _append(self, lines: list):
+        append_lines(self.journal_path, lines)
+        self.entries += len(lines)
+        self._loaded_stamp = self._stamp()
+
+    def _read_journal(self):
+        stamp = file_stamp(self.journal_path)
+        if stamp is None:
+            return
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn line from an interrupted append; say so once
+                    # per version of the file
+                    if self._warned != stamp:
+                        print(f"⚠️ Skipping unreadable entry in {self.journal_path}")
+                        self._warned = stamp
+                    continue
+                yield entry
@@ -0,0 +1,103 @@
+# src/cosmonaut/storage/locking.py
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, fall back to unlocked I/O
+    fcntl = None
+
+# Locks this thread already holds: {lock path: depth}. flock() locks belong
+# to an open file, so re-locking through a second descriptor in the same
+# process would deadlock; nested sections just reuse the outer lock.
+_held = threading.local()
+
+
+@contextmanager
+def file_lock(path: Path, shared: bool = False):
+    """Hold an advisory fcntl lock on `path` (created if missing).
+
+    Use shared=True for readers and the default exclusive lock for
+    read-modify-write sections. Re-entering in the same thread is a no-op,
+    so an exclusive section can call helpers that take a shared lock.
+    """
+    held = getattr(_held, "locks", None)
+    if held is None:
+        held = _held.locks = {}
+
+    key = str(Path(path).absolute())
+    if fcntl is None or key in held:
+        held[key] = held.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            held[key] -= 1
+            if not held[key]:
+                del held[key]
+        return
+
+    Path(path).parent.mkdir(exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        held[key] = 1
+        try:
+            yield
+        finally:
+            del held[key]
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, data: bytes):
+    """Write `data` to a temp file, fsync it and rename it over `path`.
+
+    A crash leaves either the old or the new file, never a truncated one.
+    """
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    # Persist the rename itself
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def append_lines(path: Path, lines: list):
+    """Append `lines` (without newlines) to `path` and fsync.
+
+    Call with the file's lock held. If an interrupted append left a torn
+    last line, it is terminated first so it can't swallow the first new
+    line; readers skip the torn fragment on its own.
+    """
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True)
+    with open(path, "a+b") as f:
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = b"\n" + data
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
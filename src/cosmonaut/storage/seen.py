@@ -0,0 +1,120 @@
+# src/cosmonaut/storage/seen.py
+import hashlib
+import json
+from pathlib import Path
+
+from cosmonaut.storage.backend import file_stamp
+from cosmonaut.storage.history import VOLATILE_SPECS
+from cosmonaut.storage.locking import append_lines, atomic_write, file_lock
+
+
+def content_hash(record: dict) -> str:
+    """Hash of the fields that make a host observation "different".
+
+    Leaves out first_seen/last_seen and the volatile specs, so a re-scan of
+    an unchanged host hashes the same.
+    """
+    stable = {
+        "hostname": record.get("hostname"),
+        "specs": {
+            key: value
+            for key, value in (record.get("specs") or {}).items()
+            if key not in VOLATILE_SPECS
+        },
+        "websites": record.get("websites") or [],
+        "sources": record.get("sources") or [],
+        "tags": record.get("tags") or [],
+    }
+    data = json.dumps(stable, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def overlay(record: dict, entry: dict) -> dict:
+    """`record` with a newer side-table observation applied (a new dict)."""
+    if not entry or (record.get("last_seen") or "") >= entry["last_seen"]:
+        return record
+    record = {**record, "last_seen": entry["last_seen"]}
+    if entry.get("specs") and isinstance(record.get("specs"), dict):
+        record["specs"] = {**record["specs"], **entry["specs"]}
+    return record
+
+
+class SeenLog:
+    """Side table of observations that changed nothing but last_seen.
+
+    When a re-scan's content hash matches the stored record, the inventory
+    isn't rewritten; instead one short line goes here, e.g.
+    {"ip": ..., "last_seen": ..., "specs": {"Uptime": ...}}, carrying the
+    new timestamp and volatile specs. Reads lay the newest line per host
+    over its record. The file is rewritten to one line per host once it
+    holds more than `max_entries` lines.
+    """
+
+    max_entries = 5000
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(".lock")
+        self._latest = {}
+        self._stamp = None
+        self._lines = 0
+
+    def touch(self, observations: dict):
+        """Append {ip: record} as last_seen-only observations."""
+        lines = [
+            json.dumps(
+                {
+                    "ip": ip,
+                    "last_seen": record["last_seen"],
+                    "specs": {
+                        key: value
+                        for key, value in (record.get("specs") or {}).items()
+                        if key in VOLATILE_SPECS
+                    },
+                },
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            for ip, record in observations.items()
+        ]
+        if not lines:
+            return
+
+        with file_lock(self.lock_path):
+            append_lines(self.path, lines)
+            if self._read_latest() and self._lines > self.max_entries:
+                self._compact()
+
+    def latest(self) -> dict:
+        """{ip: newest side-table entry}, re-read only when the file changed."""
+        with file_lock(self.lock_path, shared=True):
+            return self._read_latest()
+
+    def _read_latest(self) -> dict:
+        stamp = file_stamp(self.path)
+        if stamp == self._stamp:
+            return self._latest
+
+        latest = {}
+        lines = 0
+        if stamp is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn line from an interrupted append
+                    lines += 1
+                    previous = latest.get(entry["ip"])
+                    if previous is None or previous["last_seen"] <= entry["last_seen"]:
+                        latest[entry["ip"]] = entry
+        self._latest, self._stamp, self._lines = latest, stamp, lines
+        return latest
+
+    def _compact(self):
+        text = "".join(
+            json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for entry in self._latest.values()
+        )
+        atomic_write(self.path, text.encode("utf-8"))
+        self._read_latest()
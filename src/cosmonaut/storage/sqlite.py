@@ -0,0 +1,329 @@
+# src/cosmonaut/storage/sqlite.py
+import json
+import sqlite3
+from pathlib import Path
+
+from cosmonaut.storage.backend import InventoryBackend
+from cosmonaut.storage.index import normalize
+
+# Top-level record keys that get their own table/column. Anything else a
+# record carries is kept verbatim in hosts.extra.
+CORE_FIELDS = (
+    "ip",
+    "hostname",
+    "first_seen",
+    "last_seen",
+    "specs",
+    "websites",
+    "sources",
+    "tags",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    ip TEXT PRIMARY KEY,
+    hostname TEXT COLLATE NOCASE,
+    first_seen TEXT,
+    last_seen TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_hosts_hostname ON hosts(hostname);
+
+CREATE TABLE IF NOT EXISTS specs (
+    ip TEXT NOT NULL REFERENCES hosts(ip) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT COLLATE NOCASE,
+    PRIMARY KEY (ip, key)
+);
+CREATE INDEX IF NOT EXISTS idx_specs_key_value ON specs(key, value);
+
+CREATE TABLE IF NOT EXISTS websites (
+    ip TEXT NOT NULL REFERENCES hosts(ip) ON DELETE CASCADE,
+    domain TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (ip, domain)
+);
+CREATE INDEX IF NOT EXISTS idx_websites_domain ON websites(domain);
+
+CREATE TABLE IF NOT EXISTS sources (
+    ip TEXT NOT NULL REFERENCES hosts(ip) ON DELETE CASCADE,
+    source TEXT NOT NULL COLLATE NOCASE,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (ip, source)
+);
+CREATE INDEX IF NOT EXISTS idx_sources_source ON sources(source);
+
+CREATE TABLE IF NOT EXISTS tags (
+    ip TEXT NOT NULL REFERENCES hosts(ip) ON DELETE CASCADE,
+    tag TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (ip, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag);
+"""
+
+# Lookup field -> (table, column, extra condition). Columns are NOCASE so
+# these match storage.index semantics and can use the indexes above.
+QUERIES = {
+    "hostname": ("hosts", "hostname", ""),
+    "domain": ("websites", "domain", ""),
+    "tag": ("tags", "tag", ""),
+    "source": ("sources", "source", ""),
+    "os": ("specs", "value", "key = 'OS' AND "),
+}
+
+
+class SqliteBackend(InventoryBackend):
+    """Inventory in SQLite, one row per host plus indexed child tables.
+
+    Recording a host only touches that host's rows, so the cost of a write
+    no longer grows with the size of the inventory.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = None
+
+    def connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def load(self) -> dict:
+        conn = self.connect()
+        servers = {
+            ip: self._host_row_to_record(ip, hostname, first_seen, last_seen, extra)
+            for ip, hostname, first_seen, last_seen, extra in conn.execute(
+                "SELECT ip, hostname, first_seen, last_seen, extra"
+                " FROM hosts ORDER BY rowid"
+            )
+        }
+
+        self._fill_children(conn, servers, everything=True)
+        return servers
+
+    def _fill_children(self, conn, servers: dict, everything: bool = False):
+        """Attach specs/websites/sources/tags rows to the host records."""
+        if everything:
+            where, params = "", ()
+        else:
+            where = f"WHERE ip IN ({', '.join('?' * len(servers))})"
+            params = tuple(servers)
+
+        for ip, key, value in conn.execute(
+            f"SELECT ip, key, value FROM specs {where} ORDER BY rowid", params
+        ):
+            if ip in servers:
+                servers[ip]["specs"][key] = json.loads(value)
+        for ip, domain in conn.execute(
+            f"SELECT ip, domain FROM websites {where} ORDER BY domain", params
+        ):
+            if ip in servers:
+                servers[ip]["websites"].append(domain)
+        for ip, source in conn.execute(
+            f"SELECT ip, source FROM sources {where} ORDER BY position", params
+        ):
+            if ip in servers:
+                servers[ip]["sources"].append(source)
+        for ip, tag in conn.execute(
+            f"SELECT ip, tag FROM tags {where} ORDER BY rowid", params
+        ):
+            if ip in servers:
+                servers[ip]["tags"].append(tag)
+
+    def get(self, ip: str):
+        conn = self.connect()
+        row = conn.execute(
+            "SELECT ip, hostname, first_seen, last_seen, extra FROM hosts WHERE ip = ?",
+            (ip,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        record = self._host_row_to_record(*row)
+        record["specs"] = {
+            key: json.loads(value)
+            for key, value in conn.execute(
+                "SELECT key, value FROM specs WHERE ip = ? ORDER BY rowid", (ip,)
+            )
+        }
+        record["websites"] = [
+            domain
+            for (domain,) in conn.execute(
+                "SELECT domain FROM websites WHERE ip = ? ORDER BY domain", (ip,)
+            )
+        ]
+        record["sources"] = [
+            source
+            for (source,) in conn.execute(
+                "SELECT source FROM sources WHERE ip = ? ORDER BY position", (ip,)
+            )
+        ]
+        record["tags"] = [
+            tag
+            for (tag,) in conn.execute(
+                "SELECT tag FROM tags WHERE ip = ? ORDER BY rowid", (ip,)
+            )
+        ]
+        return record
+
+    def iter_items(self, fields=None, page_size: int = 500):
+        # Walk hosts in rowid pages so only one page is in memory at a time
+        conn = self.connect()
+        last = 0
+        while True:
+            rows = conn.execute(
+                "SELECT rowid, ip, hostname, first_seen, last_seen, extra FROM hosts"
+                " WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last, page_size),
+            ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            page = {row[1]: self._host_row_to_record(*row[1:]) for row in rows}
+            self._fill_children(conn, page)
+            yield from page.items()
+
+    def get_many(self, ips) -> dict:
+        records = {}
+        for ip in ips:
+            record = self.get(ip)
+            if record is not None:
+                records[ip] = record
+        return records
+
+    def query(self, field: str, value: str) -> set:
+        table, column, where = QUERIES[field]
+        value = value.strip()
+        prefix = value.endswith("*")
+        if prefix:
+            value = value[:-1]
+
+        if field == "os":
+            # specs values are stored JSON-encoded
+            value = json.dumps(value, ensure_ascii=False)
+            if prefix:
+                value = value[:-1]  # drop the closing quote
+
+        if prefix:
+            sql = f"SELECT DISTINCT ip FROM {table} WHERE {where}{column} >= ? AND {column} < ?"
+            params = (value, value + "\U0010ffff")
+        else:
+            sql = f"SELECT DISTINCT ip FROM {table} WHERE {where}{column} = ?"
+            params = (value,)
+
+        return {ip for (ip,) in self.connect().execute(sql, params)}
+
+    def distinct(self, field: str) -> list:
+        table, column, where = QUERIES[field]
+        rows = self.connect().execute(
+            f"SELECT DISTINCT {column} FROM {table} WHERE {where}{column} IS NOT NULL"
+        )
+        values = (json.loads(v) if field == "os" else v for (v,) in rows)
+        return sorted(
+            {normalize(v) for v in values if v not in (None, "", "unknown", "N/A")}
+        )
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert(self, records: list):
+        conn = self.connect()
+        with conn:
+            for record in records:
+                self._write_record(conn, record)
+
+    def apply(self, ips, merge) -> dict:
+        conn = self.connect()
+        with conn:
+            # Take the write lock before reading so the merge can't race
+            conn.execute("BEGIN IMMEDIATE")
+            records = merge(self.get_many(ips))
+            for record in records.values():
+                self._write_record(conn, record)
+        return records
+
+    def save(self, servers: dict):
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM hosts")
+            for record in servers.values():
+                self._write_record(conn, record)
+
+    def _write_record(self, conn: sqlite3.Connection, record: dict):
+        ip = record["ip"]
+        extra = {k: v for k, v in record.items() if k not in CORE_FIELDS}
+
+        conn.execute(
+            "INSERT INTO hosts (ip, hostname, first_seen, last_seen, extra)"
+            " VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT(ip) DO UPDATE SET"
+            "   hostname = excluded.hostname,"
+            "   first_seen = excluded.first_seen,"
+            "   last_seen = excluded.last_seen,"
+            "   extra = excluded.extra",
+            (
+                ip,
+                record.get("hostname"),
+                record.get("first_seen"),
+                record.get("last_seen"),
+                json.dumps(extra, ensure_ascii=False) if extra else None,
+            ),
+        )
+
+        for table in ("specs", "websites", "sources", "tags"):
+            conn.execute(f"DELETE FROM {table} WHERE ip = ?", (ip,))
+
+        conn.executemany(
+            "INSERT INTO specs (ip, key, value) VALUES (?, ?, ?)",
+            [
+                (ip, key, json.dumps(value, ensure_ascii=False))
+                for key, value in (record.get("specs") or {}).items()
+            ],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO websites (ip, domain) VALUES (?, ?)",
+            [(ip, str(domain)) for domain in record.get("websites") or []],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO sources (ip, source, position) VALUES (?, ?, ?)",
+            [
+                (ip, str(source), position)
+                for position, source in enumerate(record.get("sources") or [])
+            ],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO tags (ip, tag) VALUES (?, ?)",
+            [(ip, str(tag)) for tag in record.get("tags") or []],
+        )
+
+    @staticmethod
+    def _host_row_to_record(ip, hostname, first_seen, last_seen, extra) -> dict:
+        record = {
+            "ip": ip,
+            "first_seen": first_seen,
+            "last_seen": last_seen,
+            "hostname": hostname,
+            "specs": {},
+            "websites": [],
+            "sources": [],
+            "tags": [],
+        }
+        if extra:
+            record.update(json.loads(extra))
+        return record
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Tuple
 from typing import List, Dict
 import subprocess
@@ -6,6 +7,8 @@ import subprocess
 from rich.console import Console
 from rich.progress import track
 
+from cosmonaut.ssh.client import run_command
+
 
 # Create a console for rich output
 console = Console()
@@ -13,75 +16,71 @@ console = Console()
 
 def run(client, cmd: str) -> str:
     try:
-        _, stdout, _ = client.exec_command(cmd)
-        return stdout.read().decode().strip()
+        return run_command(client, cmd)
     except Exception:
         return ""
 
 
-def parse_nginx_sites(client) -> List[Dict]:
-    results = []
-    sites = run(client, "ls /etc/nginx/sites-enabled/ 2>/dev/null || echo").splitlines()
-
-    for site in track(sites, description="Checking Nginx sites..."):
-        site = site.strip()
-        if not site:
-            continue
-        config = run(client, f"cat /etc/nginx/sites-enabled/{site}")
-        domains = [
-            line.split()[1].rstrip(";")
-            for line in config.splitlines()
-            if "server_name" in line and "#" not in line
-        ]
-        roots = [
-            line.split()[1].rstrip(";")
-            for line in config.splitlines()
-            if "root" in line and "#" not in line
-        ]
-        results.append({
-            "service": "nginx",
+NGINX_SITES = "ls /etc/nginx/sites-enabled/ 2>/dev/null || echo"
+APACHE_SITES = "ls /etc/apache2/sites-enabled/ 2>/dev/null || echo"
+WEB_PROCESSES = "ps aux | grep -E 'nginx|apache|httpd|lighttpd|node' | grep -v grep"
+OPEN_PORTS = "ss -tuln | grep -E ':80 |:443 |:8080'"
+SSL_CERTS = (
+    "find /etc/ssl -name '*.pem' -o -name '*.crt' 2>/dev/null | "
+    "head -3 | xargs -I {} openssl x509 -noout -subject -in {} 2>/dev/null | "
+    "grep -o 'CN=[^,]*'"
+)
+
+
+def site_names(listing: str) -> List[str]:
+    return [site.strip() for site in listing.splitlines() if site.strip()]
+
+
+def nginx_site(site: str, config: str) -> Dict:
+    domains = [
+        line.split()[1].rstrip(";")
+        for line in config.splitlines()
+        if "server_name" in line and "#" not in line
+    ]
+    roots = [
+        line.split()[1].rstrip(";")
+        for line in config.splitlines()
+        if "root" in line and "#" not in line
+    ]
+    return {
+        "service": "nginx",
+        "config": site,
+        "details": ", ".join(domains) or "configured",
+        "root": roots[0] if roots else "N/A",
+    }
+
+
+def apache_sites(site: str, config: str) -> List[Dict]:
+    domains = [
+        word
+        for line in config.splitlines()
+        if "ServerName" in line or "ServerAlias" in line
+        for word in line.split()
+        if word not in ("ServerName", "ServerAlias") and "." in word
+    ]
+    roots = [
+        line.split()[1]
+        for line in config.splitlines()
+        if "DocumentRoot" in line and "#" not in line
+    ]
+    return [
+        {
+            "service": "apache",
             "config": site,
-            "details": ", ".join(domains) or "configured",
+            "details": domain,
             "root": roots[0] if roots else "N/A",
-        })
-    return results
-
-
-def parse_apache_sites(client) -> List[Dict]:
-    results = []
-    sites = run(client, "ls /etc/apache2/sites-enabled/ 2>/dev/null || echo").splitlines()
-
-    for site in track(sites, description="Checking Apache sites..."):
-        site = site.strip()
-        if not site:
-            continue
-        config = run(client, f"cat /etc/apache2/sites-enabled/{site}")
-        domains = [
-            word
-            for line in config.splitlines()
-            if "ServerName" in line or "ServerAlias" in line
-            for word in line.split()
-            if word not in ("ServerName", "ServerAlias") and "." in word
-        ]
-        roots = [
-            line.split()[1]
-            for line in config.splitlines()
-            if "DocumentRoot" in line and "#" not in line
-        ]
-        for domain in domains:
-            results.append({
-                "service": "apache",
-                "config": site,
-                "details": domain,
-                "root": roots[0] if roots else "N/A",
-            })
-    return results
+        }
+        for domain in domains
+    ]
 
 
-def detect_web_processes(client) -> List[Dict]:
+def web_processes(processes: str) -> List[Dict]:
     results = []
-    processes = run(client, "ps aux | grep -E 'nginx|apache|httpd|lighttpd|node' | grep -v grep")
-
     if "nginx" in processes:
         results.append({"service": "process", "config": "nginx", "details": "running", "root": "N/A"})
     if any(p in processes for p in ("apache", "httpd")):
@@ -91,21 +90,14 @@ def detect_web_processes(client) -> List[Dict]:
     return results
 
 
-def detect_open_ports(client) -> List[Dict]:
-    ports = run(client, "ss -tuln | grep -E ':80 |:443 |:8080'")
+def open_ports(ports: str) -> List[Dict]:
     if ports:
         return [{"service": "port", "config": "open", "details": ports.splitlines()[0], "root": "N/A"}]
     return []
 
 
-def parse_ssl_certs(client) -> List[Dict]:
+def ssl_certs(certs: str) -> List[Dict]:
     results = []
-    certs = run(
-        client,
-        "find /etc/ssl -name '*.pem' -o -name '*.crt' 2>/dev/null | "
-        "head -3 | xargs -I {} openssl x509 -noout -subject -in {} 2>/dev/null | "
-        "grep -o 'CN=[^,]*'"
-    )
     for line in certs.splitlines():
         if "CN=" in line:
             results.append({
@@ -117,6 +109,38 @@ def parse_ssl_certs(client) -> List[Dict]:
     return results
 
 
+def parse_nginx_sites(client) -> List[Dict]:
+    results = []
+    sites = site_names(run(client, NGINX_SITES))
+
+    for site in track(sites, description="Checking Nginx sites..."):
+        config = run(client, f"cat /etc/nginx/sites-enabled/{site}")
+        results.append(nginx_site(site, config))
+    return results
+
+
+def parse_apache_sites(client) -> List[Dict]:
+    results = []
+    sites = site_names(run(client, APACHE_SITES))
+
+    for site in track(sites, description="Checking Apache sites..."):
+        config = run(client, f"cat /etc/apache2/sites-enabled/{site}")
+        results.extend(apache_sites(site, config))
+    return results
+
+
+def detect_web_processes(client) -> List[Dict]:
+    return web_processes(run(client, WEB_PROCESSES))
+
+
+def detect_open_ports(client) -> List[Dict]:
+    return open_ports(run(client, OPEN_PORTS))
+
+
+def parse_ssl_certs(client) -> List[Dict]:
+    return ssl_certs(run(client, SSL_CERTS))
+
+
 def get_status_and_redirect(domain: str, protocol: str) -> Tuple[str, str]:
     base_url = f"{protocol}://{domain}"
     status = "❌ Down"
@@ -156,6 +180,44 @@ def get_websites(client):
     return websites
 
 
+async def get_websites_async(engine, host: str, **target) -> List[Dict]:
+    """get_websites() for one host of an AsyncSSHEngine.
+
+    Independent commands run concurrently, so the host costs a few round
+    trips instead of one per command and config file.
+    """
+
+    async def run_async(cmd: str) -> str:
+        try:
+            return await engine.run(host, cmd, **target)
+        except Exception:
+            return ""
+
+    nginx, apache, processes, ports, certs = await asyncio.gather(
+        run_async(NGINX_SITES),
+        run_async(APACHE_SITES),
+        run_async(WEB_PROCESSES),
+        run_async(OPEN_PORTS),
+        run_async(SSL_CERTS),
+    )
+    nginx_sites, apache_names = site_names(nginx), site_names(apache)
+    configs = await asyncio.gather(
+        *(run_async(f"cat /etc/nginx/sites-enabled/{site}") for site in nginx_sites),
+        *(run_async(f"cat /etc/apache2/sites-enabled/{site}") for site in apache_names),
+    )
+
+    websites = [
+        nginx_site(site, config)
+        for site, config in zip(nginx_sites, configs[: len(nginx_sites)])
+    ]
+    for site, config in zip(apache_names, configs[len(nginx_sites) :]):
+        websites.extend(apache_sites(site, config))
+    websites.extend(web_processes(processes))
+    websites.extend(open_ports(ports))
+    websites.extend(ssl_certs(certs))
+    return websites
+
+
 def check_domain(domain: str):
     domain = domain[2:] if domain.startswith("*.") else domain
 